@@ -0,0 +1,159 @@
+"""
+Compare the regex tag handling the streaming response handler used to run on
+every chunk with the incremental open_webui.utils.tag_parser.ContentTagParser.
+
+    python benchmarks/bench_tag_parser.py --tokens 20000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from open_webui.utils.tag_parser import ContentTagParser, extract_attributes
+
+REASONING_TAGS = [
+    ("think", "/think"),
+    ("thinking", "/thinking"),
+    ("reason", "/reason"),
+    ("reasoning", "/reasoning"),
+    ("thought", "/thought"),
+    ("Thought", "/Thought"),
+    ("|begin_of_thought|", "|end_of_thought|"),
+]
+SOLUTION_TAGS = [("|begin_of_solution|", "|end_of_solution|")]
+
+
+def make_trace(num_tokens: int, seed: int = 0) -> list[str]:
+    """A streamed reasoning model answer, one token per chunk."""
+    rng = random.Random(seed)
+    words = ["the", "a", "value", "so", "x", "=", "3", "<", "2", "check", "wait"]
+
+    def tokens(count):
+        return [
+            rng.choice(words) + ("\n" if rng.random() < 0.05 else " ")
+            for _ in range(count)
+        ]
+
+    return (
+        ["<", "think", ">"]
+        + tokens(num_tokens)
+        + ["</", "think", ">\n\n"]
+        + tokens(num_tokens // 20)
+    )
+
+
+def regex_handler(content_type, tags, content, content_blocks):
+    """The handler replaced by ContentTagParser."""
+    if content_blocks[-1]["type"] == "text":
+        for start_tag, end_tag in tags:
+            match = re.search(rf"<{re.escape(start_tag)}(\s.*?)?>", content)
+            if match:
+                attributes = extract_attributes(match.group(1) or "")
+                before_tag = content[: match.start()]
+                after_tag = content[match.end() :]
+                content_blocks[-1]["content"] = content_blocks[-1]["content"].replace(
+                    match.group(0) + after_tag, ""
+                )
+                if before_tag:
+                    content_blocks[-1]["content"] = before_tag
+                if not content_blocks[-1]["content"]:
+                    content_blocks.pop()
+                content_blocks.append(
+                    {
+                        "type": content_type,
+                        "start_tag": start_tag,
+                        "end_tag": end_tag,
+                        "attributes": attributes,
+                        "content": after_tag,
+                        "started_at": time.time(),
+                    }
+                )
+                break
+    elif content_blocks[-1]["type"] == content_type:
+        start_tag = content_blocks[-1]["start_tag"]
+        end_tag = content_blocks[-1]["end_tag"]
+        end_tag_pattern = rf"<{re.escape(end_tag)}>"
+        if re.search(end_tag_pattern, content):
+            block_content = re.sub(
+                rf"<{re.escape(start_tag)}(.*?)>", "", content_blocks[-1]["content"]
+            ).strip()
+            split_content = re.compile(end_tag_pattern, re.DOTALL).split(
+                block_content, maxsplit=1
+            )
+            block_content = split_content[0].strip() if split_content else ""
+            leftover = split_content[1].strip() if len(split_content) > 1 else ""
+            if block_content:
+                content_blocks[-1]["content"] = block_content
+                content_blocks[-1]["ended_at"] = time.time()
+            else:
+                content_blocks.pop()
+            content_blocks.append({"type": "text", "content": leftover})
+            content = re.sub(
+                rf"<{re.escape(start_tag)}(.*?)>(.|\n)*?<{re.escape(end_tag)}>",
+                "",
+                content,
+                flags=re.DOTALL,
+            )
+    return content, content_blocks
+
+
+def run_regex(trace):
+    content = ""
+    content_blocks = [{"type": "text", "content": ""}]
+    for value in trace:
+        content = f"{content}{value}"
+        content_blocks[-1]["content"] = content_blocks[-1]["content"] + value
+        content, content_blocks = regex_handler(
+            "reasoning", REASONING_TAGS, content, content_blocks
+        )
+        content, content_blocks = regex_handler(
+            "solution", SOLUTION_TAGS, content, content_blocks
+        )
+    return content_blocks
+
+
+def run_parser(trace):
+    parser = ContentTagParser({"reasoning": REASONING_TAGS, "solution": SOLUTION_TAGS})
+    content_blocks = [{"type": "text", "content": ""}]
+    for value in trace:
+        parser.feed(content_blocks, value)
+    parser.flush(content_blocks)
+    return content_blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    trace = make_trace(args.tokens)
+    print(f"{len(trace)} chunks, {sum(len(t) for t in trace):,} chars")
+
+    results = {}
+    for name, func in [("regex", run_regex), ("parser", run_parser)]:
+        best = float("inf")
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            blocks = func(trace)
+            best = min(best, time.perf_counter() - start)
+        results[name] = (best, [(b["type"], b["content"].strip()) for b in blocks])
+
+    (regex_time, regex_blocks), (parser_time, parser_blocks) = (
+        results["regex"],
+        results["parser"],
+    )
+    assert regex_blocks == parser_blocks, "the parsers disagree"
+    print(
+        f"regex {regex_time * 1000:9.1f}ms, parser {parser_time * 1000:7.1f}ms, "
+        f"{regex_time / parser_time:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
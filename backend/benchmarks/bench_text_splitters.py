@@ -0,0 +1,111 @@
+"""
+Compare the per-call langchain splitters save_docs_to_vector_db used to build
+with the shared splitters and batched token path of
+open_webui.retrieval.splitters.
+
+    python benchmarks/bench_text_splitters.py --docs 2000 --words 3000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import tiktoken
+from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
+from langchain_core.documents import Document
+
+from open_webui.retrieval.splitters import get_text_splitter, split_document_batch
+
+BATCH_SIZE = 32
+
+
+def make_corpus(num_docs: int, num_words: int, seed: int = 0) -> list[Document]:
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))
+        )
+        for _ in range(5000)
+    ]
+    return [
+        Document(
+            page_content=" ".join(rng.choice(vocabulary) for _ in range(num_words)),
+            metadata={"page": i},
+        )
+        for i in range(num_docs)
+    ]
+
+
+def baseline(docs, splitter_type, chunk_size, chunk_overlap, encoding_name):
+    # One splitter per save_docs_to_vector_db call (here: per batch of
+    # documents), split document by document.
+    chunks = 0
+    for i in range(0, len(docs), BATCH_SIZE):
+        if splitter_type == "token":
+            tiktoken.get_encoding(encoding_name)
+            splitter = TokenTextSplitter(
+                encoding_name=encoding_name,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                add_start_index=True,
+            )
+        else:
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                add_start_index=True,
+            )
+        for doc in docs[i : i + BATCH_SIZE]:
+            chunks += len(splitter.split_documents([doc]))
+    return chunks
+
+
+def shared(docs, splitter_type, chunk_size, chunk_overlap, encoding_name):
+    chunks = 0
+    for i in range(0, len(docs), BATCH_SIZE):
+        splitter = get_text_splitter(
+            splitter_type, chunk_size, chunk_overlap, encoding_name
+        )
+        for doc_chunks in split_document_batch(splitter, docs[i : i + BATCH_SIZE]):
+            chunks += len(doc_chunks)
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--encoding", default="cl100k_base")
+    args = parser.parse_args()
+
+    docs = make_corpus(args.docs, args.words)
+    print(f"{len(docs)} documents, {sum(len(d.page_content) for d in docs):,} chars")
+
+    for splitter_type in ["token", "character"]:
+        results = {}
+        for name, func in [("baseline", baseline), ("shared", shared)]:
+            start = time.perf_counter()
+            chunks = func(
+                docs, splitter_type, args.chunk_size, args.chunk_overlap, args.encoding
+            )
+            results[name] = (time.perf_counter() - start, chunks)
+
+        (base_time, base_chunks), (new_time, new_chunks) = (
+            results["baseline"],
+            results["shared"],
+        )
+        print(
+            f"{splitter_type:>9}: baseline {base_time:7.2f}s ({base_chunks} chunks), "
+            f"shared {new_time:7.2f}s ({new_chunks} chunks), "
+            f"{base_time / new_time:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1644,6 +1644,12 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Upper bound on threads used for blocking vector DB, embedding and reranking
+# calls made from async request handlers.
+VECTOR_DB_EXECUTOR_MAX_WORKERS = int(
+    os.environ.get("VECTOR_DB_EXECUTOR_MAX_WORKERS", "16")
+)
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -1807,6 +1813,14 @@ ENABLE_RAG_HYBRID_SEARCH = PersistentConfig(
     os.environ.get("ENABLE_RAG_HYBRID_SEARCH", "").lower() == "true",
 )
 
+# Persistent inverted index used for the BM25 side of hybrid search. The index
+# lives next to the app data, so point RAG_BM25_INDEX_DIR to a shared volume
+# when several replicas serve the same vector DB.
+ENABLE_RAG_BM25_INDEX = (
+    os.environ.get("ENABLE_RAG_BM25_INDEX", "True").lower() == "true"
+)
+RAG_BM25_INDEX_DIR = os.environ.get("RAG_BM25_INDEX_DIR", f"{CACHE_DIR}/bm25")
+
 RAG_FULL_CONTEXT = PersistentConfig(
     "RAG_FULL_CONTEXT",
     "rag.full_context",
@@ -1884,6 +1898,80 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Content-hash embedding cache: an in-memory LRU (entries) in front of an
+# optional shared tier ("disk" or "redis").
+RAG_EMBEDDING_CACHE_SIZE = int(os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "10000"))
+RAG_EMBEDDING_CACHE_BACKEND = os.environ.get("RAG_EMBEDDING_CACHE_BACKEND", "").lower()
+RAG_EMBEDDING_CACHE_DIR = os.environ.get(
+    "RAG_EMBEDDING_CACHE_DIR", f"{CACHE_DIR}/embeddings"
+)
+RAG_EMBEDDING_CACHE_DISK_SIZE = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_DISK_SIZE", "500000")
+)
+RAG_EMBEDDING_CACHE_REDIS_TTL = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_REDIS_TTL", str(7 * 24 * 60 * 60))
+)
+
+# Background processing of uploaded files ("sql", "memory" or "" to always
+# process inline): worker threads per process, jobs running per user, and
+# how long a job may stay in processing before it is considered orphaned.
+FILE_INGESTION_QUEUE_BACKEND = os.environ.get(
+    "FILE_INGESTION_QUEUE_BACKEND", "sql"
+).lower()
+FILE_INGESTION_WORKERS = int(os.environ.get("FILE_INGESTION_WORKERS", "2"))
+FILE_INGESTION_MAX_JOBS_PER_USER = int(
+    os.environ.get("FILE_INGESTION_MAX_JOBS_PER_USER", "1")
+)
+FILE_INGESTION_JOB_TIMEOUT = int(os.environ.get("FILE_INGESTION_JOB_TIMEOUT", "3600"))
+FILE_INGESTION_MAX_ATTEMPTS = int(os.environ.get("FILE_INGESTION_MAX_ATTEMPTS", "3"))
+
+# Extracted documents of uploaded files, keyed by the file's sha256 and the
+# extraction settings (0 disables the cache).
+RAG_EXTRACTION_CACHE_DIR = os.environ.get(
+    "RAG_EXTRACTION_CACHE_DIR", f"{CACHE_DIR}/extraction"
+)
+RAG_EXTRACTION_CACHE_SIZE_MB = int(
+    os.environ.get("RAG_EXTRACTION_CACHE_SIZE_MB", "1024")
+)
+
+# ColBERT document token matrices, keyed by model and chunk content, reused
+# across reranking calls (0 disables the cache).
+RAG_COLBERT_CACHE_DIR = os.environ.get("RAG_COLBERT_CACHE_DIR", f"{CACHE_DIR}/colbert")
+RAG_COLBERT_CACHE_SIZE_MB = int(os.environ.get("RAG_COLBERT_CACHE_SIZE_MB", "1024"))
+
+# Ingestion pipeline: chunks handed to the embedding function per call, and
+# batches allowed to wait between stages before the producer blocks.
+RAG_INGESTION_EMBED_BATCH_SIZE = int(
+    os.environ.get("RAG_INGESTION_EMBED_BATCH_SIZE", "256")
+)
+RAG_INGESTION_QUEUE_SIZE = int(os.environ.get("RAG_INGESTION_QUEUE_SIZE", "4"))
+RAG_INGESTION_INSERT_WORKERS = int(os.environ.get("RAG_INGESTION_INSERT_WORKERS", "4"))
+# Files extracted in parallel by the batch processing endpoint.
+RAG_BATCH_EXTRACTION_WORKERS = int(os.environ.get("RAG_BATCH_EXTRACTION_WORKERS", "4"))
+
+# Remote (ollama / openai) embedding requests: batches in flight per process,
+# retries with exponential backoff on 429 and 5xx, and per request timeout.
+RAG_EMBEDDING_CONCURRENCY = int(os.environ.get("RAG_EMBEDDING_CONCURRENCY", "4"))
+RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "5"))
+RAG_EMBEDDING_RETRY_BACKOFF = float(
+    os.environ.get("RAG_EMBEDDING_RETRY_BACKOFF", "0.5")
+)
+RAG_EMBEDDING_TIMEOUT = int(os.environ.get("RAG_EMBEDDING_TIMEOUT", "300"))
+
+# Retrieval result cache ("memory" or "redis", empty to disable). Entries are
+# invalidated by collection writes and expire after the TTL (seconds).
+RAG_RETRIEVAL_CACHE_BACKEND = os.environ.get("RAG_RETRIEVAL_CACHE_BACKEND", "").lower()
+RAG_RETRIEVAL_CACHE_SIZE = int(os.environ.get("RAG_RETRIEVAL_CACHE_SIZE", "1000"))
+RAG_RETRIEVAL_CACHE_TTL = int(os.environ.get("RAG_RETRIEVAL_CACHE_TTL", "600"))
+
+# Micro-batching of local embedding / reranking model calls: concurrent calls
+# are collected for up to MAX_WAIT_MS or MAX_BATCH_SIZE items and run together.
+ENABLE_RAG_INFERENCE_BATCHING = (
+    os.environ.get("ENABLE_RAG_INFERENCE_BATCHING", "True").lower() == "true"
+)
+RAG_INFERENCE_MAX_BATCH_SIZE = int(os.environ.get("RAG_INFERENCE_MAX_BATCH_SIZE", "64"))
+RAG_INFERENCE_MAX_WAIT_MS = float(os.environ.get("RAG_INFERENCE_MAX_WAIT_MS", "5"))
+
 RAG_RERANKING_MODEL = PersistentConfig(
     "RAG_RERANKING_MODEL",
     "rag.reranking_model",
@@ -425,6 +425,20 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Realtime saves of a streamed message are coalesced: written at most every
+# interval (seconds) unless max bytes of new content have piled up, and when
+# the response completes or is cancelled.
+REALTIME_CHAT_SAVE_INTERVAL = float(os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1"))
+REALTIME_CHAT_SAVE_MAX_BYTES = int(
+    os.environ.get("REALTIME_CHAT_SAVE_MAX_BYTES", "8192")
+)
+
+# Seconds between full content block snapshots sent to clients streaming
+# block deltas (stream_protocol "delta"); 0 sends only the initial one.
+CHAT_STREAM_SNAPSHOT_INTERVAL = float(
+    os.environ.get("CHAT_STREAM_SNAPSHOT_INTERVAL", "5")
+)
+
 ####################################
 # REDIS
 ####################################
@@ -586,6 +600,12 @@ PYTORCH_CUDA_ALLOC_CONF = os.environ.get("PYTORCH_CUDA_ALLOC_CONF", "expandable_
 OCR_ENGINE = os.environ.get("OCR_ENGINE","easyocr")
 CACHE_EXPIRY_DAYS = int(os.environ.get("CACHE_EXPIRY_DAYS",7))
 OCR_TIMEOUT = int(os.environ.get("OCR_TIMEOUT",700))
+# PDF pages whose text layer has fewer characters than this are OCR'd.
+PDF_OCR_MIN_TEXT_CHARS = int(os.environ.get("PDF_OCR_MIN_TEXT_CHARS", 50))
+# CPU OCR worker processes (0 = as many as cores and available memory allow,
+# 1 = OCR in-process) and the memory budget of one worker and its reader.
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", 0))
+OCR_WORKER_MEMORY_MB = int(os.environ.get("OCR_WORKER_MEMORY_MB", 1500))
 
 ####################################
 # SAFE EXECUTION CONFIG
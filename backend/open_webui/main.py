@@ -62,6 +62,7 @@ from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
 from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
+    emit_to_user,
     periodic_usage_pool_cleanup,
 )
 from open_webui.tasks import periodic_file_cleanup
@@ -97,6 +98,10 @@ from open_webui.routers.retrieval import (
     get_ef,
     get_rf,
 )
+from open_webui.retrieval.cache import get_embedding_cache, get_extraction_cache
+from open_webui.utils.ingestion import get_ingestion_queue
+from open_webui.retrieval.result_cache import get_retrieval_cache
+from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 from open_webui.retrieval.web.google_pse import search_google_pse
 
 from open_webui.internal.db import Session, engine
@@ -196,6 +201,21 @@ from open_webui.config import (
     RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
     RAG_EMBEDDING_ENGINE,
     RAG_EMBEDDING_BATCH_SIZE,
+    RAG_EMBEDDING_CACHE_SIZE,
+    RAG_EMBEDDING_CACHE_BACKEND,
+    RAG_EMBEDDING_CACHE_DIR,
+    RAG_EMBEDDING_CACHE_DISK_SIZE,
+    RAG_EMBEDDING_CACHE_REDIS_TTL,
+    RAG_EXTRACTION_CACHE_DIR,
+    RAG_EXTRACTION_CACHE_SIZE_MB,
+    FILE_INGESTION_QUEUE_BACKEND,
+    FILE_INGESTION_WORKERS,
+    FILE_INGESTION_MAX_JOBS_PER_USER,
+    FILE_INGESTION_JOB_TIMEOUT,
+    FILE_INGESTION_MAX_ATTEMPTS,
+    RAG_RETRIEVAL_CACHE_BACKEND,
+    RAG_RETRIEVAL_CACHE_SIZE,
+    RAG_RETRIEVAL_CACHE_TTL,
     RAG_RELEVANCE_THRESHOLD,
     RAG_FILE_MAX_COUNT,
     RAG_FILE_MAX_SIZE,
@@ -491,9 +511,14 @@ async def lifespan(app: FastAPI):
 
     asyncio.create_task(periodic_usage_pool_cleanup())
     asyncio.create_task(periodic_file_cleanup())
+    if app.state.INGESTION_QUEUE is not None:
+        app.state.INGESTION_QUEUE.start()
     verify_google_pse(app)
     yield
 
+    if app.state.INGESTION_QUEUE is not None:
+        await app.state.INGESTION_QUEUE.stop()
+
 
 app = FastAPI(
     docs_url="/docs" if ENV == "dev" else None,
@@ -630,6 +655,7 @@ app.state.AUTH_TRUSTED_NAME_HEADER = WEBUI_AUTH_TRUSTED_NAME_HEADER
 app.state.USER_COUNT = None
 app.state.TOOLS = {}
 app.state.FUNCTIONS = {}
+app.state.FUNCTION_VALVES = {}
 
 ########################################
 #
@@ -724,6 +750,10 @@ app.state.config.FIRECRAWL_API_KEY = FIRECRAWL_API_KEY
 app.state.config.TAVILY_EXTRACT_DEPTH = TAVILY_EXTRACT_DEPTH
 
 app.state.EMBEDDING_FUNCTION = None
+app.state.EMBEDDING_CACHE = None
+app.state.RETRIEVAL_CACHE = None
+app.state.EXTRACTION_CACHE = None
+app.state.INGESTION_QUEUE = None
 app.state.ef = None
 app.state.rf = None
 
@@ -746,6 +776,63 @@ except Exception as e:
     pass
 
 
+try:
+    app.state.EMBEDDING_CACHE = get_embedding_cache(
+        RAG_EMBEDDING_CACHE_BACKEND,
+        RAG_EMBEDDING_CACHE_SIZE,
+        disk_dir=RAG_EMBEDDING_CACHE_DIR,
+        disk_size=RAG_EMBEDDING_CACHE_DISK_SIZE,
+        redis_url=REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+        redis_ttl=RAG_EMBEDDING_CACHE_REDIS_TTL,
+    )
+except Exception as e:
+    log.error(f"Error initializing embedding cache: {e}")
+
+try:
+    app.state.RETRIEVAL_CACHE = get_retrieval_cache(
+        RAG_RETRIEVAL_CACHE_BACKEND,
+        RAG_RETRIEVAL_CACHE_SIZE,
+        RAG_RETRIEVAL_CACHE_TTL,
+        redis_url=REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+    )
+    if app.state.RETRIEVAL_CACHE is not None:
+        # Writes to a collection invalidate its cached results.
+        VECTOR_DB_CLIENT.add_listener(app.state.RETRIEVAL_CACHE)
+except Exception as e:
+    log.error(f"Error initializing retrieval cache: {e}")
+
+
+async def emit_ingestion_event(job):
+    await emit_to_user(job.user_id, "file-ingestion", job.model_dump())
+
+
+try:
+    app.state.INGESTION_QUEUE = get_ingestion_queue(
+        FILE_INGESTION_QUEUE_BACKEND,
+        files.get_ingestion_job_handler(app),
+        workers=FILE_INGESTION_WORKERS,
+        max_jobs_per_user=FILE_INGESTION_MAX_JOBS_PER_USER,
+        job_timeout=FILE_INGESTION_JOB_TIMEOUT,
+        max_attempts=FILE_INGESTION_MAX_ATTEMPTS,
+        on_event=emit_ingestion_event,
+    )
+except Exception as e:
+    log.error(f"Error initializing file ingestion queue: {e}")
+
+try:
+    app.state.EXTRACTION_CACHE = get_extraction_cache(
+        RAG_EXTRACTION_CACHE_DIR, RAG_EXTRACTION_CACHE_SIZE_MB
+    )
+except Exception as e:
+    log.error(f"Error initializing extraction cache: {e}")
+
+
 app.state.EMBEDDING_FUNCTION = get_embedding_function(
     app.state.config.RAG_EMBEDDING_ENGINE,
     app.state.config.RAG_EMBEDDING_MODEL,
@@ -761,6 +848,7 @@ app.state.EMBEDDING_FUNCTION = get_embedding_function(
         else app.state.config.RAG_OLLAMA_API_KEY
     ),
     app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+    app.state.EMBEDDING_CACHE,
 )
 
 ########################################
@@ -1177,6 +1265,8 @@ async def chat_completion(
             "chat_id": form_data.pop("chat_id", None),
             "message_id": form_data.pop("id", None),
             "session_id": form_data.pop("session_id", None),
+            # "delta" streams content block operations instead of full content.
+            "stream_protocol": form_data.pop("stream_protocol", None),
             "tool_ids": form_data.get("tool_ids", None),
             "tool_servers": form_data.pop("tool_servers", None),
             "files": form_data.get("files", None),
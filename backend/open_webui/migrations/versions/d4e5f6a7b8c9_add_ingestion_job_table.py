@@ -0,0 +1,37 @@
+"""Add ingestion_job table
+
+Revision ID: d4e5f6a7b8c9
+Revises: 3781e22d8b01, b8a2c3f2d1a4
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d4e5f6a7b8c9"
+down_revision = ("3781e22d8b01", "b8a2c3f2d1a4")
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingestion_job",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True, unique=True),
+        sa.Column("file_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_ingestion_job_file_id", "ingestion_job", ["file_id"])
+    op.create_index("ix_ingestion_job_status", "ingestion_job", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_ingestion_job_status", table_name="ingestion_job")
+    op.drop_index("ix_ingestion_job_file_id", table_name="ingestion_job")
+    op.drop_table("ingestion_job")
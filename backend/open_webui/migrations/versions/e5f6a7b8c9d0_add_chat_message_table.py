@@ -0,0 +1,138 @@
+"""Add chat_message table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, select
+
+revision = "e5f6a7b8c9d0"
+down_revision = "d4e5f6a7b8c9"
+branch_labels = None
+depends_on = None
+
+
+chat_table = table(
+    "chat",
+    sa.Column("id", sa.String(), primary_key=True),
+    sa.Column("chat", sa.JSON()),
+)
+
+chat_message_table = table(
+    "chat_message",
+    sa.Column("chat_id", sa.String()),
+    sa.Column("id", sa.String()),
+    sa.Column("parent_id", sa.String()),
+    sa.Column("content", sa.Text()),
+    sa.Column("data", sa.JSON()),
+    sa.Column("created_at", sa.BigInteger()),
+    sa.Column("updated_at", sa.BigInteger()),
+)
+
+
+def upgrade():
+    op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.String(), nullable=False),
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("parent_id", sa.String(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "id", name="pk_chat_id_id"),
+    )
+
+    # Move the messages out of every chat's JSON, one chat at a time so
+    # large installations are not loaded into memory at once.
+    connection = op.get_bind()
+    now = int(time.time())
+    chat_ids = [row.id for row in connection.execute(select(chat_table.c.id))]
+    for chat_id in chat_ids:
+        chat = connection.execute(
+            select(chat_table.c.chat).where(chat_table.c.id == chat_id)
+        ).scalar()
+
+        history = chat.get("history") if isinstance(chat, dict) else None
+        if not isinstance(history, dict) or not isinstance(
+            history.get("messages"), dict
+        ):
+            continue
+
+        rows = []
+        for message_id, message in history["messages"].items():
+            content = message.get("content")
+            if isinstance(content, str):
+                data = {k: v for k, v in message.items() if k != "content"}
+            else:
+                content, data = None, message
+
+            timestamp = message.get("timestamp")
+            rows.append(
+                {
+                    "chat_id": chat_id,
+                    "id": message_id,
+                    "parent_id": message.get("parentId"),
+                    "content": content,
+                    "data": data,
+                    "created_at": timestamp if isinstance(timestamp, int) else now,
+                    "updated_at": now,
+                }
+            )
+        if rows:
+            connection.execute(sa.insert(chat_message_table), rows)
+
+        chat = {
+            **chat,
+            "history": {k: v for k, v in history.items() if k != "messages"},
+        }
+        if "messages" in chat:
+            chat["messages"] = []
+        connection.execute(
+            sa.update(chat_table).where(chat_table.c.id == chat_id).values(chat=chat)
+        )
+
+
+def downgrade():
+    connection = op.get_bind()
+    chat_ids = [row.id for row in connection.execute(select(chat_table.c.id))]
+    for chat_id in chat_ids:
+        chat = connection.execute(
+            select(chat_table.c.chat).where(chat_table.c.id == chat_id)
+        ).scalar()
+
+        history = chat.get("history") if isinstance(chat, dict) else None
+        if not isinstance(history, dict) or "messages" in history:
+            continue
+
+        messages = {}
+        for row in connection.execute(
+            select(chat_message_table)
+            .where(chat_message_table.c.chat_id == chat_id)
+            .order_by(chat_message_table.c.created_at)
+        ):
+            message = dict(row.data or {})
+            if row.content is not None:
+                message["content"] = row.content
+            messages[row.id] = message
+
+        chat = {**chat, "history": {**history, "messages": messages}}
+        if "messages" in chat:
+            path = []
+            message_id = history.get("currentId")
+            while message_id in messages and len(path) <= len(messages):
+                path.append(messages[message_id])
+                message_id = messages[message_id].get("parentId")
+            chat["messages"] = path[::-1]
+
+        connection.execute(
+            sa.update(chat_table).where(chat_table.c.id == chat_id).values(chat=chat)
+        )
+
+    op.drop_table("chat_message")
@@ -9,7 +9,15 @@ from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    PrimaryKeyConstraint,
+    String,
+    Text,
+    JSON,
+)
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -59,6 +67,196 @@ class ChatModel(BaseModel):
     folder_id: Optional[str] = None
 
 
+class ChatMessage(Base):
+    """
+    One message of a chat's history. The chat's JSON keeps everything else,
+    so writing a message touches a single row instead of the whole history.
+    """
+
+    __tablename__ = "chat_message"
+
+    chat_id = Column(String)
+    id = Column(String)
+    parent_id = Column(String, nullable=True)
+
+    # Text content has its own column (searchable, cheap to update); the
+    # rest of the message is kept as is.
+    content = Column(Text, nullable=True)
+    data = Column(JSON)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (PrimaryKeyConstraint("chat_id", "id", name="pk_chat_id_id"),)
+
+
+def _split_chat(chat: dict) -> tuple[dict, Optional[dict]]:
+    """
+    The chat JSON to store and its messages (None when the chat has no
+    message history, e.g. the legacy format).
+    """
+    history = chat.get("history") if isinstance(chat, dict) else None
+    if not isinstance(history, dict) or not isinstance(history.get("messages"), dict):
+        return chat, None
+
+    stored = {
+        **chat,
+        "history": {k: v for k, v in history.items() if k != "messages"},
+    }
+    if "messages" in chat:
+        # The message list is the path to the current message; it is
+        # rebuilt from the history when the chat is loaded.
+        stored["messages"] = []
+    return stored, history["messages"]
+
+
+def _is_split(chat: dict) -> bool:
+    history = chat.get("history") if isinstance(chat, dict) else None
+    return isinstance(history, dict) and "messages" not in history
+
+
+def _message_list(messages: dict, message_id: Optional[str]) -> list[dict]:
+    path = []
+    while message_id is not None and message_id in messages:
+        message = messages[message_id]
+        path.append(message)
+        message_id = message.get("parentId")
+        if len(path) > len(messages):
+            break
+    return path[::-1]
+
+
+def _assemble_chat(chat: dict, messages: dict) -> dict:
+    history = {**chat["history"], "messages": messages}
+    assembled = {**chat, "history": history}
+    if "messages" in chat:
+        assembled["messages"] = _message_list(messages, history.get("currentId"))
+    return assembled
+
+
+def _row_message(row: ChatMessage) -> dict:
+    if row.content is None:
+        return dict(row.data or {})
+    return {**(row.data or {}), "content": row.content}
+
+
+def _row_values(message: dict) -> dict:
+    content = message.get("content")
+    if isinstance(content, str):
+        data = {k: v for k, v in message.items() if k != "content"}
+    else:
+        content, data = None, message
+    return {"parent_id": message.get("parentId"), "content": content, "data": data}
+
+
+def _created_at(message: dict, now: int) -> int:
+    timestamp = message.get("timestamp")
+    return timestamp if isinstance(timestamp, int) else now
+
+
+def _load_messages(db, chat: Chat) -> dict:
+    if not _is_split(chat.chat):
+        return (chat.chat or {}).get("history", {}).get("messages", {}) or {}
+
+    rows = (
+        db.query(ChatMessage)
+        .filter_by(chat_id=chat.id)
+        .order_by(ChatMessage.created_at)
+        .all()
+    )
+    return {row.id: _row_message(row) for row in rows}
+
+
+def _save_messages(db, chat_id: str, messages: dict):
+    """Write the rows of the messages that changed and drop the removed ones."""
+    now = int(time.time())
+    existing = {
+        row.id: row for row in db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+    }
+
+    for message_id, message in messages.items():
+        values = _row_values(message)
+        row = existing.pop(message_id, None)
+        if row is None:
+            db.add(
+                ChatMessage(
+                    chat_id=chat_id,
+                    id=message_id,
+                    created_at=_created_at(message, now),
+                    updated_at=now,
+                    **values,
+                )
+            )
+        elif any(getattr(row, key) != value for key, value in values.items()):
+            for key, value in values.items():
+                setattr(row, key, value)
+            row.updated_at = now
+
+    for row in existing.values():
+        db.delete(row)
+
+
+def _ensure_split(db, chat: Chat):
+    """Move the messages of a chat still stored as a single JSON to rows."""
+    if _is_split(chat.chat):
+        return
+
+    history = (chat.chat or {}).get("history")
+    history = history if isinstance(history, dict) else {}
+    stored, messages = _split_chat(
+        {
+            **(chat.chat or {}),
+            "history": {**history, "messages": history.get("messages") or {}},
+        }
+    )
+    chat.chat = stored
+    _save_messages(db, chat.id, messages)
+
+
+def _copy_messages(db, from_id: str, to_id: str):
+    db.query(ChatMessage).filter_by(chat_id=to_id).delete()
+    for row in db.query(ChatMessage).filter_by(chat_id=from_id).all():
+        db.add(
+            ChatMessage(
+                chat_id=to_id,
+                id=row.id,
+                parent_id=row.parent_id,
+                content=row.content,
+                data=row.data,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+            )
+        )
+
+
+def _delete_messages(db, *criteria):
+    db.query(ChatMessage).filter(
+        ChatMessage.chat_id.in_(select(Chat.id).where(*criteria))
+    ).delete(synchronize_session=False)
+
+
+def _with_messages(db, chats: list[Chat]) -> list[ChatModel]:
+    """The chats with their message history assembled from the rows."""
+    models = [ChatModel.model_validate(chat) for chat in chats]
+    messages = {model.id: {} for model in models if _is_split(model.chat)}
+
+    ids = list(messages)
+    for i in range(0, len(ids), 500):
+        rows = (
+            db.query(ChatMessage)
+            .filter(ChatMessage.chat_id.in_(ids[i : i + 500]))
+            .order_by(ChatMessage.created_at)
+            .all()
+        )
+        for row in rows:
+            messages[row.chat_id][row.id] = _row_message(row)
+
+    for model in models:
+        if model.id in messages:
+            model.chat = _assemble_chat(model.chat, messages[model.id])
+    return models
+
+
 ####################
 # Forms
 ####################
@@ -123,11 +321,14 @@ class ChatTable:
                 }
             )
 
-            result = Chat(**chat.model_dump())
+            stored, messages = _split_chat(chat.chat)
+            result = Chat(**{**chat.model_dump(), "chat": stored})
             db.add(result)
+            if messages is not None:
+                _save_messages(db, id, messages)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+            return _with_messages(db, [result])[0] if result else None
 
     def import_chat(
         self, user_id: str, form_data: ChatImportForm
@@ -152,23 +353,28 @@ class ChatTable:
                 }
             )
 
-            result = Chat(**chat.model_dump())
+            stored, messages = _split_chat(chat.chat)
+            result = Chat(**{**chat.model_dump(), "chat": stored})
             db.add(result)
+            if messages is not None:
+                _save_messages(db, id, messages)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+            return _with_messages(db, [result])[0] if result else None
 
     def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat_item = db.get(Chat, id)
-                chat_item.chat = chat
+                stored, messages = _split_chat(chat)
+                chat_item.chat = stored
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+                _save_messages(db, id, messages or {})
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return _with_messages(db, [chat_item])[0]
         except Exception:
             return None
 
@@ -210,61 +416,86 @@ class ChatTable:
         return chat.chat.get("title", "New Chat")
 
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            chat = db.get(Chat, id)
+            if chat is None:
+                return None
 
-        return chat.chat.get("history", {}).get("messages", {}) or {}
+            return _load_messages(db, chat)
 
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            row = db.get(ChatMessage, (id, message_id))
+            if row is not None:
+                return _row_message(row)
 
-        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+            chat = db.get(Chat, id)
+            if chat is None:
+                return None
+
+            return _load_messages(db, chat).get(message_id, {})
 
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
-
-        history["currentId"] = message_id
+    ) -> Optional[dict]:
+        """Merge ``message`` into the message's row; returns the message."""
+        with get_db() as db:
+            chat = db.get(Chat, id)
+            if chat is None:
+                return None
+            _ensure_split(db, chat)
+
+            now = int(time.time())
+            row = db.get(ChatMessage, (id, message_id))
+            if row is None:
+                row = ChatMessage(
+                    chat_id=id,
+                    id=message_id,
+                    created_at=_created_at(message, now),
+                    **_row_values(message),
+                )
+                db.add(row)
+            else:
+                for key, value in _row_values({**_row_message(row), **message}).items():
+                    setattr(row, key, value)
+            row.updated_at = now
+
+            history = chat.chat["history"]
+            if history.get("currentId") != message_id:
+                chat.chat = {
+                    **chat.chat,
+                    "history": {**history, "currentId": message_id},
+                }
+            chat.updated_at = now
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+            db.commit()
+            return _row_message(row)
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
+    ) -> Optional[dict]:
+        with get_db() as db:
+            chat = db.get(Chat, id)
+            if chat is None:
+                return None
+            _ensure_split(db, chat)
+
+            row = db.get(ChatMessage, (id, message_id))
+            if row is not None:
+                row.data = {
+                    **(row.data or {}),
+                    "statusHistory": [
+                        *(row.data or {}).get("statusHistory", []),
+                        status,
+                    ],
+                }
+                row.updated_at = int(time.time())
+                chat.updated_at = row.updated_at
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+            db.commit()
+            return _row_message(row) if row is not None else {}
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -286,6 +517,7 @@ class ChatTable:
             )
             shared_result = Chat(**shared_chat.model_dump())
             db.add(shared_result)
+            _copy_messages(db, chat_id, shared_chat.id)
             db.commit()
             db.refresh(shared_result)
 
@@ -296,7 +528,11 @@ class ChatTable:
                 .update({"share_id": shared_chat.id})
             )
             db.commit()
-            return shared_chat if (shared_result and result) else None
+            return (
+                _with_messages(db, [shared_result])[0]
+                if (shared_result and result)
+                else None
+            )
 
     def update_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         try:
@@ -311,18 +547,20 @@ class ChatTable:
 
                 shared_chat.title = chat.title
                 shared_chat.chat = chat.chat
+                _copy_messages(db, chat_id, shared_chat.id)
 
                 shared_chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(shared_chat)
 
-                return ChatModel.model_validate(shared_chat)
+                return _with_messages(db, [shared_chat])[0]
         except Exception:
             return None
 
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
+                _delete_messages(db, Chat.user_id == f"shared-{chat_id}")
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
@@ -339,7 +577,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -351,7 +589,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -363,7 +601,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -466,7 +704,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -488,7 +726,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -499,7 +737,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return _with_messages(db, list(all_chats))
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -508,7 +746,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return _with_messages(db, list(all_chats))
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -517,7 +755,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return _with_messages(db, list(all_chats))
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -526,7 +764,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return _with_messages(db, list(all_chats))
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -583,6 +821,12 @@ class ChatTable:
                                 FROM json_each(Chat.chat, '$.messages') AS message 
                                 WHERE LOWER(message.value->>'content') LIKE '%' || :search_text || '%'
                             )
+                            OR EXISTS (
+                                SELECT 1
+                                FROM chat_message
+                                WHERE chat_message.chat_id = Chat.id
+                                AND LOWER(chat_message.content) LIKE '%' || :search_text || '%'
+                            )
                             """
                         )
                     ).params(search_text=search_text)
@@ -632,6 +876,12 @@ class ChatTable:
                                 FROM json_array_elements(Chat.chat->'messages') AS message
                                 WHERE LOWER(message->>'content') LIKE '%' || :search_text || '%'
                             )
+                            OR EXISTS (
+                                SELECT 1
+                                FROM chat_message
+                                WHERE chat_message.chat_id = Chat.id
+                                AND LOWER(chat_message.content) LIKE '%' || :search_text || '%'
+                            )
                             """
                         )
                     ).params(search_text=search_text)
@@ -705,7 +955,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return _with_messages(db, list(all_chats))
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -718,7 +968,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -778,7 +1028,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return _with_messages(db, [chat])[0]
         except Exception:
             return None
 
@@ -854,6 +1104,7 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -864,6 +1115,7 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
+                _delete_messages(db, Chat.id == id, Chat.user_id == user_id)
                 db.query(Chat).filter_by(id=id, user_id=user_id).delete()
                 db.commit()
 
@@ -876,6 +1128,7 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                _delete_messages(db, Chat.user_id == user_id)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -888,6 +1141,9 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                _delete_messages(
+                    db, Chat.user_id == user_id, Chat.folder_id == folder_id
+                )
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -901,6 +1157,7 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
+                _delete_messages(db, Chat.user_id.in_(shared_chat_ids))
                 db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
                 db.commit()
 
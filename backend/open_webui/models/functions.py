@@ -180,7 +180,10 @@ class FunctionsTable:
             try:
                 function = db.get(Function, id)
                 function.valves = valves
-                function.updated_at = int(time.time())
+                # Cached valves are keyed by updated_at: always move it on.
+                function.updated_at = max(
+                    int(time.time()), (function.updated_at or 0) + 1
+                )
                 db.commit()
                 db.refresh(function)
                 return self.get_function_by_id(id)
@@ -0,0 +1,203 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Integer, String, Text, func
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Ingestion Job DB Schema
+####################
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_job"
+
+    id = Column(String, primary_key=True)
+    file_id = Column(String, index=True)
+    user_id = Column(String)
+
+    # pending -> processing -> completed | failed
+    status = Column(String, index=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class IngestionJobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    file_id: str
+    user_id: str
+
+    status: str
+    error: Optional[str] = None
+    attempts: int = 0
+
+    created_at: int  # timestamp in epoch (ns)
+    updated_at: int  # timestamp in epoch (ns)
+
+
+####################
+# Ingestion Job Store
+####################
+
+
+def new_ingestion_job(file_id: str, user_id: str) -> IngestionJobModel:
+    now = time.time_ns()
+    return IngestionJobModel(
+        id=str(uuid.uuid4()),
+        file_id=file_id,
+        user_id=user_id,
+        status="pending",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class IngestionJobsTable:
+    """
+    Durable job store. Jobs are claimed with a conditional update, so several
+    app processes can share the same queue.
+    """
+
+    def insert_new_job(self, file_id: str, user_id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            try:
+                result = IngestionJob(
+                    **new_ingestion_job(file_id, user_id).model_dump()
+                )
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return IngestionJobModel.model_validate(result)
+            except Exception as e:
+                log.exception(f"Error inserting a new ingestion job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            job = db.get(IngestionJob, id)
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def get_latest_job_by_file_id(self, file_id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            job = (
+                db.query(IngestionJob)
+                .filter_by(file_id=file_id)
+                .order_by(IngestionJob.created_at.desc())
+                .first()
+            )
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def claim_next_job(self, max_jobs_per_user: int) -> Optional[IngestionJobModel]:
+        """
+        Mark the next pending job as processing and return it. Users with the
+        fewest running jobs go first, so one user's bulk upload cannot starve
+        everyone else; users at ``max_jobs_per_user`` are skipped.
+        """
+        with get_db() as db:
+            running = dict(
+                db.query(IngestionJob.user_id, func.count(IngestionJob.id))
+                .filter_by(status="processing")
+                .group_by(IngestionJob.user_id)
+                .all()
+            )
+            waiting = (
+                db.query(IngestionJob.user_id, func.min(IngestionJob.created_at))
+                .filter_by(status="pending")
+                .group_by(IngestionJob.user_id)
+                .all()
+            )
+            users = sorted(
+                (running.get(user_id, 0), oldest, user_id)
+                for user_id, oldest in waiting
+                if running.get(user_id, 0) < max_jobs_per_user
+            )
+
+            for _, _, user_id in users:
+                job = (
+                    db.query(IngestionJob)
+                    .filter_by(user_id=user_id, status="pending")
+                    .order_by(IngestionJob.created_at)
+                    .first()
+                )
+                if job is None:
+                    continue
+
+                claimed = (
+                    db.query(IngestionJob)
+                    .filter_by(id=job.id, status="pending")
+                    .update(
+                        {
+                            "status": "processing",
+                            "attempts": IngestionJob.attempts + 1,
+                            "updated_at": time.time_ns(),
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    # Another process may have claimed it first.
+                    return IngestionJobModel.model_validate(
+                        db.get(IngestionJob, job.id)
+                    )
+            return None
+
+    def update_job_status(
+        self, id: str, status: str, error: Optional[str] = None
+    ) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            db.query(IngestionJob).filter_by(id=id).update(
+                {"status": status, "error": error, "updated_at": time.time_ns()}
+            )
+            db.commit()
+            job = db.get(IngestionJob, id)
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def touch_job(self, id: str) -> None:
+        """Mark a running job as alive so it is not recovered as stale."""
+        with get_db() as db:
+            db.query(IngestionJob).filter_by(id=id, status="processing").update(
+                {"updated_at": time.time_ns()}, synchronize_session=False
+            )
+            db.commit()
+
+    def requeue_stale_jobs(self, timeout: int, max_attempts: int) -> int:
+        """
+        Return jobs whose process stopped refreshing them for ``timeout``
+        seconds (it died) to the queue, or fail them after ``max_attempts``.
+        """
+        cutoff = time.time_ns() - timeout * 1_000_000_000
+        with get_db() as db:
+            stale = db.query(IngestionJob).filter(
+                IngestionJob.status == "processing",
+                IngestionJob.updated_at < cutoff,
+            )
+            failed = stale.filter(IngestionJob.attempts >= max_attempts).update(
+                {
+                    "status": "failed",
+                    "error": "Processing did not finish",
+                    "updated_at": time.time_ns(),
+                },
+                synchronize_session=False,
+            )
+            requeued = stale.filter(IngestionJob.attempts < max_attempts).update(
+                {"status": "pending", "updated_at": time.time_ns()},
+                synchronize_session=False,
+            )
+            db.commit()
+            return failed + requeued
+
+
+IngestionJobs = IngestionJobsTable()
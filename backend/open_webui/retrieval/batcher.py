@@ -0,0 +1,261 @@
+import logging
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+
+from open_webui.config import (
+    ENABLE_RAG_INFERENCE_BATCHING,
+    RAG_INFERENCE_MAX_BATCH_SIZE,
+    RAG_INFERENCE_MAX_WAIT_MS,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Batcher threads exit after this many idle seconds and restart on demand, so
+# a replaced model (and its batcher) can be garbage collected.
+IDLE_TIMEOUT = 60
+
+
+class _Job:
+    __slots__ = ("items", "key", "merge", "future")
+
+    def __init__(self, items: list, key: Hashable, merge: bool):
+        self.items = items
+        self.key = key
+        self.merge = merge
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """
+    Collects concurrent calls to a local model for up to ``max_wait_ms`` (or
+    until ``max_batch_size`` items are waiting), runs them as one batch on a
+    dedicated thread and hands every caller its slice of the result.
+
+    ``func(items, key)`` must return one result per item, in order. Jobs are
+    only merged with jobs of the same ``key`` (e.g. the same prompt prefix).
+    """
+
+    def __init__(
+        self,
+        func: Callable[[list, Hashable], Any],
+        max_batch_size: int,
+        max_wait_ms: float,
+        name: str = "batcher",
+    ):
+        self.func = func
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0) / 1000
+        self.name = name
+
+        self._queue: queue.Queue[_Job] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name=self.name, daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, items: list, key: Hashable = None, merge: bool = True) -> Any:
+        """Run ``items`` through the model, blocking until the result is ready."""
+        if not items:
+            return []
+
+        job = _Job(items, key, merge)
+        self._queue.put(job)
+        self._ensure_started()
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return job.future.result()
+
+    def _collect(self) -> list[_Job]:
+        first = self._queue.get(timeout=IDLE_TIMEOUT)
+        jobs = [first]
+        if not first.merge:
+            return jobs
+
+        size = len(first.items)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                job = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            jobs.append(job)
+            size += len(job.items)
+        return jobs
+
+    def _run(self, jobs: list[_Job]) -> None:
+        items = [item for job in jobs for item in job.items]
+        try:
+            results = self.func(items, jobs[0].key)
+            if len(results) != len(items):
+                raise ValueError(
+                    f"{self.name}: expected {len(items)} results, got {len(results)}"
+                )
+        except BaseException as e:
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+
+        offset = 0
+        for job in jobs:
+            job.future.set_result(results[offset : offset + len(job.items)])
+            offset += len(job.items)
+
+        with self._lock:
+            self.batches += 1
+            self.items += len(items)
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                collected = self._collect()
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            groups: dict[Hashable, list[_Job]] = {}
+            singles = []
+            for job in collected:
+                if job.merge:
+                    groups.setdefault(job.key, []).append(job)
+                else:
+                    singles.append([job])
+
+            for jobs in [*groups.values(), *singles]:
+                try:
+                    self._run(jobs)
+                except Exception as e:
+                    log.exception(f"{self.name}: batch failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class BatchedEmbeddingModel:
+    """SentenceTransformer look-alike whose ``encode`` goes through a MicroBatcher."""
+
+    def __init__(self, model, max_batch_size: int, max_wait_ms: float):
+        self.model = model
+        self.batcher = MicroBatcher(
+            lambda texts, prompt: model.encode(
+                texts, prompt=prompt, batch_size=max_batch_size
+            ),
+            max_batch_size,
+            max_wait_ms,
+            name="embedding-batcher",
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def encode(self, sentences, prompt: Optional[str] = None, **kwargs):
+        if kwargs:
+            return self.model.encode(sentences, prompt=prompt, **kwargs)
+
+        if isinstance(sentences, str):
+            return np.asarray(self.batcher.submit([sentences], key=prompt))[0]
+        return np.asarray(self.batcher.submit(list(sentences), key=prompt))
+
+
+class BatchedReranker:
+    """CrossEncoder/ColBERT look-alike whose ``predict`` goes through a MicroBatcher."""
+
+    def __init__(self, model, max_batch_size: int, max_wait_ms: float):
+        self.model = model
+        self.batcher = MicroBatcher(
+            lambda pairs, _: self._predict(pairs),
+            max_batch_size,
+            max_wait_ms,
+            name="reranking-batcher",
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def _predict(self, pairs: list) -> list:
+        scores = self.model.predict(pairs)
+        return scores.tolist() if hasattr(scores, "tolist") else list(scores)
+
+    def predict(self, sentences, **kwargs):
+        if kwargs:
+            return self.model.predict(sentences, **kwargs)
+
+        # Scores of models like ColBERT depend on the other documents of the
+        # call, so their calls are serialized but never merged.
+        merge = getattr(self.model, "batchable", True)
+        return np.asarray(
+            self.batcher.submit(list(sentences), merge=merge), dtype=np.float32
+        )
+
+
+_batched_models: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_batched_models_lock = threading.Lock()
+
+
+def _get_batched(model, wrapper_class):
+    if model is None or not ENABLE_RAG_INFERENCE_BATCHING:
+        return model
+    if isinstance(model, (BatchedEmbeddingModel, BatchedReranker)):
+        return model
+
+    with _batched_models_lock:
+        # Kept on the model itself, so the batcher lives exactly as long as it.
+        batched = getattr(model, "_open_webui_batched", None)
+        if batched is None:
+            batched = wrapper_class(
+                model, RAG_INFERENCE_MAX_BATCH_SIZE, RAG_INFERENCE_MAX_WAIT_MS
+            )
+            setattr(model, "_open_webui_batched", batched)
+            _batched_models.add(batched)
+        return batched
+
+
+def get_batched_embedding_model(model):
+    """Shared batching front for a local embedding model (one per model object)."""
+    return _get_batched(model, BatchedEmbeddingModel)
+
+
+def get_batched_reranker(model):
+    """Shared batching front for a local reranking model (one per model object)."""
+    return _get_batched(model, BatchedReranker)
+
+
+def get_batcher_stats() -> list[dict]:
+    with _batched_models_lock:
+        return [
+            {"model": type(batched.model).__name__, **batched.batcher.stats()}
+            for batched in _batched_models
+        ]
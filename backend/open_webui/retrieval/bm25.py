@@ -0,0 +1,361 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.main import GetResult, SearchResult
+from open_webui.retrieval.vector.observer import VectorDBListener
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Okapi BM25 parameters, same defaults as rank_bm25 (used by BM25Retriever).
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Metadata keys that get their own indexed column. Every other key is matched
+# through json_extract on the stored metadata.
+INDEXED_METADATA_KEYS = ("file_id", "session_id")
+
+# Stay well below SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds.
+SQLITE_MAX_PARAMS = 500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS docs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    text TEXT,
+    metadata TEXT,
+    length INTEGER NOT NULL,
+    file_id TEXT,
+    session_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_docs_file_id ON docs (file_id);
+CREATE INDEX IF NOT EXISTS idx_docs_session_id ON docs (session_id);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc);
+"""
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _item_value(item: Any, key: str) -> Any:
+    # Routers pass plain dicts, tests and memories may pass VectorItem models.
+    return item[key] if isinstance(item, dict) else getattr(item, key)
+
+
+def _chunked(values: list, size: int = SQLITE_MAX_PARAMS) -> Iterator[list]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _filter_clause(query_filter: Optional[Dict[str, Any]]) -> tuple[str, list]:
+    """
+    Translate a metadata filter dict to a SQL predicate on the docs table.
+    List values are set membership filters.
+    """
+    clauses = []
+    params = []
+    for key, value in (query_filter or {}).items():
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if not values:
+            clauses.append("0 = 1")
+            continue
+
+        placeholders = ",".join("?" * len(values))
+        if key in INDEXED_METADATA_KEYS:
+            clauses.append(f"d.{key} IN ({placeholders})")
+            params.extend(str(v) for v in values)
+        else:
+            clauses.append(f"json_extract(d.metadata, ?) IN ({placeholders})")
+            params.append('$."{}"'.format(str(key).replace('"', '\\"')))
+            params.extend(values)
+    return (" AND ".join(clauses) if clauses else "1 = 1"), params
+
+
+class BM25Index(VectorDBListener):
+    """
+    Persistent per-collection inverted index used for the lexical side of
+    hybrid search.
+
+    Each collection is stored in its own SQLite file under ``directory``. The
+    index is kept up to date from vector DB writes (see ObservedVectorDBClient)
+    and is built once from ``loader`` the first time a collection that predates
+    the index is searched.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        loader: Optional[Callable[[str], Optional[GetResult]]] = None,
+    ):
+        self.directory = str(directory)
+        self.loader = loader
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self._initialized: set[str] = set()
+
+    def _path(self, collection_name: str) -> str:
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{digest}.db")
+
+    def _lock(self, collection_name: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(collection_name, threading.RLock())
+
+    @contextmanager
+    def _connect(self, collection_name: str) -> Iterator[sqlite3.Connection]:
+        path = self._path(collection_name)
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if path not in self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized.add(path)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    ####################
+    # Writes
+    ####################
+
+    def _remove_ids(self, conn: sqlite3.Connection, ids: list[str]) -> None:
+        for chunk in _chunked(ids):
+            placeholders = ",".join("?" * len(chunk))
+            conn.execute(
+                f"DELETE FROM postings WHERE doc IN "
+                f"(SELECT rowid FROM docs WHERE id IN ({placeholders}))",
+                chunk,
+            )
+            conn.execute(f"DELETE FROM docs WHERE id IN ({placeholders})", chunk)
+
+    def _add(
+        self, conn: sqlite3.Connection, docs: list[tuple], replace: bool = True
+    ) -> None:
+        # docs: (id, text, metadata)
+        if replace:
+            self._remove_ids(conn, [str(doc[0]) for doc in docs])
+        for doc_id, text, metadata in docs:
+            terms = Counter(tokenize(text))
+            metadata = metadata or {}
+            cursor = conn.execute(
+                "INSERT INTO docs (id, text, metadata, length, file_id, session_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    str(doc_id),
+                    text,
+                    json.dumps(metadata, default=str),
+                    sum(terms.values()),
+                    *(
+                        str(metadata[key]) if metadata.get(key) is not None else None
+                        for key in INDEXED_METADATA_KEYS
+                    ),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                [(term, cursor.lastrowid, tf) for term, tf in terms.items()],
+            )
+
+    def _is_complete(self, conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'complete'").fetchone()
+        return row is not None and row[0] == "1"
+
+    def _mark_complete(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('complete', '1')"
+        )
+
+    def rebuild(self, collection_name: str) -> None:
+        """Re-create the index of a collection from the vector DB contents."""
+        if self.loader is None:
+            return
+
+        with self._lock(collection_name):
+            try:
+                result = self.loader(collection_name)
+            except Exception as e:
+                log.warning(f"Could not load collection {collection_name}: {e}")
+                return
+
+            docs = []
+            if result is not None and result.ids:
+                docs = list(
+                    zip(result.ids[0], result.documents[0], result.metadatas[0])
+                )
+
+            with self._connect(collection_name) as conn:
+                conn.execute("DELETE FROM postings")
+                conn.execute("DELETE FROM docs")
+                self._add(conn, docs, replace=False)
+                self._mark_complete(conn)
+
+            log.info(
+                f"BM25 index for collection {collection_name} built with {len(docs)} documents"
+            )
+
+    def on_insert(self, collection_name: str, items: list) -> None:
+        if not items:
+            return
+
+        docs = [
+            (
+                _item_value(item, "id"),
+                _item_value(item, "text"),
+                _item_value(item, "metadata"),
+            )
+            for item in items
+        ]
+        with self._lock(collection_name):
+            with self._connect(collection_name) as conn:
+                self._add(conn, docs)
+
+    def on_delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ) -> None:
+        if not os.path.exists(self._path(collection_name)):
+            return
+
+        with self._lock(collection_name):
+            with self._connect(collection_name) as conn:
+                if ids:
+                    self._remove_ids(conn, [str(doc_id) for doc_id in ids])
+                elif filter:
+                    where, params = _filter_clause(filter)
+                    conn.execute(
+                        "DELETE FROM postings WHERE doc IN "
+                        f"(SELECT d.rowid FROM docs d WHERE {where})",
+                        params,
+                    )
+                    conn.execute(
+                        f"DELETE FROM docs WHERE rowid IN "
+                        f"(SELECT d.rowid FROM docs d WHERE {where})",
+                        params,
+                    )
+
+    def on_delete_collection(self, collection_name: str) -> None:
+        with self._lock(collection_name):
+            path = self._path(collection_name)
+            self._initialized.discard(path)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def on_reset(self) -> None:
+        with self._locks_guard:
+            self._initialized.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.makedirs(self.directory, exist_ok=True)
+
+    ####################
+    # Reads
+    ####################
+
+    def search(
+        self,
+        collection_name: str,
+        query: str,
+        k: int,
+        query_filter: Optional[Dict[str, Any]] = None,
+    ) -> SearchResult:
+        """
+        Return the top ``k`` documents for ``query`` ranked by Okapi BM25.
+
+        Corpus statistics (document count, average length, document frequency)
+        are computed over the documents matching ``query_filter`` so scores
+        match a BM25 built over the filtered collection.
+        """
+        with self._connect(collection_name) as conn:
+            complete = self._is_complete(conn)
+        if not complete:
+            self.rebuild(collection_name)
+
+        ids, documents, metadatas, distances = [], [], [], []
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._connect(collection_name) as conn:
+            where, params = _filter_clause(query_filter)
+            doc_count, total_length = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs d WHERE {where}",
+                params,
+            ).fetchone()
+
+            if terms and doc_count:
+                avg_length = (total_length / doc_count) or 1.0
+                placeholders = ",".join("?" * len(terms))
+                rows = conn.execute(
+                    "SELECT p.term, p.doc, p.tf, d.length FROM postings p "
+                    "JOIN docs d ON d.rowid = p.doc "
+                    f"WHERE p.term IN ({placeholders}) AND {where}",
+                    [*terms, *params],
+                ).fetchall()
+
+                document_frequency = Counter(row[0] for row in rows)
+                # Non-negative idf variant (as in Lucene), so very common terms
+                # never push a matching document below a non-matching one.
+                idf = {
+                    term: math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                    for term, df in document_frequency.items()
+                }
+
+                scores: Dict[int, float] = defaultdict(float)
+                for term, doc, tf, length in rows:
+                    scores[doc] += (
+                        idf[term]
+                        * tf
+                        * (BM25_K1 + 1)
+                        / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                    )
+
+                top = heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+                if top:
+                    placeholders = ",".join("?" * len(top))
+                    docs = {
+                        row[0]: row[1:]
+                        for row in conn.execute(
+                            "SELECT rowid, id, text, metadata FROM docs "
+                            f"WHERE rowid IN ({placeholders})",
+                            [doc for doc, _ in top],
+                        )
+                    }
+                    for doc, score in top:
+                        doc_id, text, metadata = docs[doc]
+                        ids.append(doc_id)
+                        documents.append(text)
+                        metadatas.append(json.loads(metadata) if metadata else {})
+                        distances.append(score)
+
+        return SearchResult(
+            ids=[ids],
+            documents=[documents],
+            metadatas=[metadatas],
+            distances=[distances],
+        )
@@ -0,0 +1,594 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+import numpy as np
+from langchain_core.documents import Document
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+####################################
+#
+# Embedding cache
+#
+####################################
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("d", vector).tobytes()
+
+
+def _unpack(data: bytes) -> list[float]:
+    vector = array("d")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class MemoryEmbeddingTier:
+    """Bounded in-process LRU of packed vectors."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                data = self._items.get(key)
+                if data is not None:
+                    self._items.move_to_end(key)
+                    found[key] = data
+        return found
+
+    def set_many(self, entries: dict[str, bytes]) -> None:
+        with self._lock:
+            for key, data in entries.items():
+                self._items[key] = data
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class DiskEmbeddingTier:
+    """SQLite backed tier, evicting the least recently used rows past ``max_size``."""
+
+    # Evicting on every write would turn each insert into a table scan.
+    EVICTION_INTERVAL = 1000
+
+    def __init__(self, directory: str, max_size: int):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "embeddings.db")
+        self.max_size = max_size
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_accessed_at "
+                "ON embedding (accessed_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        found = {}
+        conn = self._connect()
+        try:
+            with conn:
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i : i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    found.update(
+                        conn.execute(
+                            "SELECT key, vector FROM embedding "
+                            f"WHERE key IN ({placeholders})",
+                            chunk,
+                        ).fetchall()
+                    )
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embedding SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+        finally:
+            conn.close()
+        return found
+
+    def set_many(self, entries: dict[str, bytes]) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding (key, vector, accessed_at) "
+                    "VALUES (?, ?, ?)",
+                    [(key, data, now) for key, data in entries.items()],
+                )
+
+                with self._lock:
+                    self._writes += len(entries)
+                    evict = self._writes >= self.EVICTION_INTERVAL
+                    if evict:
+                        self._writes = 0
+
+                if evict:
+                    conn.execute(
+                        "DELETE FROM embedding WHERE key IN (SELECT key FROM embedding "
+                        "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_size,),
+                    )
+        finally:
+            conn.close()
+
+
+class RedisEmbeddingTier:
+    """
+    Redis backed tier shared between workers. Entries expire after ``ttl``
+    seconds; the overall size is bounded by the Redis ``maxmemory`` policy.
+    """
+
+    def __init__(self, redis, ttl: int, prefix: str = "open-webui:embedding"):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        values = self.redis.mget([f"{self.prefix}:{key}" for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, entries: dict[str, bytes]) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for key, data in entries.items():
+            pipe.set(f"{self.prefix}:{key}", data, ex=self.ttl)
+        pipe.execute()
+
+
+class EmbeddingCache:
+    """
+    Two-tier content-hash cache for embeddings: an in-memory LRU in front of
+    an optional shared tier (disk or Redis).
+    """
+
+    def __init__(
+        self,
+        memory_size: int = 10000,
+        backend: Optional[Union[DiskEmbeddingTier, RedisEmbeddingTier]] = None,
+    ):
+        self.memory = MemoryEmbeddingTier(memory_size)
+        self.backend = backend
+
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(engine: str, model: str, prefix: Optional[str], text: str) -> str:
+        namespace = hashlib.sha256(
+            f"{engine}\n{model}\n{prefix or ''}".encode()
+        ).hexdigest()[:16]
+        return f"{namespace}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = self.memory.get_many(keys)
+
+        missing = [key for key in keys if key not in found]
+        backend_found = {}
+        if missing and self.backend is not None:
+            try:
+                backend_found = self.backend.get_many(missing)
+            except Exception as e:
+                log.warning(f"Embedding cache backend lookup failed: {e}")
+            if backend_found:
+                self.memory.set_many(backend_found)
+                found.update(backend_found)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            self.backend_hits += len(backend_found)
+
+        return {key: _unpack(data) for key, data in found.items()}
+
+    def set_many(self, entries: dict[str, list[float]]) -> None:
+        packed = {key: _pack(vector) for key, vector in entries.items()}
+        self.memory.set_many(packed)
+        if self.backend is not None:
+            try:
+                self.backend.set_many(packed)
+            except Exception as e:
+                log.warning(f"Embedding cache backend write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "backend_hits": self.backend_hits,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_max_entries": self.memory.max_size,
+                "backend": type(self.backend).__name__ if self.backend else None,
+            }
+
+
+def get_embedding_cache(
+    backend: str,
+    memory_size: int,
+    disk_dir: Optional[str] = None,
+    disk_size: int = 0,
+    redis_url: Optional[str] = None,
+    redis_sentinels: Optional[list] = None,
+    redis_ttl: int = 0,
+) -> Optional[EmbeddingCache]:
+    if memory_size <= 0 and not backend:
+        return None
+
+    tier = None
+    if backend == "disk":
+        tier = DiskEmbeddingTier(disk_dir, disk_size)
+    elif backend == "redis":
+        if not redis_url:
+            raise ValueError("RAG_EMBEDDING_CACHE_BACKEND=redis requires REDIS_URL")
+
+        from open_webui.utils.redis import get_redis_connection
+
+        tier = RedisEmbeddingTier(
+            get_redis_connection(redis_url, redis_sentinels, decode_responses=False),
+            ttl=redis_ttl,
+        )
+    elif backend:
+        raise ValueError(f"Unknown embedding cache backend: {backend}")
+
+    return EmbeddingCache(memory_size=max(memory_size, 0), backend=tier)
+
+
+def cached_embedding_function(
+    func: Callable,
+    cache: EmbeddingCache,
+    engine: str,
+    model: str,
+) -> Callable:
+    """
+    Wrap an embedding function ``(query, prefix=None, user=None)`` so that only
+    texts missing from the cache are sent to the model, in a single call.
+    """
+
+    def embed(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [cache.key(engine, model, prefix, text) for text in texts]
+
+        found = cache.get_many(list(dict.fromkeys(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            embeddings = func(list(missing.values()), prefix=prefix, user=user)
+            if embeddings is None:
+                return None
+
+            computed = dict(zip(missing.keys(), embeddings))
+            cache.set_many(computed)
+            found.update(computed)
+
+        embeddings = [list(found[key]) for key in keys]
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    return embed
+
+
+####################################
+#
+# Extraction cache
+#
+####################################
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of extracted documents: the sha256 of the raw
+    file plus the extraction settings map to the Document list the loader
+    produced. Entries live in SQLite, compressed, and the least recently used
+    ones are evicted once the total exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "extraction.db")
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction (key TEXT PRIMARY KEY, "
+                "docs BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_extraction_accessed_at "
+                "ON extraction (accessed_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(file_path: str, settings: dict) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        namespace = hashlib.sha256(
+            json.dumps(settings, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        return f"{namespace}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[list[Document]]:
+        data = None
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT docs FROM extraction WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        data = row[0]
+                        conn.execute(
+                            "UPDATE extraction SET accessed_at = ? WHERE key = ?",
+                            (time.time(), key),
+                        )
+            finally:
+                conn.close()
+        except Exception as e:
+            log.warning(f"Extraction cache lookup failed: {e}")
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            return None
+
+        return [
+            Document(page_content=doc["page_content"], metadata=doc["metadata"])
+            for doc in json.loads(zlib.decompress(data))
+        ]
+
+    def set(self, key: str, docs: list[Document]) -> None:
+        data = zlib.compress(
+            json.dumps(
+                [
+                    {"page_content": doc.page_content, "metadata": doc.metadata}
+                    for doc in docs
+                ],
+                default=str,
+            ).encode()
+        )
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO extraction (key, docs, size, accessed_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, data, len(data), time.time()),
+                    )
+                    self._evict(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            log.warning(f"Extraction cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extraction"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        evict = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM extraction ORDER BY accessed_at"
+        ):
+            evict.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM extraction WHERE key = ?", evict)
+
+    def stats(self) -> dict:
+        entries, size = 0, 0
+        try:
+            conn = self._connect()
+            try:
+                entries, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extraction"
+                ).fetchone()
+            finally:
+                conn.close()
+        except Exception as e:
+            log.warning(f"Extraction cache stats failed: {e}")
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def get_extraction_cache(directory: str, max_size_mb: int) -> Optional[ExtractionCache]:
+    if max_size_mb <= 0:
+        return None
+    return ExtractionCache(directory, max_size_mb * 1024 * 1024)
+
+
+####################################
+#
+# Token matrix cache
+#
+####################################
+
+
+class TokenMatrixCache:
+    """
+    Token embedding matrices of chunks (ColBERT document encodings), one
+    float16 ``.npy`` file per chunk, read back memory-mapped. Files are keyed
+    by the model and the chunk's content hash, so other workers reuse them,
+    and the least recently used ones are deleted once the total exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+
+        files = []
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.endswith(".tmp"):
+                    # Left over from an interrupted write.
+                    self._remove(path)
+                elif name.endswith(".npy"):
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+        self._evict()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.npy")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            matrix = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            # Missing, evicted by another worker, or half written.
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                # Written by another worker.
+                self._entries[key] = os.path.getsize(path)
+                self._bytes += self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return matrix
+
+    def set(self, key: str, matrix: np.ndarray) -> None:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float16)
+        if matrix.nbytes > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            log.warning(f"Token matrix cache write failed: {e}")
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        evicted = []
+        with self._lock:
+            while self._bytes > self.max_bytes and self._entries:
+                key, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                evicted.append(key)
+        for key in evicted:
+            self._remove(self._path(key))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def get_token_matrix_cache(
+    directory: str, max_size_mb: int
+) -> Optional[TokenMatrixCache]:
+    if max_size_mb <= 0:
+        return None
+    return TokenMatrixCache(directory, max_size_mb * 1024 * 1024)
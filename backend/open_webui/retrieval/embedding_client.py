@@ -0,0 +1,93 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from open_webui.config import (
+    RAG_EMBEDDING_CONCURRENCY,
+    RAG_EMBEDDING_MAX_RETRIES,
+    RAG_EMBEDDING_RETRY_BACKOFF,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+T = TypeVar("T")
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_embedding_session() -> requests.Session:
+    """
+    Process wide session for remote embedding engines. Connections are kept
+    alive and reused, and 429/5xx responses are retried with exponential
+    backoff (honouring Retry-After).
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                retry = Retry(
+                    total=RAG_EMBEDDING_MAX_RETRIES,
+                    backoff_factor=RAG_EMBEDDING_RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    # Embedding requests are idempotent even though they are POSTs.
+                    allowed_methods=None,
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=max(RAG_EMBEDDING_CONCURRENCY, 1),
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(RAG_EMBEDDING_CONCURRENCY, 1),
+                    thread_name_prefix="embedding",
+                )
+    return _executor
+
+
+def map_batches(
+    func: Callable[[list[T]], Optional[list]], items: list[T], batch_size: int
+) -> Optional[list]:
+    """
+    Call ``func`` on consecutive batches of ``items`` with up to
+    RAG_EMBEDDING_CONCURRENCY batches in flight (shared by every caller in the
+    process), and concatenate the results in input order. Returns None if any
+    batch fails.
+    """
+    batch_size = max(batch_size, 1)
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    if len(batches) <= 1:
+        results = [func(batch) for batch in batches]
+    else:
+        results = list(_get_executor().map(func, batches))
+
+    output = []
+    for result in results:
+        if result is None:
+            return None
+        output.extend(result)
+    return output
@@ -10,11 +10,11 @@ import logging
 import ftfy
 import sys
 import asyncio  # Required for calling async wrappers
+from typing import Iterator
 
 from langchain_community.document_loaders import (
     AzureAIDocumentIntelligenceLoader,
     BSHTMLLoader,
-    CSVLoader,
     Docx2txtLoader,
     OutlookMessageLoader,
     PyPDFLoader,
@@ -31,7 +31,16 @@ from langchain_core.documents import Document
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
 # Import OCR functions and async wrappers from the OCR enhancements module
-from open_webui.retrieval.loaders.ocrprocessor import async_ocr_pdf_fallback, async_ocr_image
+from open_webui.retrieval.loaders.ocrprocessor import (
+    async_ocr_pdf_fallback,
+    async_ocr_image,
+    find_pages_needing_ocr,
+    merge_pdf_pages,
+)
+from open_webui.retrieval.loaders.tabular import (
+    CSVRowLoader,
+    ExcelRowLoader,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
@@ -185,7 +194,9 @@ class Loader:
         try:
             docs = loader.load()
             # MOD: AMER-ENH - Added async OCR fallback for PDF files.
-            if filename.lower().endswith('.pdf'):
+            if filename.lower().endswith(".pdf") and isinstance(loader, PyPDFLoader):
+                docs = self._ocr_scanned_pages(docs, file_path)
+            elif filename.lower().endswith(".pdf"):
                 if not docs or all(not doc.page_content.strip() for doc in docs):
                     log.warning("PyPDFLoader returned empty content for PDF. Falling back to OCR.")
                     docs = asyncio.run(async_ocr_pdf_fallback(file_path, self.kwargs.get("OCR_READER")))
@@ -211,6 +222,51 @@ class Loader:
             for doc in docs
         ]
 
+    def supports_streaming(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> bool:
+        """Whether ``lazy_load`` streams this file instead of loading it whole."""
+        loader = self._get_loader(filename, file_content_type, file_path)
+        return isinstance(loader, (CSVRowLoader, ExcelRowLoader))
+
+    def lazy_load(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> Iterator[Document]:
+        """Like ``load``, but yields documents as streaming loaders read them."""
+        loader = self._get_loader(filename, file_content_type, file_path)
+        if not isinstance(loader, (CSVRowLoader, ExcelRowLoader)):
+            yield from self.load(filename, file_content_type, file_path)
+            return
+
+        for doc in loader.lazy_load():
+            yield Document(
+                page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
+            )
+
+    def _ocr_scanned_pages(
+        self, docs: list[Document], file_path: str
+    ) -> list[Document]:
+        """
+        OCR only the pages of a PDF without a usable text layer and merge them
+        with the text pages in page order.
+        """
+        page_texts = {
+            doc.metadata.get("page"): doc.page_content
+            for doc in docs
+            if doc.metadata.get("page") is not None
+        }
+        page_nums = find_pages_needing_ocr(file_path, page_texts)
+        if page_nums:
+            log.info(f"OCR of {len(page_nums)} PDF pages without a text layer.")
+            ocr_docs = asyncio.run(
+                async_ocr_pdf_fallback(
+                    file_path, self.kwargs.get("OCR_READER"), page_nums=page_nums
+                )
+            )
+        else:
+            ocr_docs = []
+        return merge_pdf_pages(docs, ocr_docs)
+
     def _get_loader(self, filename: str, file_content_type: str, file_path: str):
         file_ext = filename.split(".")[-1].lower()
 
@@ -258,7 +314,10 @@ class Loader:
                     file_path, extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES")
                 )
             elif file_ext == "csv":
-                loader = CSVLoader(file_path, autodetect_encoding=True)
+                # Row groups sized like a chunk, each with the header.
+                loader = CSVRowLoader(
+                    file_path, max_chars=self.kwargs.get("CHUNK_SIZE") or 4000
+                )
             elif file_ext == "rst":
                 loader = UnstructuredRSTLoader(file_path, mode="elements")
             elif file_ext == "xml":
@@ -275,10 +334,15 @@ class Loader:
                 or file_ext == "docx"
             ):
                 loader = Docx2txtLoader(file_path)
-            elif file_content_type in [
-                "application/vnd.ms-excel",
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            ] or file_ext in ["xls", "xlsx"]:
+            elif (
+                file_content_type
+                == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                or file_ext == "xlsx"
+            ):
+                loader = ExcelRowLoader(
+                    file_path, max_chars=self.kwargs.get("CHUNK_SIZE") or 4000
+                )
+            elif file_content_type == "application/vnd.ms-excel" or file_ext == "xls":
                 loader = UnstructuredExcelLoader(file_path)
             elif file_content_type in [
                 "application/vnd.ms-powerpoint",
@@ -295,3 +359,16 @@ class Loader:
                 loader = TextLoader(file_path, autodetect_encoding=True)
 
         return loader
+
+
+def get_file_loader(config) -> Loader:
+    """Loader for uploaded files with the content extraction settings."""
+    return Loader(
+        engine=config.CONTENT_EXTRACTION_ENGINE,
+        TIKA_SERVER_URL=config.TIKA_SERVER_URL,
+        DOCLING_SERVER_URL=config.DOCLING_SERVER_URL,
+        PDF_EXTRACT_IMAGES=config.PDF_EXTRACT_IMAGES,
+        DOCUMENT_INTELLIGENCE_ENDPOINT=config.DOCUMENT_INTELLIGENCE_ENDPOINT,
+        DOCUMENT_INTELLIGENCE_KEY=config.DOCUMENT_INTELLIGENCE_KEY,
+        CHUNK_SIZE=config.CHUNK_SIZE,
+    )
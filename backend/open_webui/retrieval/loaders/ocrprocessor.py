@@ -19,12 +19,18 @@ import torch
 import multiprocessing  # For parallel processing
 from PIL import Image
 from io import BytesIO
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+import threading
 import gc
 import numpy as np  # For image processing
 import psutil  # For monitoring system memory
 from functools import lru_cache
-import json
 import cv2  # For image preprocessing
 import hashlib
 import tempfile
@@ -34,7 +40,16 @@ import time  # For timing batch processing
 import asyncio  # ASYNC: AMER-ENH2 For async wrappers
 
 from langchain_core.documents import Document
-from open_webui.env import DPI, BATCH_SIZE, ENV_TMP_DIR, SRC_LOG_LEVELS
+from open_webui.env import (
+    DPI,
+    BATCH_SIZE,
+    ENV_TMP_DIR,
+    OCR_WORKERS,
+    OCR_WORKER_MEMORY_MB,
+    PDF_OCR_MIN_TEXT_CHARS,
+    SRC_LOG_LEVELS,
+)
+
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
@@ -68,23 +83,32 @@ def get_checkpoint_path(file_path):
             raise
     abs_path = os.path.abspath(file_path)
     hash_digest = hashlib.md5(abs_path.encode('utf-8')).hexdigest()
-    checkpoint_filename = f"{hash_digest}_checkpoint.json"
+    checkpoint_filename = f"{hash_digest}_checkpoint.log"
     checkpoint_path = os.path.join(ENV_TMP_DIR, checkpoint_filename)
     log.info(f"Checkpt loc: {checkpoint_path}")
     return checkpoint_path
 # ENH_END: AMER-ENH2
 
-# ENH_START: AMER-ENH2 - Modified to return a tuple (page number, image bytes in PNG format)
+
+def pixmap_to_array(pix):
+    """
+    View the samples of a PyMuPDF pixmap as a (height, width, channels)
+    uint8 array, without encoding the page to an image format.
+    """
+    samples = np.frombuffer(pix.samples, dtype=np.uint8)
+    rows = samples.reshape(pix.height, pix.stride)
+    return rows[:, : pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+
+
+# ENH_START: AMER-ENH2 - Modified to return a tuple (page number, RGB page array)
 def extract_image_from_each_page_threaded(page_num, pdf_path, dpi=DPI):
     try:
         pdf_document = fitz.open(pdf_path)
         page = pdf_document.load_page(page_num)
         matrix = fitz.Matrix(dpi / 72, dpi / 72)
-        pix = page.get_pixmap(matrix=matrix)
+        pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csRGB, alpha=False)
         pdf_document.close()
-        # Convert to PNG bytes to retain image format
-        image_bytes = pix.tobytes("png")
-        return (page_num, image_bytes)
+        return (page_num, pixmap_to_array(pix))
     except Exception as e:
         log.error(f"Error extracting image from page {page_num}: {str(e)}")
         return (page_num, None)
@@ -99,20 +123,24 @@ def extract_images_from_pages_threaded(page_nums, pdf_path, dpi=DPI):
             for future in futures:
                 result = future.result()
                 if result and result[1] is not None:
-                    images.append(result)  # result is a tuple (page_number, image_bytes)
+                    # result is a tuple (page_number, image array)
+                    images.append(result)
     except Exception as e:
         log.error(f"Error in batch extraction for pages {page_nums}: {str(e)}")
     return images
 # ENH_END: AMER-ENH2
 
-def preprocess_image_cv2(img_bytes):
+
+def preprocess_image_cv2(img):
+    """Binarize and denoise an RGB image array (or encoded image bytes)."""
     try:
-        np_img = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
-        if img is None:
-            log.error("Failed to decode image bytes.")
-            return None
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if isinstance(img, (bytes, bytearray)):
+            img = cv2.imdecode(np.frombuffer(img, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                log.error("Failed to decode image bytes.")
+                return None
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
         _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
         denoised = cv2.medianBlur(thresh, 3)
         return denoised
@@ -120,6 +148,7 @@ def preprocess_image_cv2(img_bytes):
         log.error(f"Error preprocessing image: {str(e)}")
         return None
 
+
 @lru_cache(maxsize=128)
 def get_pdf_document(pdf_path):
     try:
@@ -129,25 +158,34 @@ def get_pdf_document(pdf_path):
         return None
 
 def load_checkpoint(checkpoint_path):
+    """
+    Return the set of pages recorded in the checkpoint journal, one page
+    number per line. A torn last line (crash mid-write) is ignored.
+    """
+    processed_pages = set()
     try:
         with open(checkpoint_path, 'r') as f:
-            return json.load(f)
+            for line in f:
+                try:
+                    processed_pages.add(int(line))
+                except ValueError:
+                    log.warning(f"Skipping invalid checkpoint entry: {line!r}")
     except FileNotFoundError:
-        return []
-    except json.JSONDecodeError as e:
-        log.error(f"Error decoding checkpoint file: {str(e)}")
-        return []
+        pass
     except Exception as e:
         log.error(f"Error loading checkpoint: {str(e)}")
-        return []
+    return processed_pages
 
-def save_checkpoint(checkpoint_path, processed_pages):
+
+def save_checkpoint(checkpoint_path, page_num):
+    """Append a processed page to the checkpoint journal."""
     try:
-        with open(checkpoint_path, 'w') as f:
-            json.dump(processed_pages, f)
+        with open(checkpoint_path, "a") as f:
+            f.write(f"{page_num}\n")
     except Exception as e:
         log.error(f"Error saving checkpoint: {str(e)}")
 
+
 class OCRProcessor:
     def __init__(self, ocr_reader, ocr_engine="easyocr"):
         self.ocr_reader = ocr_reader if ocr_reader else reader
@@ -178,7 +216,10 @@ class OCRProcessor:
                 log.debug(f"EasyOCR extracted text: {len(text)}")
                 return text, avg_conf
             elif self.ocr_engine == "pytesseract":
-                img = Image.open(BytesIO(img_input)).convert("RGB")
+                if isinstance(img_input, np.ndarray):
+                    img = Image.fromarray(img_input)
+                else:
+                    img = Image.open(BytesIO(img_input)).convert("RGB")
                 text = self.ocr_reader.image_to_string(img)
                 return text, None
             elif self.ocr_engine == "paddleocr":
@@ -212,14 +253,17 @@ def get_cached_ocr_processor(ocr_reader, ocr_engine):
     return _ocr_processor_cache[key]
 # ENH_END: AMER-ENH2
 
+
 # ENH_START: AMER-ENH2 - Updated _perform_ocr to use cached OCRProcessor and return confidence score
-def _perform_ocr(ocr_reader, ocr_engine, img_bytes):
-    log.debug("Performing OCR on image bytes.")
+def _perform_ocr(ocr_reader, ocr_engine, img):
+    log.debug("Performing OCR on page image.")
     ocr_processor = get_cached_ocr_processor(ocr_reader, ocr_engine)
-    text, avg_conf = ocr_processor.perform_ocr(img_bytes)
-    torch.cuda.empty_cache()
-    gc.collect()
+    text, avg_conf = ocr_processor.perform_ocr(img)
+    if use_gpu:
+        torch.cuda.empty_cache()
     return text, avg_conf
+
+
 # ENH_END: AMER-ENH2
 
 # NEW: Convert OCR text to Markdown format with page number and original PDF image.
@@ -266,12 +310,12 @@ def layout_to_markdown(ocr_results, vertical_threshold=10):
     """
     # Sort results by the top y-coordinate of their bounding box.
     sorted_results = sorted(ocr_results, key=lambda res: res[0][0][1])
-    
+
     paragraphs = []
     current_paragraph = []
     last_bottom = None
     confidences = []
-    
+
     for bbox, text, conf in sorted_results:
         confidences.append(conf)
         top = bbox[0][1]  # Top y-coordinate
@@ -281,17 +325,162 @@ def layout_to_markdown(ocr_results, vertical_threshold=10):
         current_paragraph.append(text)
         # Use the bottom y-coordinate (assuming bbox[2] is bottom-right)
         last_bottom = bbox[2][1]
-    
+
     if current_paragraph:
         paragraphs.append(" ".join(current_paragraph))
-    
+
     # Join paragraphs with double newlines (Markdown paragraph separator)
     markdown_text = "\n\n".join(paragraphs)
     avg_conf = sum(confidences) / len(confidences) if confidences else None
     return markdown_text, avg_conf
 
+
+def _page_document(text, page_num, avg_conf):
+    text = post_process_text(text)
+    text = convert_to_markdown(text, page_num)
+    return Document(
+        page_content=text,
+        metadata={
+            "page_number": page_num,
+            "image_format": "png",
+            "average_confidence": avg_conf,
+        },
+    )
+
+
+####################################
+# Process pool OCR (CPU)
+####################################
+
+_ocr_pool = None
+_ocr_pool_workers = 0
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_worker_count(num_pages):
+    """
+    Number of OCR worker processes for ``num_pages`` pages: OCR_WORKERS when
+    set, otherwise one per core as long as each worker fits in
+    OCR_WORKER_MEMORY_MB of the currently available memory.
+    """
+    if OCR_WORKERS > 0:
+        workers = OCR_WORKERS
+    else:
+        available_mb = psutil.virtual_memory().available / (1024 * 1024)
+        workers = min(os.cpu_count() or 1, int(available_mb // OCR_WORKER_MEMORY_MB))
+    return max(1, min(workers, num_pages))
+
+
+def _can_use_process_pool(ocr_reader, ocr_engine):
+    # GPU OCR stays in-process: workers would each claim GPU memory. Custom
+    # readers cannot be rebuilt in a worker.
+    return (
+        not use_gpu
+        and ocr_engine == "easyocr"
+        and (ocr_reader is None or ocr_reader is reader)
+    )
+
+
+def _init_ocr_worker():
+    # One core per worker; the module level reader is this worker's reader.
+    torch.set_num_threads(1)
+    get_cached_ocr_processor(None, "easyocr")
+
+
+def _ocr_page_in_worker(pdf_path, page_num, dpi):
+    _, img = extract_image_from_each_page_threaded(page_num, pdf_path, dpi)
+    if img is None:
+        return page_num, None, None
+    text, avg_conf = get_cached_ocr_processor(None, "easyocr").perform_ocr(img)
+    return page_num, text, avg_conf
+
+
+def _get_ocr_pool(workers):
+    global _ocr_pool, _ocr_pool_workers
+    with _ocr_pool_lock:
+        if _ocr_pool is None or _ocr_pool_workers < workers:
+            if _ocr_pool is not None:
+                _ocr_pool.shutdown(wait=False)
+            # spawn: forking a process that already runs torch threads can hang.
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+            )
+            _ocr_pool_workers = workers
+            log.info(f"Started OCR process pool with {workers} workers.")
+        return _ocr_pool
+
+
+def _reset_ocr_pool():
+    global _ocr_pool, _ocr_pool_workers
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False)
+        _ocr_pool = None
+        _ocr_pool_workers = 0
+
+
+def _ocr_pages_in_pool(
+    pdf_path, page_nums, dpi, workers, checkpoint_path, processed_pages
+):
+    """
+    OCR ``page_nums`` on the worker pool, one page per task and at most
+    ``workers`` pages in flight, and return (documents in page order, failed
+    pages).
+    """
+    results = {}
+    failed = []
+    pool = _get_ocr_pool(workers)
+    remaining = iter(page_nums)
+    in_flight = {}
+
+    def submit_next():
+        page_num = next(remaining, None)
+        if page_num is not None:
+            in_flight[pool.submit(_ocr_page_in_worker, pdf_path, page_num, dpi)] = (
+                page_num
+            )
+
+    try:
+        for _ in range(workers):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_num = in_flight.pop(future)
+                try:
+                    _, text, avg_conf = future.result()
+                except Exception as e:
+                    log.error(f"OCR failed for page {page_num}: {str(e)}")
+                    failed.append(page_num)
+                else:
+                    if text:
+                        results[page_num] = _page_document(text, page_num, avg_conf)
+                        processed_pages.add(page_num)
+                        save_checkpoint(checkpoint_path, page_num)
+                submit_next()
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start fresh next time.
+        _reset_ocr_pool()
+        raise
+
+    return [results[page_num] for page_num in sorted(results)], failed
+
+
 # ENH_START: AMER-ENH2 - Modified to use (page number, image bytes) and include metadata with timing logging
-def ocr_pdf_fallback(pdf_path, ocr_reader, ocr_engine="easyocr", batch_size=BATCH_SIZE, dpi=DPI):
+def ocr_pdf_fallback(
+    pdf_path,
+    ocr_reader,
+    ocr_engine="easyocr",
+    batch_size=BATCH_SIZE,
+    dpi=DPI,
+    page_nums=None,
+):
+    """
+    OCR the pages of a PDF, or only ``page_nums`` (zero-based) when given.
+    Returns one Document per page that produced text.
+    """
     extracted_docs = []  # List of Document objects with metadata
     failed_batches = []
     checkpoint_path = get_checkpoint_path(pdf_path)
@@ -302,31 +491,48 @@ def ocr_pdf_fallback(pdf_path, ocr_reader, ocr_engine="easyocr", batch_size=BATC
     try:
         with fitz.open(pdf_path) as pdf_document:
             num_pages = len(pdf_document)
-            log.info(f"Starting OCR fallback for {num_pages} pages.")
-            for batch_start in range(0, num_pages, batch_size):
+            pages = (
+                sorted(pn for pn in set(page_nums) if 0 <= pn < num_pages)
+                if page_nums is not None
+                else list(range(num_pages))
+            )
+            log.info(f"Starting OCR fallback for {len(pages)} of {num_pages} pages.")
+
+            pending = [pn for pn in pages if pn not in processed_pages]
+            workers = get_ocr_worker_count(len(pending))
+            if workers > 1 and _can_use_process_pool(ocr_reader, ocr_engine):
+                extracted_docs, failed_batches = _ocr_pages_in_pool(
+                    pdf_path, pending, dpi, workers, checkpoint_path, processed_pages
+                )
+                pages = []  # Everything was handled by the pool.
+
+            batch_start = 0
+            while batch_start < len(pages):
                 batch_time_start = time.time()
-                batch_end = min(batch_start + batch_size, num_pages)
-                page_nums = list(range(batch_start, batch_end))
-                page_nums = [pn for pn in page_nums if pn not in processed_pages]
-                if not page_nums:
+                batch_pages = pages[batch_start : batch_start + batch_size]
+                batch_start += len(batch_pages)
+                batch_pages = [pn for pn in batch_pages if pn not in processed_pages]
+                if not batch_pages:
                     continue
-                log.debug(f"Processing batch: {page_nums} {pdf_path}")
-                images = extract_images_from_pages_threaded(page_nums, pdf_path, dpi)
+                log.debug(f"Processing batch: {batch_pages} {pdf_path}")
+                images = extract_images_from_pages_threaded(batch_pages, pdf_path, dpi)
                 if images:
-                    for (page_num, img_bytes) in images:
-                        if img_bytes is None:
+                    for page_num, img in images:
+                        if img is None:
                             continue
                         try:
-                            text, avg_conf = _perform_ocr(ocr_reader, ocr_engine, img_bytes)
+                            text, avg_conf = _perform_ocr(ocr_reader, ocr_engine, img)
                         except RuntimeError as e:
-                             # AMER-ENH6 Handle specific OCR errors, especially CUDA-related illegal memory access
+                            # AMER-ENH6 Handle specific OCR errors, especially CUDA-related illegal memory access
                             log.error(f"OCR failed for page {page_num}: {str(e)}")
                             if "illegal memory access" in str(e).lower() or "CUDA" in str(e):
                                 log.error("Detected CUDA illegal memory access. Switching to CPU mode for this page.")
                                 if cpu_reader is None:
                                     cpu_reader = easyocr.Reader(['en'], gpu=False)
                                 try:
-                                    text, avg_conf = _perform_ocr(cpu_reader, ocr_engine, img_bytes)
+                                    text, avg_conf = _perform_ocr(
+                                        cpu_reader, ocr_engine, img
+                                    )
                                 except RuntimeError as cpu_e:
                                     log.error(f"CPU OCR failed for page {page_num}: {str(cpu_e)}")
                                     failed_batches.append(page_num)
@@ -335,18 +541,13 @@ def ocr_pdf_fallback(pdf_path, ocr_reader, ocr_engine="easyocr", batch_size=BATC
                                 failed_batches.append(page_num)
                                 continue
                         if text:
-                            text = post_process_text(text)
-                            text = convert_to_markdown(text, page_num, img_bytes)
-                            doc_metadata = {
-                                "page_number": page_num,
-                                "image_format": "png",
-                                "average_confidence": avg_conf
-                            }
-                            document = Document(page_content=text, metadata=doc_metadata)
-                            extracted_docs.append(document)
-                            processed_pages.append(page_num)
-                            save_checkpoint(checkpoint_path, processed_pages)
-                        clear_gpu_memory()
+                            extracted_docs.append(
+                                _page_document(text, page_num, avg_conf)
+                            )
+                            processed_pages.add(page_num)
+                            save_checkpoint(checkpoint_path, page_num)
+                # Once per batch: gc.collect() per page dominated small pages.
+                clear_gpu_memory()
                 mem = psutil.virtual_memory()
                 if mem.percent > 80:
                     log.warning("High memory usage detected. Reducing batch size.")
@@ -355,7 +556,9 @@ def ocr_pdf_fallback(pdf_path, ocr_reader, ocr_engine="easyocr", batch_size=BATC
                 if torch.cuda.is_available():
                     torch.cuda.empty_cache()
                     log.debug("Cleared GPU memory cache after processing batch.")
-                log.debug(f"Batch {page_nums} processed in {time.time() - batch_time_start:.2f} seconds")
+                log.debug(
+                    f"Batch {batch_pages} processed in {time.time() - batch_time_start:.2f} seconds"
+                )
     except Exception as e:
         log.error(f"OCR extraction failed: {str(e)}")
         clear_gpu_memory()
@@ -370,6 +573,8 @@ def ocr_pdf_fallback(pdf_path, ocr_reader, ocr_engine="easyocr", batch_size=BATC
             log.error(f"Error deleting checkpoint file {checkpoint_path}: {str(e)}")
     clear_gpu_memory()
     return extracted_docs
+
+
 # ENH_END: AMER-ENH2
 
 # ENH_START: AMER-ENH2 - Enhanced to preserve image format metadata for scanned image files and use LANCZOS
@@ -380,18 +585,15 @@ def ocr_image(image_path, ocr_reader, ocr_engine="easyocr"):
             img = img.convert("RGB")
             max_size = (2000, 2000)
             img.thumbnail(max_size, Image.LANCZOS)
-            buffer = BytesIO()
-            # Save image as PNG to standardize the OCR input while retaining original format info
-            img.save(buffer, format="PNG")
-            img_bytes = buffer.getvalue()
-            preprocessed_img = preprocess_image_cv2(img_bytes)
+            # OCR engines take the decoded pixels directly; no re-encoding.
+            preprocessed_img = preprocess_image_cv2(np.asarray(img))
             if preprocessed_img is None:
                 return []
-            text, avg_conf = _perform_ocr(ocr_reader, ocr_engine, preprocessed_img.tobytes())
+            text, avg_conf = _perform_ocr(ocr_reader, ocr_engine, preprocessed_img)
             # Post-process the OCR text.
             text = post_process_text(text)
             # Convert text to Markdown format. For images, no page number is provided.
-            text = convert_to_markdown(text, None, img_bytes)
+            text = convert_to_markdown(text, None)
             metadata = {"image_format": original_format, "average_confidence": avg_conf}
             return [Document(page_content=text, metadata=metadata)]
     except Exception as e:
@@ -399,14 +601,73 @@ def ocr_image(image_path, ocr_reader, ocr_engine="easyocr"):
         return []
 # ENH_END: AMER-ENH2
 
+
+def find_pages_needing_ocr(pdf_path, page_texts, min_chars=PDF_OCR_MIN_TEXT_CHARS):
+    """
+    Return the zero-based pages whose text layer (``page_texts``: page number
+    to extracted text) is missing or shorter than ``min_chars`` characters and
+    that contain an image, i.e. pages that are likely scanned.
+    """
+    pages = []
+    with fitz.open(pdf_path) as pdf_document:
+        for page_num in range(len(pdf_document)):
+            text = page_texts.get(page_num) or ""
+            if len(text.strip()) >= min_chars:
+                continue
+            # Blank pages and pages of vector graphics have nothing to read.
+            if pdf_document.load_page(page_num).get_images(full=False):
+                pages.append(page_num)
+    return pages
+
+
+def merge_pdf_pages(text_docs, ocr_docs):
+    """
+    Merge per-page text layer documents with OCR documents in page order.
+    An OCR result replaces the text layer of its page; every document gets a
+    ``page_number`` (zero-based) in its metadata.
+    """
+    pages = {}
+    unpaged = []
+    for doc in text_docs:
+        page_num = doc.metadata.get("page_number", doc.metadata.get("page"))
+        if page_num is None:
+            unpaged.append(doc)
+            continue
+        doc.metadata["page_number"] = page_num
+        pages[page_num] = doc
+    for doc in ocr_docs:
+        page_num = doc.metadata["page_number"]
+        if page_num in pages:
+            doc.metadata = {**pages[page_num].metadata, **doc.metadata}
+        pages[page_num] = doc
+    return [pages[page_num] for page_num in sorted(pages)] + unpaged
+
+
 # ASYNC_START: AMER-ENH2 - Added async wrappers for OCR functions
-async def async_ocr_pdf_fallback(pdf_path, ocr_reader, ocr_engine="easyocr", batch_size=BATCH_SIZE, dpi=DPI):
+async def async_ocr_pdf_fallback(
+    pdf_path,
+    ocr_reader,
+    ocr_engine="easyocr",
+    batch_size=BATCH_SIZE,
+    dpi=DPI,
+    page_nums=None,
+):
     loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, ocr_pdf_fallback, pdf_path, ocr_reader, ocr_engine, batch_size, dpi)
+    result = await loop.run_in_executor(
+        None,
+        ocr_pdf_fallback,
+        pdf_path,
+        ocr_reader,
+        ocr_engine,
+        batch_size,
+        dpi,
+        page_nums,
+    )
     return result
 
+
 async def async_ocr_image(image_path, ocr_reader, ocr_engine="easyocr"):
     loop = asyncio.get_event_loop()
     result = await loop.run_in_executor(None, ocr_image, image_path, ocr_reader, ocr_engine)
     return result
-# ASYNC_END: AMER-ENH2
\ No newline at end of file
+# ASYNC_END: AMER-ENH2
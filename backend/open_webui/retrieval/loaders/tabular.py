@@ -0,0 +1,131 @@
+import codecs
+import csv
+import io
+import logging
+from typing import Iterable, Iterator
+
+from langchain_core.documents import Document
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def _format_row(values: Iterable) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(
+        ["" if value is None else value for value in values]
+    )
+    return buffer.getvalue()
+
+
+def _row_groups(
+    rows: Iterator[list], max_chars: int, metadata: dict
+) -> Iterator[Document]:
+    """
+    Group rows into documents of up to ``max_chars`` characters, each
+    starting with the header (the first non-empty row), so every document -
+    and every chunk of it - can be read on its own.
+    """
+    header = None
+    lines: list[str] = []
+    size = 0
+    first_row = 0
+
+    for row_num, row in enumerate(rows, start=1):
+        if not any(value not in (None, "") for value in row):
+            continue
+        line = _format_row(row)
+        if header is None:
+            header = line
+            continue
+
+        if lines and size + len(line) + 1 > max_chars:
+            yield Document(
+                page_content="\n".join([header, *lines]),
+                metadata={**metadata, "row": first_row, "rows": len(lines)},
+            )
+            lines, size = [], 0
+        if not lines:
+            first_row = row_num
+            size = len(header)
+        lines.append(line)
+        size += len(line) + 1
+
+    if lines:
+        yield Document(
+            page_content="\n".join([header, *lines]),
+            metadata={**metadata, "row": first_row, "rows": len(lines)},
+        )
+    elif header is not None:
+        # A header without data rows is still content.
+        yield Document(page_content=header, metadata={**metadata, "row": 0, "rows": 0})
+
+
+def _detect_encoding(file_path: str, sample_size: int = 1024 * 1024) -> str:
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_size)
+    try:
+        # The sample may end inside a multi-byte character.
+        codecs.getincrementaldecoder("utf-8-sig")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        # Spreadsheet exports that are not UTF-8 are mostly Windows-1252.
+        return "cp1252"
+
+
+class CSVRowLoader:
+    """
+    Streams a CSV file as row group documents with the header repeated, so
+    a large export never has to fit in memory.
+    """
+
+    def __init__(self, file_path: str, max_chars: int = 4000):
+        self.file_path = file_path
+        self.max_chars = max_chars
+
+    def lazy_load(self) -> Iterator[Document]:
+        encoding = _detect_encoding(self.file_path)
+        with open(self.file_path, newline="", encoding=encoding, errors="replace") as f:
+            sample = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+            except csv.Error:
+                dialect = csv.excel
+            yield from _row_groups(
+                csv.reader(f, dialect),
+                self.max_chars,
+                {"source": self.file_path},
+            )
+
+    def load(self) -> list[Document]:
+        return list(self.lazy_load())
+
+
+class ExcelRowLoader:
+    """
+    Streams the sheets of an .xlsx workbook (openpyxl read-only mode) as row
+    group documents with each sheet's header repeated.
+    """
+
+    def __init__(self, file_path: str, max_chars: int = 4000):
+        self.file_path = file_path
+        self.max_chars = max_chars
+
+    def lazy_load(self) -> Iterator[Document]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                yield from _row_groups(
+                    sheet.iter_rows(values_only=True),
+                    self.max_chars,
+                    {"source": self.file_path, "sheet": sheet.title},
+                )
+        finally:
+            workbook.close()
+
+    def load(self) -> list[Document]:
+        return list(self.lazy_load())
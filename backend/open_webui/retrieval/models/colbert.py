@@ -19,6 +19,10 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class ColBERT:
+    # Scores are normalized over the documents of one query, so predict()
+    # calls cannot be merged across queries or requests.
+    batchable = False
+
     def __init__(self, name, **kwargs) -> None:
         #log.info("ColBERT: Loading model", name)
         log.info(f"ColBERT: Loading model {name}")
@@ -41,7 +45,11 @@ class ColBERT:
             name,
             colbert_config=ColBERTConfig(model_name=name),
         ).to(self.device)
-        pass
+
+        # Document token matrices are cached per chunk (TokenMatrixCache), so
+        # a query only has to encode itself and the documents never seen.
+        self.name = name
+        self.cache = kwargs.get("cache")
 
     def calculate_similarity_scores(self, query_embeddings, document_embeddings):
         # Move embeddings to the appropriate device
@@ -86,20 +94,53 @@ class ColBERT:
 
         return normalized_scores.detach().cpu().numpy().astype(np.float32)
 
+    def _doc_matrices(self, docs):
+        """Token matrices of ``docs``, without padding, encoding only cache misses."""
+        keys = [self.cache.key(self.name, doc) if self.cache else None for doc in docs]
+        matrices = [self.cache.get(key) if key else None for key in keys]
+
+        missing = list(
+            dict.fromkeys(doc for doc, m in zip(docs, matrices) if m is None)
+        )
+        if missing:
+            encoded = self.ckpt.docFromText(missing, bsize=32)[0]
+            encoded = encoded.to(torch.float32).cpu().numpy()
+            by_doc = {}
+            for doc, matrix in zip(missing, encoded):
+                # Drop the batch padding (all-zero rows at the end).
+                rows = np.flatnonzero(np.abs(matrix).sum(axis=1))
+                matrix = matrix[: rows[-1] + 1 if len(rows) else 1]
+                by_doc[doc] = matrix
+                if self.cache:
+                    self.cache.set(self.cache.key(self.name, doc), matrix)
+            matrices = [
+                by_doc[doc] if m is None else m for doc, m in zip(docs, matrices)
+            ]
+        return matrices
+
     def predict(self, sentences):
 
         query = sentences[0][0]
         docs = [i[1] for i in sentences]
 
-        # Embedding the documents
-        embedded_docs = self.ckpt.docFromText(docs, bsize=32)[0]
+        # Cached documents are not re-encoded; the rest is padded back into
+        # one batch so MaxSim over all candidates is a single matmul.
+        matrices = self._doc_matrices(docs)
+        embedded_docs = torch.zeros(
+            (len(matrices), max(m.shape[0] for m in matrices), matrices[0].shape[1]),
+            dtype=torch.float32,
+        )
+        for i, matrix in enumerate(matrices):
+            embedded_docs[i, : matrix.shape[0]] = torch.from_numpy(
+                np.asarray(matrix, dtype=np.float32)
+            )
+
         # Embedding the queries
         embedded_queries = self.ckpt.queryFromText([query], bsize=32)
         embedded_query = embedded_queries[0]
 
         # **Ensure consistent data types (torch.float32)**
 		# AMER-ENH
-        embedded_docs = embedded_docs.to(torch.float32)
         embedded_query = embedded_query.to(torch.float32)
 
         # **Logging dtypes for debugging**
@@ -0,0 +1,188 @@
+import logging
+import queue
+import threading
+import uuid
+from typing import Callable, Iterable
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+_DONE = object()
+
+# How often blocked stages re-check whether another stage has failed.
+_POLL_INTERVAL = 0.1
+
+
+class IngestionPipeline:
+    """
+    Bounded split -> embed -> insert pipeline.
+
+    The caller's thread produces chunks, one thread embeds them in batches and
+    a small pool inserts the resulting items. Queues between the stages hold at
+    most ``queue_size`` batches, so a slow stage blocks the one feeding it and
+    memory stays proportional to the batch sizes instead of the document size.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], list[list[float]]],
+        insert: Callable[[list[dict]], None],
+        embed_batch_size: int,
+        insert_batch_size: int,
+        queue_size: int = 4,
+        insert_workers: int = 4,
+    ):
+        self.embed = embed
+        self.insert = insert
+        self.embed_batch_size = max(embed_batch_size, 1)
+        self.insert_batch_size = max(insert_batch_size, 1)
+        self.insert_workers = max(insert_workers, 1)
+
+        self._embed_queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._insert_queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._failed = threading.Event()
+        self._errors: list[BaseException] = []
+        self._lock = threading.Lock()
+
+        self.chunks = 0
+        self.inserted = 0
+
+    def _fail(self, e: BaseException) -> None:
+        with self._lock:
+            self._errors.append(e)
+        self._failed.set()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._failed.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._failed.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _embed_worker(self) -> None:
+        pending: list[dict] = []
+        try:
+            while True:
+                batch = self._get(self._embed_queue)
+                if batch is _DONE:
+                    break
+
+                texts = [text for text, _ in batch]
+                vectors = self.embed([text.replace("\n", " ") for text in texts])
+                if vectors is None or len(vectors) != len(texts):
+                    raise ValueError(
+                        f"Embedding returned {0 if vectors is None else len(vectors)} "
+                        f"vectors for {len(texts)} chunks"
+                    )
+
+                pending.extend(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "text": text,
+                        "vector": vector,
+                        "metadata": metadata,
+                    }
+                    for (text, metadata), vector in zip(batch, vectors)
+                )
+                while len(pending) >= self.insert_batch_size:
+                    items = pending[: self.insert_batch_size]
+                    pending = pending[self.insert_batch_size :]
+                    if not self._put(self._insert_queue, items):
+                        return
+
+            if pending and not self._failed.is_set():
+                self._put(self._insert_queue, pending)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(self.insert_workers):
+                self._put(self._insert_queue, _DONE)
+
+    def _insert_worker(self) -> None:
+        try:
+            while True:
+                items = self._get(self._insert_queue)
+                if items is _DONE:
+                    return
+                self.insert(items)
+                with self._lock:
+                    self.inserted += len(items)
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self, chunks: Iterable[tuple[str, dict]]) -> int:
+        """
+        Feed ``(text, metadata)`` chunks through the pipeline and wait for
+        every item to be inserted. Re-raises the first error of any stage.
+        Returns the number of inserted items.
+        """
+        threads = [
+            threading.Thread(
+                target=self._embed_worker, name="ingest-embed", daemon=True
+            ),
+            *(
+                threading.Thread(
+                    target=self._insert_worker, name=f"ingest-insert-{i}", daemon=True
+                )
+                for i in range(self.insert_workers)
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            batch = []
+            for chunk in chunks:
+                if self._failed.is_set():
+                    break
+                batch.append(chunk)
+                self.chunks += 1
+                if len(batch) >= self.embed_batch_size:
+                    if not self._put(self._embed_queue, batch):
+                        break
+                    batch = []
+            if batch:
+                self._put(self._embed_queue, batch)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self._embed_queue, _DONE)
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        log.debug(f"Ingestion pipeline inserted {self.inserted}/{self.chunks} chunks")
+        return self.inserted
+
+
+def run_ingestion_pipeline(
+    chunks: Iterable[tuple[str, dict]],
+    embed: Callable[[list[str]], list[list[float]]],
+    insert: Callable[[list[dict]], None],
+    embed_batch_size: int,
+    insert_batch_size: int,
+    queue_size: int = 4,
+    insert_workers: int = 4,
+) -> int:
+    return IngestionPipeline(
+        embed,
+        insert,
+        embed_batch_size=embed_batch_size,
+        insert_batch_size=insert_batch_size,
+        queue_size=queue_size,
+        insert_workers=insert_workers,
+    ).run(chunks)
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.observer import VectorDBListener
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+####################################
+#
+# Retrieval result cache
+#
+####################################
+
+
+class MemoryRetrievalStore:
+    """
+    In-process LRU with per entry expiry. Collection versions live in the
+    same process, so this backend is only safe with a single worker.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get_version(self, collection_name: str) -> str:
+        with self._lock:
+            return f"{self._epoch}.{self._versions.get(collection_name, 0)}"
+
+    def bump(self, collection_name: str) -> None:
+        with self._lock:
+            self._versions[collection_name] = self._versions.get(collection_name, 0) + 1
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self._epoch += 1
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if self.ttl and expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class RedisRetrievalStore:
+    """
+    Redis backed store shared between workers. Versions are Redis counters, so
+    a write in any worker invalidates every worker's entries. Entries expire
+    after ``ttl`` seconds; the overall size is bounded by the Redis
+    ``maxmemory`` policy.
+    """
+
+    def __init__(self, redis, ttl: int, prefix: str = "open-webui:retrieval"):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _version_key(self, collection_name: str) -> str:
+        return f"{self.prefix}:version:{collection_name}"
+
+    def get_version(self, collection_name: str) -> str:
+        epoch, version = self.redis.mget(
+            [f"{self.prefix}:epoch", self._version_key(collection_name)]
+        )
+        return f"{int(epoch or 0)}.{int(version or 0)}"
+
+    def bump(self, collection_name: str) -> None:
+        self.redis.incr(self._version_key(collection_name))
+
+    def bump_all(self) -> None:
+        self.redis.incr(f"{self.prefix}:epoch")
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.redis.get(f"{self.prefix}:result:{key}")
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str) -> None:
+        self.redis.set(f"{self.prefix}:result:{key}", value, ex=self.ttl or None)
+
+
+class RetrievalCache(VectorDBListener):
+    """
+    Cache of per collection search results, keyed by the collection, its
+    filters, the normalized queries, the retrieval parameters and the
+    collection version.
+
+    Every write to a collection (see ObservedVectorDBClient) bumps its version,
+    so entries computed before the write are never served again and simply
+    age out.
+    """
+
+    def __init__(self, store: Union[MemoryRetrievalStore, RedisRetrievalStore]):
+        self.store = store
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_queries(queries: list[str]) -> list[str]:
+        # Results are merged across queries, so their order does not matter.
+        return sorted({" ".join(query.split()) for query in queries if query})
+
+    def key(
+        self,
+        collection_name: str,
+        filters: Optional[list[Optional[dict]]],
+        queries: list[str],
+        params: dict,
+    ) -> str:
+        version = self.store.get_version(collection_name)
+        payload = json.dumps(
+            [
+                collection_name,
+                sorted(
+                    json.dumps(f, sort_keys=True, default=str) for f in filters or []
+                ),
+                self.normalize_queries(queries),
+                params,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return f"{version}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = None
+        try:
+            value = self.store.get(key)
+        except Exception as e:
+            log.warning(f"Retrieval cache lookup failed: {e}")
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, result: Any) -> None:
+        try:
+            self.store.set(key, json.dumps(result, default=str))
+        except Exception as e:
+            log.warning(f"Retrieval cache write failed: {e}")
+
+    def _bump(self, collection_name: str) -> None:
+        try:
+            self.store.bump(collection_name)
+        except Exception as e:
+            log.error(f"Retrieval cache invalidation of {collection_name} failed: {e}")
+
+    def on_insert(self, collection_name: str, items: list) -> None:
+        self._bump(collection_name)
+
+    def on_delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ) -> None:
+        self._bump(collection_name)
+
+    def on_delete_collection(self, collection_name: str) -> None:
+        self._bump(collection_name)
+
+    def on_reset(self) -> None:
+        self.store.bump_all()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "backend": type(self.store).__name__,
+                **(
+                    {"entries": len(self.store), "max_entries": self.store.max_size}
+                    if isinstance(self.store, MemoryRetrievalStore)
+                    else {}
+                ),
+            }
+
+
+def get_retrieval_cache(
+    backend: str,
+    size: int,
+    ttl: int,
+    redis_url: Optional[str] = None,
+    redis_sentinels: Optional[list] = None,
+) -> Optional[RetrievalCache]:
+    if not backend:
+        return None
+
+    if backend == "memory":
+        store = MemoryRetrievalStore(max_size=size, ttl=ttl)
+    elif backend == "redis":
+        if not redis_url:
+            raise ValueError("RAG_RETRIEVAL_CACHE_BACKEND=redis requires REDIS_URL")
+
+        from open_webui.utils.redis import get_redis_connection
+
+        store = RedisRetrievalStore(
+            get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
+            ttl=ttl,
+        )
+    else:
+        raise ValueError(f"Unknown retrieval cache backend: {backend}")
+
+    return RetrievalCache(store)
@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+####################################
+#
+# Text splitters
+#
+####################################
+
+
+# tiktoken releases the GIL while encoding, so documents of a batch are
+# encoded in parallel on a shared pool (tiktoken's own batch API starts new
+# threads on every call).
+_ENCODE_THREADS = min(8, os.cpu_count() or 1)
+_encode_pool: Optional[ThreadPoolExecutor] = None
+_encode_pool_lock = threading.Lock()
+
+
+def _get_encode_pool() -> ThreadPoolExecutor:
+    global _encode_pool
+    with _encode_pool_lock:
+        if _encode_pool is None:
+            _encode_pool = ThreadPoolExecutor(
+                max_workers=_ENCODE_THREADS, thread_name_prefix="tokenizer"
+            )
+        return _encode_pool
+
+
+class TokenWindowSplitter:
+    """
+    Token splitter equivalent to langchain's ``TokenTextSplitter``: every
+    document is encoded once and its chunks are windows of ``chunk_size``
+    tokens advancing by ``chunk_size - chunk_overlap``. ``split_batch``
+    encodes many documents in parallel.
+    """
+
+    def __init__(self, encoding, chunk_size: int, chunk_overlap: int):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"Chunk overlap ({chunk_overlap}) must be smaller than "
+                f"chunk size ({chunk_size})"
+            )
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def _windows(self, text: str, tokens: list[int]) -> list[tuple[str, int]]:
+        chunks = []
+        stride = self.chunk_size - self.chunk_overlap
+        index = 0
+        previous_len = 0
+        for start in range(0, len(tokens), stride):
+            chunk = self.encoding.decode(tokens[start : start + self.chunk_size])
+            # Same start_index bookkeeping as langchain's create_documents.
+            offset = index + previous_len - self.chunk_overlap
+            index = text.find(chunk, max(0, offset))
+            previous_len = len(chunk)
+            chunks.append((chunk, index))
+            if start + self.chunk_size >= len(tokens):
+                break
+        return chunks
+
+    def split_text(self, text: str) -> list[str]:
+        return [
+            chunk
+            for chunk, _ in self._windows(text, self.encoding.encode_ordinary(text))
+        ]
+
+    def split_batch(self, docs: list[Document]) -> list[list[Document]]:
+        """Split ``docs``, returning the chunks of each document in order."""
+        texts = [doc.page_content for doc in docs]
+        if len(texts) > 1 and _ENCODE_THREADS > 1:
+            token_lists = _get_encode_pool().map(self.encoding.encode_ordinary, texts)
+        else:
+            token_lists = [self.encoding.encode_ordinary(text) for text in texts]
+        return [
+            [
+                Document(
+                    page_content=chunk,
+                    metadata={**doc.metadata, "start_index": index},
+                )
+                for chunk, index in self._windows(text, tokens)
+            ]
+            for doc, text, tokens in zip(docs, texts, token_lists)
+        ]
+
+    def split_documents(self, docs: list[Document]) -> list[Document]:
+        return [chunk for chunks in self.split_batch(docs) for chunk in chunks]
+
+
+TextSplitter = Union[RecursiveCharacterTextSplitter, TokenWindowSplitter]
+
+_splitters: dict[tuple, TextSplitter] = {}
+_splitters_lock = threading.Lock()
+
+
+def get_text_splitter(
+    splitter_type: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    encoding_name: Optional[str] = None,
+) -> TextSplitter:
+    """
+    Shared splitter for the given settings. Splitters are stateless, so one
+    instance (and its tokenizer) serves every request.
+    """
+    if splitter_type in ["", "character"]:
+        key = ("character", chunk_size, chunk_overlap, None)
+    elif splitter_type == "token":
+        key = ("token", chunk_size, chunk_overlap, str(encoding_name))
+    else:
+        raise ValueError(f"Invalid text splitter: {splitter_type}")
+
+    with _splitters_lock:
+        splitter = _splitters.get(key)
+        if splitter is None:
+            if key[0] == "character":
+                splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=chunk_size,
+                    chunk_overlap=chunk_overlap,
+                    add_start_index=True,
+                )
+            else:
+                import tiktoken
+
+                log.info(f"Using token text splitter: {encoding_name}")
+                splitter = TokenWindowSplitter(
+                    tiktoken.get_encoding(str(encoding_name)), chunk_size, chunk_overlap
+                )
+            _splitters[key] = splitter
+        return splitter
+
+
+def split_document_batch(
+    splitter: TextSplitter, docs: list[Document]
+) -> list[list[Document]]:
+    """Split ``docs`` with ``splitter``, returning each document's chunks."""
+    if isinstance(splitter, TokenWindowSplitter):
+        return splitter.split_batch(docs)
+    return [splitter.split_documents([doc]) for doc in docs]
@@ -17,24 +17,29 @@ import uuid
 from typing import Optional, Union
 
 import asyncio
-import requests
 import hashlib
 import json
-from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename  ## MOD: CWE-22: For sanitizing paths
 import re  ## MOD: CWE-22: Expression check
 from huggingface_hub import snapshot_download
-from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
+from langchain.retrievers import EnsembleRetriever
 from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
-from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT, BM25_INDEX
+from open_webui.retrieval.vector.aio import run_in_executor
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.cache import cached_embedding_function
+from open_webui.retrieval.embedding_client import get_embedding_session, map_batches
+from open_webui.retrieval.batcher import (
+    get_batched_embedding_model,
+    get_batched_reranker,
+)
 
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -45,6 +50,7 @@ from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_EMBEDDING_TIMEOUT,
 )
 
 log = logging.getLogger(__name__)
@@ -63,42 +69,115 @@ from langchain_core.retrievers import BaseRetriever
 # filters instead of maintaining per-file collections.
 
 
+def _matches_filter(metadata: dict, query_filter: Dict[str, Any]) -> bool:
+    """In-memory equivalent of the vector DB filters, list values match any member."""
+    for key, value in query_filter.items():
+        if isinstance(value, (list, tuple)):
+            if metadata.get(key) not in value:
+                return False
+        elif metadata.get(key) != value:
+            return False
+    return True
+
+
+def merge_query_filters(
+    query_filters: Optional[list[Optional[Dict[str, Any]]]],
+) -> list[Optional[Dict[str, Any]]]:
+    """
+    Collapse single-key filters on the same key into one set membership
+    filter, e.g. one {"file_id": ...} per knowledge file into
+    {"file_id": [...]}, so a collection is searched once instead of once per
+    file. Other filters are kept as they are.
+    """
+    if not query_filters:
+        return [None]
+
+    merged: Dict[str, list] = {}
+    others = []
+    for query_filter in query_filters:
+        if query_filter and len(query_filter) == 1:
+            ((key, value),) = query_filter.items()
+            values = merged.setdefault(key, [])
+            for v in value if isinstance(value, (list, tuple)) else [value]:
+                if v not in values:
+                    values.append(v)
+        elif query_filter not in others:
+            others.append(query_filter)
+
+    return [
+        {key: values if len(values) > 1 else values[0]}
+        for key, values in merged.items()
+    ] + others
+
+
 def _filter_search_result(
     result: SearchResult, query_filter: Dict[str, Any]
 ) -> SearchResult:
     if result is None or not query_filter:
         return result
-    ids = result.ids[0] if result.ids else []
-    metadatas = result.metadatas[0] if result.metadatas else []
-    documents = result.documents[0] if result.documents else []
-    distances = result.distances[0] if result.distances else []
 
     filtered_ids = []
     filtered_metadatas = []
     filtered_documents = []
     filtered_distances = []
 
-    for idx in range(len(ids)):
-        metadata = metadatas[idx] if idx < len(metadatas) else {}
-        if all(metadata.get(k) == v for k, v in query_filter.items()):
-            filtered_ids.append(ids[idx])
-            filtered_metadatas.append(metadata)
-            filtered_documents.append(documents[idx] if idx < len(documents) else "")
-            if distances:
-                filtered_distances.append(distances[idx])
+    # Filter every row, a search carries one row per query vector.
+    for row in range(len(result.ids or [])):
+        ids = result.ids[row]
+        metadatas = result.metadatas[row] if result.metadatas else []
+        documents = result.documents[row] if result.documents else []
+        distances = result.distances[row] if result.distances else []
+
+        row_ids = []
+        row_metadatas = []
+        row_documents = []
+        row_distances = []
+        for idx in range(len(ids)):
+            metadata = metadatas[idx] if idx < len(metadatas) else {}
+            if _matches_filter(metadata, query_filter):
+                row_ids.append(ids[idx])
+                row_metadatas.append(metadata)
+                row_documents.append(documents[idx] if idx < len(documents) else "")
+                if distances:
+                    row_distances.append(distances[idx])
+
+        filtered_ids.append(row_ids)
+        filtered_metadatas.append(row_metadatas)
+        filtered_documents.append(row_documents)
+        filtered_distances.append(row_distances)
 
     return SearchResult(
-        ids=[filtered_ids],
-        metadatas=[filtered_metadatas],
-        documents=[filtered_documents],
-        distances=[filtered_distances] if distances else None,
+        ids=filtered_ids,
+        metadatas=filtered_metadatas,
+        documents=filtered_documents,
+        distances=filtered_distances if result.distances else None,
     )
 
 
+def split_search_result(result: SearchResult) -> list[dict]:
+    """Fan a multi-vector search result out into one result dict per query."""
+    rows = []
+    for row in range(len(result.ids or [])):
+        rows.append(
+            {
+                "ids": [result.ids[row]],
+                "distances": [result.distances[row] if result.distances else []],
+                "documents": [result.documents[row]],
+                "metadatas": [result.metadatas[row]],
+            }
+        )
+    return rows
+
+
 def dict_to_filter_expr(filter_dict: Dict[str, Any]) -> str:
     """Translate a metadata filter dict to a Milvus filter expression."""
     return " && ".join(
-        f'metadata["{k}"] == {json.dumps(v)}' for k, v in filter_dict.items()
+        (
+            f'metadata["{k}"] in {json.dumps(list(v))}'
+            if isinstance(v, (list, tuple))
+            else f'metadata["{k}"] == {json.dumps(v)}'
+        )
+        for k, v in filter_dict.items()
     )
 
 
@@ -153,6 +232,31 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    collection_name: Any
+    top_k: int
+    query_filter: Optional[Dict[str, Any]] = None
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        """Retrieve top lexical matches from the persistent BM25 index."""
+        result = BM25_INDEX.search(
+            collection_name=self.collection_name,
+            query=query,
+            k=self.top_k,
+            query_filter=self.query_filter,
+        )
+
+        return [
+            Document(metadata=metadata, page_content=document)
+            for metadata, document in zip(result.metadatas[0], result.documents[0])
+        ]
+
+
 def query_doc(
     collection_name: str,
     query_embedding: list[float],
@@ -161,11 +265,28 @@ def query_doc(
     query_filter: Optional[Dict[str, Any]] = None,
     filter_expr: Optional[str] = None,  ## MOD: RAG-FILTERS: optional filter constraints
 ):
+    return query_doc_batch(
+        collection_name=collection_name,
+        query_embeddings=[query_embedding],
+        k=k,
+        query_filter=query_filter,
+        filter_expr=filter_expr,
+    )
+
+
+def query_doc_batch(
+    collection_name: str,
+    query_embeddings: list[list[float]],
+    k: int,
+    query_filter: Optional[Dict[str, Any]] = None,
+    filter_expr: Optional[str] = None,
+) -> Optional[SearchResult]:
+    """Search a collection with several query vectors in one round trip."""
     try:
         try:
             result = VECTOR_DB_CLIENT.search(
                 collection_name=collection_name,
-                vectors=[query_embedding],
+                vectors=query_embeddings,
                 limit=k,
                 **(
                     {"filter": query_filter} if query_filter else {}
@@ -175,7 +296,7 @@ def query_doc(
         except TypeError:
             result = VECTOR_DB_CLIENT.search(
                 collection_name=collection_name,
-                vectors=[query_embedding],
+                vectors=query_embeddings,
                 limit=k,
             )
             if query_filter:
@@ -190,6 +311,32 @@ def query_doc(
         raise e
 
 
+async def aquery_doc_batch(
+    collection_name: str,
+    query_embeddings: list[list[float]],
+    k: int,
+    query_filter: Optional[Dict[str, Any]] = None,
+    filter_expr: Optional[str] = None,
+) -> Optional[SearchResult]:
+    """Async variant of query_doc_batch using the async vector DB client."""
+    try:
+        result = await VECTOR_DB_CLIENT.asearch(
+            collection_name=collection_name,
+            vectors=query_embeddings,
+            limit=k,
+            filter=query_filter,
+            expr=filter_expr,
+        )
+
+        if result:
+            log.debug(f"query_doc:result {result.ids} {result.metadatas}")
+
+        return result
+    except Exception as e:
+        log.exception(f"Error querying doc {collection_name} with limit {k}: {e}")
+        raise e
+
+
 def get_doc(
     collection_name: str,
     user: UserModel = None,
@@ -214,7 +361,7 @@ def get_doc(
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
@@ -224,12 +371,54 @@ def query_doc_with_hybrid_search(
     query_filter: Optional[Dict[str, Any]] = None,
     filter_expr: Optional[str] = None,
 ) -> dict:
+    return query_docs_with_hybrid_search(
+        collection_name=collection_name,
+        collection_result=collection_result,
+        queries=[query],
+        embedding_function=embedding_function,
+        k=k,
+        reranking_function=reranking_function,
+        k_reranker=k_reranker,
+        r=r,
+        query_filter=query_filter,
+        filter_expr=filter_expr,
+    )
+
+
+def query_docs_with_hybrid_search(
+    collection_name: str,
+    collection_result: Optional[GetResult],
+    queries: list[str],
+    embedding_function,
+    k: int,
+    reranking_function,
+    k_reranker: int,
+    r: float,
+    query_filter: Optional[Dict[str, Any]] = None,
+    filter_expr: Optional[str] = None,
+) -> dict:
+    """
+    Hybrid search for several queries with a single rerank. The BM25 and
+    vector hits of every query are pooled and reranked once, each document
+    keeping its best score over the queries.
+    """
     try:
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        if BM25_INDEX is not None:
+            bm25_retriever = BM25IndexRetriever(
+                collection_name=collection_name,
+                top_k=k,
+                query_filter=query_filter,
+            )
+        else:
+            if collection_result is None:
+                collection_result = get_doc(
+                    collection_name=collection_name, query_filter=query_filter
+                )
+            bm25_retriever = BM25Retriever.from_texts(
+                texts=collection_result.documents[0],
+                metadatas=collection_result.metadatas[0],
+            )
+            bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -249,11 +438,12 @@ def query_doc_with_hybrid_search(
             r_score=r,
         )
 
-        compression_retriever = ContextualCompressionRetriever(
-            base_compressor=compressor, base_retriever=ensemble_retriever
-        )
+        candidates = {}
+        for query in queries:
+            for doc in ensemble_retriever.invoke(query):
+                candidates.setdefault(doc.page_content, doc)
 
-        result = compression_retriever.invoke(query)
+        result = compressor.rerank(list(candidates.values()), queries)
 
         distances = [d.metadata.get("score") for d in result]
         documents = [d.page_content for d in result]
@@ -263,7 +453,7 @@ def query_doc_with_hybrid_search(
             filtered = [
                 (dist, doc, meta)
                 for dist, doc, meta in zip(distances, documents, metadatas)
-                if all(meta.get(k) == v for k, v in query_filter.items())
+                if _matches_filter(meta, query_filter)
             ]
             if filtered:
                 distances, documents, metadatas = map(list, zip(*filtered))
@@ -271,12 +461,12 @@ def query_doc_with_hybrid_search(
                 distances, documents, metadatas = [], [], []
 
         # retrieve only min(k, k_reranker) items, sort and cut by distance if k < k_reranker
-        if k < k_reranker:
+        if k < k_reranker and distances:
             sorted_items = sorted(
                 zip(distances, metadatas, documents), key=lambda x: x[0], reverse=True
             )
             sorted_items = sorted_items[:k]
-            distances, documents, metadatas = map(list, zip(*sorted_items))
+            distances, metadatas, documents = map(list, zip(*sorted_items))
 
         result = {
             "distances": [distances],
@@ -359,7 +549,7 @@ def get_all_items_from_collection(
 ) -> dict:
     results = []
 
-    for query_filter in filters if filters else [None]:
+    for query_filter in merge_query_filters(filters):
         try:
             result = get_doc(collection_name=collection_name, query_filter=query_filter)
             if result is not None:
@@ -380,24 +570,65 @@ def query_collection(
     ] = None,  ## MOD: RAG-FILTERS: support multiple filter dicts
 ) -> dict:
     results = []
-    filters = (
-        query_filters if query_filters else [None]
+    filters = merge_query_filters(
+        query_filters
     )  ## MOD: RAG-FILTERS: iterate through provided filters
-    for query in queries:
-        query_embedding = embedding_function(query, prefix=RAG_EMBEDDING_QUERY_PREFIX)
-        for f in filters:
-            try:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                    query_filter=f,
-                    filter_expr=dict_to_filter_expr(f) if f else None,
-                )
-                if result is not None:
-                    results.append(result.model_dump())
-            except Exception as e:
-                log.exception(f"Error when querying the collection: {e}")
+    if not queries:
+        return merge_and_sort_query_results(results, k=k)
+
+    # Embed every query in one call and send all vectors in a single search
+    # per filter; each backend returns one result row per query vector.
+    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+    for f in filters:
+        try:
+            result = query_doc_batch(
+                collection_name=collection_name,
+                k=k,
+                query_embeddings=query_embeddings,
+                query_filter=f,
+                filter_expr=dict_to_filter_expr(f) if f else None,
+            )
+            if result is not None:
+                results.extend(split_search_result(result))
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+
+    return merge_and_sort_query_results(results, k=k)
+
+
+async def aquery_collection(
+    collection_name: str,
+    queries: list[str],
+    embedding_function,
+    k: int,
+    query_filters: Optional[list[Dict[str, Any]]] = None,
+) -> dict:
+    """Async variant of query_collection, searching all filters concurrently."""
+    filters = merge_query_filters(query_filters)
+    if not queries:
+        return merge_and_sort_query_results([], k=k)
+
+    query_embeddings = await run_in_executor(
+        embedding_function, queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+    )
+
+    async def search(f):
+        try:
+            return await aquery_doc_batch(
+                collection_name=collection_name,
+                k=k,
+                query_embeddings=query_embeddings,
+                query_filter=f,
+                filter_expr=dict_to_filter_expr(f) if f else None,
+            )
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+            return None
+
+    results = []
+    for result in await asyncio.gather(*[search(f) for f in filters]):
+        if result is not None:
+            results.extend(split_search_result(result))
 
     return merge_and_sort_query_results(results, k=k)
 
@@ -416,28 +647,27 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    filters = query_filters if query_filters else [None]  ## MOD: RAG-FILTERS
-    collection_results = []
-    for f in filters:
-        try:
-            collection_results.append(
-                get_doc(collection_name=collection_name, query_filter=f)
-            )
-        except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results.append(None)
+    # One hybrid search per merged filter, usually a single one per collection.
+    filters = merge_query_filters(query_filters)  ## MOD: RAG-FILTERS
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(filters)} filters..."
     )
 
-    def process_query(index, query):
-        f = filters[index]
+    for f in filters:
         try:
-            result = query_doc_with_hybrid_search(
+            # The persistent BM25 index serves lexical hits directly, the
+            # collection only has to be fetched when it is disabled.
+            collection_result = None
+            if BM25_INDEX is None:
+                collection_result = get_doc(
+                    collection_name=collection_name, query_filter=f
+                )
+
+            result = query_docs_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[index],
-                query=query,
+                collection_result=collection_result,
+                queries=queries,
                 embedding_function=embedding_function,
                 k=k,
                 reranking_function=reranking_function,
@@ -446,22 +676,11 @@ def query_collection_with_hybrid_search(
                 query_filter=f,
                 filter_expr=dict_to_filter_expr(f) if f else None,
             )
-            return result, None
+            if result is not None:
+                results.append(result)
         except Exception as e:
             log.exception(f"Error when querying the collection with hybrid_search: {e}")
-            return None, e
-
-    tasks = [(idx, query) for idx in range(len(filters)) for query in queries]
-
-    with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, idx, q) for idx, q in tasks]
-        task_results = [future.result() for future in future_results]
-
-    for result, err in task_results:
-        if err is not None:
             error = True
-        elif result is not None:
-            results.append(result)
 
     if error and not results:
         raise Exception(
@@ -478,9 +697,39 @@ def get_embedding_function(
     url,
     key,
     embedding_batch_size,
+    embedding_cache=None,
+):
+    func = _get_embedding_function(
+        embedding_engine,
+        embedding_model,
+        embedding_function,
+        url,
+        key,
+        embedding_batch_size,
+    )
+    if embedding_cache is None:
+        return func
+
+    return cached_embedding_function(
+        func,
+        embedding_cache,
+        engine=embedding_engine,
+        model=embedding_model,
+    )
+
+
+def _get_embedding_function(
+    embedding_engine,
+    embedding_model,
+    embedding_function,
+    url,
+    key,
+    embedding_batch_size,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
+        # Concurrent requests share padded batches on the local model.
+        model = get_batched_embedding_model(embedding_function)
+        return lambda query, prefix=None, user=None: model.encode(
             query, prompt=prefix if prefix else None
         ).tolist()
     elif embedding_engine in ["ollama", "openai"]:
@@ -496,16 +745,12 @@ def get_embedding_function(
 
         def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
-                    )
-                return embeddings
+                # Batches run concurrently, results keep the input order.
+                return map_batches(
+                    lambda batch: func(batch, prefix=prefix, user=user),
+                    query,
+                    embedding_batch_size,
+                )
             else:
                 return func(query, prefix, user)
 
@@ -516,216 +761,171 @@ def get_embedding_function(
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
 
-def get_sources_from_files(
-    request,
-    files,
-    queries,
-    embedding_function,
-    k,
-    reranking_function,
-    k_reranker,
-    r,
-    hybrid_search,
-    full_context=False,
-):
-    log.debug(
-        f"files: {files} {queries} {embedding_function} {reranking_function} {full_context}"
+def get_file_content(request, file) -> str:
+    """
+    Text content of a file. Files whose loader streams them (spreadsheets)
+    have no stored content and are read back from their upload.
+    """
+    content = (file.data or {}).get("content")
+    if content or not file.path:
+        return content or ""
+
+    # The loaders load the OCR models on import, only import them when used.
+    from open_webui.retrieval.loaders.main import get_file_loader
+    from open_webui.storage.provider import Storage
+
+    loader = get_file_loader(request.app.state.config)
+    content_type = (file.meta or {}).get("content_type")
+    file_path = Storage.get_file(file.path)
+    if not loader.supports_streaming(file.filename, content_type, file_path):
+        return ""
+    return " ".join(
+        doc.page_content
+        for doc in loader.lazy_load(file.filename, content_type, file_path)
     )
 
-    extracted_collections = set()
-    relevant_contexts = []
 
-    for file in files:
+def _get_file_context(request, file, extracted_collections: set):
+    """
+    Resolve what has to be looked up for ``file``.
+
+    Returns ``(context, None)`` when the context is known without searching,
+    ``(None, groups)`` with the collection names and filters to search, or
+    ``(None, None)`` when the file can be skipped.
+    """
+    context = None
+    if file.get("docs"):
+        # BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL
+        context = {
+            "documents": [[doc.get("content") for doc in file.get("docs")]],
+            "metadatas": [[doc.get("metadata") for doc in file.get("docs")]],
+        }
+    elif file.get("context") == "full":
+        # Manual Full Mode Toggle
+        content = file.get("file").get("data", {}).get("content")
+        if not content and file.get("id"):
+            file_object = Files.get_file_by_id(file.get("id"))
+            if file_object:
+                content = get_file_content(request, file_object)
+        context = {
+            "documents": [[content]],
+            "metadatas": [[{"file_id": file.get("id"), "name": file.get("name")}]],
+        }
+    elif (
+        file.get("type") != "web_search"
+        and request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+    ):
+        # BYPASS_EMBEDDING_AND_RETRIEVAL
+        if file.get("type") == "collection":
+            file_ids = file.get("data", {}).get("file_ids", [])
+
+            documents = []
+            metadatas = []
+            for file_id in file_ids:
+                file_object = Files.get_file_by_id(file_id)
+
+                if file_object:
+                    documents.append(get_file_content(request, file_object))
+                    metadatas.append(
+                        {
+                            "file_id": file_id,
+                            "name": file_object.filename,
+                            "source": file_object.filename,
+                        }
+                    )
 
-        context = None
-        if file.get("docs"):
-            # BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL
             context = {
-                "documents": [[doc.get("content") for doc in file.get("docs")]],
-                "metadatas": [[doc.get("metadata") for doc in file.get("docs")]],
+                "documents": [documents],
+                "metadatas": [metadatas],
             }
-        elif file.get("context") == "full":
-            # Manual Full Mode Toggle
+
+        elif file.get("id"):
+            file_object = Files.get_file_by_id(file.get("id"))
+            if file_object:
+                context = {
+                    "documents": [[get_file_content(request, file_object)]],
+                    "metadatas": [
+                        [
+                            {
+                                "file_id": file.get("id"),
+                                "name": file_object.filename,
+                                "source": file_object.filename,
+                            }
+                        ]
+                    ],
+                }
+        elif file.get("file").get("data"):
             context = {
                 "documents": [[file.get("file").get("data", {}).get("content")]],
-                "metadatas": [[{"file_id": file.get("id"), "name": file.get("name")}]],
+                "metadatas": [[file.get("file").get("data", {}).get("metadata", {})]],
             }
-        elif (
-            file.get("type") != "web_search"
-            and request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
-        ):
-            # BYPASS_EMBEDDING_AND_RETRIEVAL
-            if file.get("type") == "collection":
+    else:
+        collection_infos = []
+        if file.get("type") == "collection":
+            if file.get("legacy"):
+                for cn in file.get("collection_names", []):
+                    collection_infos.append({"name": cn})
+            else:
                 file_ids = file.get("data", {}).get("file_ids", [])
-
-                documents = []
-                metadatas = []
                 for file_id in file_ids:
                     file_object = Files.get_file_by_id(file_id)
-
                     if file_object:
-                        documents.append(file_object.data.get("content", ""))
-                        metadatas.append(
+                        filter_dict = {"file_id": file_id}
+                        collection_infos.append(
                             {
-                                "file_id": file_id,
-                                "name": file_object.filename,
-                                "source": file_object.filename,
+                                "name": build_user_collection_name(file_object.user_id),
+                                "filter": filter_dict,
                             }
                         )
-
-                context = {
-                    "documents": [documents],
-                    "metadatas": [metadatas],
-                }
-
-            elif file.get("id"):
-                file_object = Files.get_file_by_id(file.get("id"))
-                if file_object:
-                    context = {
-                        "documents": [[file_object.data.get("content", "")]],
-                        "metadatas": [
-                            [
-                                {
-                                    "file_id": file.get("id"),
-                                    "name": file_object.filename,
-                                    "source": file_object.filename,
-                                }
-                            ]
-                        ],
+        elif file.get("collection_name"):
+            if file.get("session_id"):
+                filter_dict = {"session_id": file["session_id"]}
+                collection_infos.append(
+                    {
+                        "name": file["collection_name"],
+                        "filter": filter_dict,
                     }
-            elif file.get("file").get("data"):
-                context = {
-                    "documents": [[file.get("file").get("data", {}).get("content")]],
-                    "metadatas": [
-                        [file.get("file").get("data", {}).get("metadata", {})]
-                    ],
-                }
+                )
             else:
-                collection_infos = []
-            if file.get("type") == "collection":
-                if file.get("legacy"):
-                    for cn in file.get("collection_names", []):
-                        collection_infos.append({"name": cn})
-                else:
-                    file_ids = file.get("data", {}).get("file_ids", [])
-                    for file_id in file_ids:
-                        file_object = Files.get_file_by_id(file_id)
-                        if file_object:
-                            filter_dict = {"file_id": file_id}
-                            collection_infos.append(
-                                {
-                                    "name": build_user_collection_name(
-                                        file_object.user_id
-                                    ),
-                                    "filter": filter_dict,
-                                }
-                            )
-            elif file.get("collection_name"):
-                if file.get("session_id"):
-                    filter_dict = {"session_id": file["session_id"]}
+                collection_infos.append({"name": file["collection_name"]})
+        elif file.get("id"):
+            if file.get("legacy"):
+                collection_infos.append({"name": f"{file['id']}"})
+            else:
+                file_object = Files.get_file_by_id(file.get("id"))
+                if file_object:
+                    filter_dict = {"file_id": file["id"]}
                     collection_infos.append(
                         {
-                            "name": file["collection_name"],
+                            "name": build_user_collection_name(file_object.user_id),
                             "filter": filter_dict,
                         }
                     )
-                else:
-                    collection_infos.append({"name": file["collection_name"]})
-            elif file.get("id"):
-                if file.get("legacy"):
-                    collection_infos.append({"name": f"{file['id']}"})
-                else:
-                    file_object = Files.get_file_by_id(file.get("id"))
-                    if file_object:
-                        filter_dict = {"file_id": file["id"]}
-                        collection_infos.append(
-                            {
-                                "name": build_user_collection_name(file_object.user_id),
-                                "filter": filter_dict,
-                            }
-                        )
-
-            deduped_infos = []
-            for info in collection_infos:
-                ident = (
-                    info.get("name"),
-                    tuple(sorted(info.get("filter", {}).items())),
-                )
-                if ident in extracted_collections:
-                    continue
-                extracted_collections.add(ident)
-                deduped_infos.append(info)
 
-            if not deduped_infos:
-                log.debug(f"skipping {file} as it has already been extracted")
+        deduped_infos = []
+        for info in collection_infos:
+            ident = (
+                info.get("name"),
+                tuple(sorted(info.get("filter", {}).items())),
+            )
+            if ident in extracted_collections:
                 continue
+            extracted_collections.add(ident)
+            deduped_infos.append(info)
 
-            groups: Dict[str, list[Dict[str, Any] | None]] = {}
-            for info in deduped_infos:
-                groups.setdefault(info.get("name"), []).append(info.get("filter"))
+        if not deduped_infos:
+            log.debug(f"skipping {file} as it has already been extracted")
+            return None, None
 
-            if full_context:
-                try:
-                    context_results = [
-                        get_all_items_from_collection(name, filters)
-                        for name, filters in groups.items()
-                    ]
-                    context = merge_get_results(context_results)
-                except Exception as e:
-                    log.exception(e)
+        groups: Dict[str, list[Dict[str, Any] | None]] = {}
+        for info in deduped_infos:
+            groups.setdefault(info.get("name"), []).append(info.get("filter"))
+        return None, groups
 
-            else:
-                try:
-                    context_results = []
-                    if file.get("type") == "text":
-                        context = file["content"]
-                    else:
-                        for name, filters in groups.items():
-                            res = None
-                            if hybrid_search:
-                                try:
-                                    res = query_collection_with_hybrid_search(
-                                        collection_name=name,
-                                        queries=queries,
-                                        embedding_function=embedding_function,
-                                        k=k,
-                                        reranking_function=reranking_function,
-                                        k_reranker=k_reranker,
-                                        r=r,
-                                        query_filters=filters,
-                                    )
-                                except Exception as e:
-                                    log.debug(
-                                        "Error when using hybrid search, using",
-                                        " non hybrid search as fallback.",
-                                    )
-
-                            if (not hybrid_search) or (res is None):
-                                res = query_collection(
-                                    collection_name=name,
-                                    queries=queries,
-                                    embedding_function=embedding_function,
-                                    k=k,
-                                    query_filters=filters,
-                                )
-
-                            if res is not None:
-                                context_results.append(res)
-
-                        context = (
-                            merge_and_sort_query_results(context_results, k=k)
-                            if context_results
-                            else None
-                        )
-                except Exception as e:
-                    log.exception(e)
+    return context, None
 
-        if context:
-            if "data" in file:
-                del file["data"]
-
-            relevant_contexts.append({**context, "file": file})
 
+def _contexts_to_sources(relevant_contexts: list[dict]) -> list[dict]:
     sources = []
     for context in relevant_contexts:
         try:
@@ -742,8 +942,285 @@ def get_sources_from_files(
                     sources.append(source)
         except Exception as e:
             log.exception(e)
+    return sources
+
+
+def _retrieval_cache_params(
+    request, k, k_reranker, r, hybrid_search, full_context
+) -> dict:
+    config = request.app.state.config
+    return {
+        "embedding": [config.RAG_EMBEDDING_ENGINE, config.RAG_EMBEDDING_MODEL],
+        "k": k,
+        "hybrid_search": hybrid_search,
+        "full_context": full_context,
+        **(
+            {
+                "reranking": config.RAG_RERANKING_MODEL,
+                "k_reranker": k_reranker,
+                "r": r,
+            }
+            if hybrid_search
+            else {}
+        ),
+    }
+
+
+def get_sources_from_files(
+    request,
+    files,
+    queries,
+    embedding_function,
+    k,
+    reranking_function,
+    k_reranker,
+    r,
+    hybrid_search,
+    full_context=False,
+):
+    log.debug(
+        f"files: {files} {queries} {embedding_function} {reranking_function} {full_context}"
+    )
+
+    def search_group(name, filters):
+        res = None
+        if hybrid_search:
+            try:
+                res = query_collection_with_hybrid_search(
+                    collection_name=name,
+                    queries=queries,
+                    embedding_function=embedding_function,
+                    k=k,
+                    reranking_function=reranking_function,
+                    k_reranker=k_reranker,
+                    r=r,
+                    query_filters=filters,
+                )
+            except Exception as e:
+                log.debug(
+                    "Error when using hybrid search, using",
+                    " non hybrid search as fallback.",
+                )
+
+        if (not hybrid_search) or (res is None):
+            res = query_collection(
+                collection_name=name,
+                queries=queries,
+                embedding_function=embedding_function,
+                k=k,
+                query_filters=filters,
+            )
+        return res
+
+    def cached(name, filters, compute):
+        if cache is None:
+            return compute(name, filters)
+
+        key = cache.key(name, filters, [] if full_context else queries, params)
+        res = cache.get(key)
+        if res is None:
+            res = compute(name, filters)
+            if res is not None:
+                cache.set(key, res)
+        return res
+
+    cache = None
+    params = None
+    extracted_collections = set()
+    relevant_contexts = []
+
+    for file in files:
+        context, groups = _get_file_context(request, file, extracted_collections)
+
+        if groups is not None and params is None:
+            cache = request.app.state.RETRIEVAL_CACHE
+            params = _retrieval_cache_params(
+                request, k, k_reranker, r, hybrid_search, full_context
+            )
+
+        if groups is None:
+            pass
+        elif full_context:
+            try:
+                context_results = [
+                    cached(name, filters, get_all_items_from_collection)
+                    for name, filters in groups.items()
+                ]
+                context = merge_get_results(context_results)
+            except Exception as e:
+                log.exception(e)
+
+        else:
+            try:
+                context_results = []
+                if file.get("type") == "text":
+                    context = file["content"]
+                else:
+                    for name, filters in groups.items():
+                        res = cached(name, filters, search_group)
+                        if res is not None:
+                            context_results.append(res)
+
+                    context = (
+                        merge_and_sort_query_results(context_results, k=k)
+                        if context_results
+                        else None
+                    )
+            except Exception as e:
+                log.exception(e)
+
+        if context:
+            if "data" in file:
+                del file["data"]
+
+            relevant_contexts.append({**context, "file": file})
+
+    sources = _contexts_to_sources(relevant_contexts)
     # MOD TAG AMER-ENH
-    log.debug("contexts %s", context)
+    log.debug("contexts %s", relevant_contexts)
+
+    return sources
+
+
+async def aget_sources_from_files(
+    request,
+    files,
+    queries,
+    embedding_function,
+    k,
+    reranking_function,
+    k_reranker,
+    r,
+    hybrid_search,
+    full_context=False,
+):
+    """
+    Async variant of get_sources_from_files. Plain vector searches go through
+    the async vector DB client, blocking work (embedding, hybrid search with
+    reranking, full context reads) runs on the shared bounded executor.
+    """
+    log.debug(
+        f"files: {files} {queries} {embedding_function} {reranking_function} {full_context}"
+    )
+
+    def plan_files():
+        extracted_collections = set()
+        return [
+            (file, *_get_file_context(request, file, extracted_collections))
+            for file in files
+        ]
+
+    # File and knowledge lookups hit the database, keep them off the event loop.
+    plans = await run_in_executor(plan_files)
+
+    cache = None
+    params = None
+    if any(groups is not None for _, _, groups in plans):
+        cache = request.app.state.RETRIEVAL_CACHE
+        params = _retrieval_cache_params(
+            request, k, k_reranker, r, hybrid_search, full_context
+        )
+
+    async def cached(name, filters, compute):
+        if cache is None:
+            return await compute(name, filters)
+
+        # Redis lookups block, keep them off the event loop.
+        key = await run_in_executor(
+            cache.key, name, filters, [] if full_context else queries, params
+        )
+        res = await run_in_executor(cache.get, key)
+        if res is None:
+            res = await compute(name, filters)
+            if res is not None:
+                await run_in_executor(cache.set, key, res)
+        return res
+
+    async def all_items(name, filters):
+        return await run_in_executor(get_all_items_from_collection, name, filters)
+
+    async def search_group(name, filters):
+        res = None
+        if hybrid_search:
+            try:
+                res = await run_in_executor(
+                    query_collection_with_hybrid_search,
+                    collection_name=name,
+                    queries=queries,
+                    embedding_function=embedding_function,
+                    k=k,
+                    reranking_function=reranking_function,
+                    k_reranker=k_reranker,
+                    r=r,
+                    query_filters=filters,
+                )
+            except Exception as e:
+                log.debug(
+                    "Error when using hybrid search, using non hybrid search as fallback."
+                )
+
+        if (not hybrid_search) or (res is None):
+            res = await aquery_collection(
+                collection_name=name,
+                queries=queries,
+                embedding_function=embedding_function,
+                k=k,
+                query_filters=filters,
+            )
+        return res
+
+    async def resolve(file, context, groups):
+        if groups is None:
+            return context
+
+        if full_context:
+            try:
+                context_results = await asyncio.gather(
+                    *[
+                        cached(name, filters, all_items)
+                        for name, filters in groups.items()
+                    ]
+                )
+                return merge_get_results(list(context_results))
+            except Exception as e:
+                log.exception(e)
+                return None
+
+        if file.get("type") == "text":
+            return file["content"]
+
+        try:
+            context_results = [
+                res
+                for res in await asyncio.gather(
+                    *[
+                        cached(name, filters, search_group)
+                        for name, filters in groups.items()
+                    ]
+                )
+                if res is not None
+            ]
+            return (
+                merge_and_sort_query_results(context_results, k=k)
+                if context_results
+                else None
+            )
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    contexts = await asyncio.gather(*[resolve(*plan) for plan in plans])
+
+    relevant_contexts = []
+    for file, context in zip(files, contexts):
+        if context:
+            if "data" in file:
+                del file["data"]
+
+            relevant_contexts.append({**context, "file": file})
+
+    sources = _contexts_to_sources(relevant_contexts)
+    log.debug("contexts %s", relevant_contexts)
 
     return sources
 
@@ -810,6 +1287,23 @@ def get_model_path(model: str, update_model: bool = False):
         return model
 
 
+def _embedding_headers(key: str, user: Optional[UserModel]) -> dict:
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {key}",
+        **(
+            {
+                "X-OpenWebUI-User-Name": user.name,
+                "X-OpenWebUI-User-Id": user.id,
+                "X-OpenWebUI-User-Email": user.email,
+                "X-OpenWebUI-User-Role": user.role,
+            }
+            if ENABLE_FORWARD_USER_INFO_HEADERS and user
+            else {}
+        ),
+    }
+
+
 def generate_openai_batch_embeddings(
     model: str,
     texts: list[str],
@@ -823,23 +1317,11 @@ def generate_openai_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        r = get_embedding_session().post(
             f"{url}/embeddings",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
-                ),
-            },
+            headers=_embedding_headers(key, user),
             json=json_data,
+            timeout=RAG_EMBEDDING_TIMEOUT,
         )
         r.raise_for_status()
         data = r.json()
@@ -865,23 +1347,11 @@ def generate_ollama_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        r = get_embedding_session().post(
             f"{url}/api/embed",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
-                    else {}
-                ),
-            },
+            headers=_embedding_headers(key, user),
             json=json_data,
+            timeout=RAG_EMBEDDING_TIMEOUT,
         )
         r.raise_for_status()
         data = r.json()
@@ -971,22 +1441,61 @@ class RerankCompressor(BaseDocumentCompressor):
         query: str,
         callbacks: Optional[Callbacks] = None,
     ) -> Sequence[Document]:
+        return self.rerank(documents, [query])
+
+    def rerank(
+        self, documents: Sequence[Document], queries: list[str]
+    ) -> Sequence[Document]:
+        """
+        Score every document against every query in one call and keep the
+        best score of each document.
+        """
+        if not documents or not queries:
+            return []
+
         reranking = self.reranking_function is not None
 
         if reranking:
-            scores = self.reranking_function.predict(
-                [(query, doc.page_content) for doc in documents]
-            )
+            reranker = get_batched_reranker(self.reranking_function)
+            if getattr(reranker, "batchable", True):
+                scores = reranker.predict(
+                    [
+                        (query, doc.page_content)
+                        for query in queries
+                        for doc in documents
+                    ]
+                )
+                scores = scores.tolist() if hasattr(scores, "tolist") else list(scores)
+            else:
+                # One call per query for models scoring a query's documents jointly.
+                scores = []
+                for query in queries:
+                    query_scores = reranker.predict(
+                        [(query, doc.page_content) for doc in documents]
+                    )
+                    scores.extend(
+                        query_scores.tolist()
+                        if hasattr(query_scores, "tolist")
+                        else list(query_scores)
+                    )
+            scores = [
+                max(scores[q * len(documents) + i] for q in range(len(queries)))
+                for i in range(len(documents))
+            ]
         else:
             from sentence_transformers import util
 
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
+            query_embeddings = self.embedding_function(
+                queries, RAG_EMBEDDING_QUERY_PREFIX
+            )
             document_embedding = self.embedding_function(
                 [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = (
+                util.cos_sim(query_embeddings, document_embedding).max(dim=0).values
+            ).tolist()
 
-        docs_with_scores = list(zip(documents, scores.tolist()))
+        docs_with_scores = list(zip(documents, scores))
         if self.r_score:
             docs_with_scores = [
                 (d, s) for d, s in docs_with_scores if s >= self.r_score
@@ -0,0 +1,88 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from open_webui.config import VECTOR_DB_EXECUTOR_MAX_WORKERS
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.main import GetResult, SearchResult, VectorItem
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Process wide bounded pool for blocking retrieval work (sync vector DB
+    drivers, embedding and reranking calls) issued from the event loop.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=VECTOR_DB_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="vector-db",
+                )
+    return _executor
+
+
+async def run_in_executor(func: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+class AsyncVectorDBClient:
+    """
+    Async counterparts of the vector DB client methods.
+
+    Clients with a native async driver override these. The defaults run the
+    sync method on the shared bounded executor, so the event loop is never
+    blocked and concurrency is capped by VECTOR_DB_EXECUTOR_MAX_WORKERS.
+    """
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
+        expr: Optional[str] = None,
+    ) -> Optional[SearchResult]:
+        return await run_in_executor(
+            self.search,
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+            filter=filter,
+            expr=expr,
+        )
+
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await run_in_executor(
+            self.query, collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]):
+        return await run_in_executor(
+            self.insert, collection_name=collection_name, items=items
+        )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        return await run_in_executor(
+            self.delete, collection_name=collection_name, ids=ids, filter=filter
+        )
@@ -1,4 +1,5 @@
-from open_webui.config import VECTOR_DB
+from open_webui.config import VECTOR_DB, ENABLE_RAG_BM25_INDEX, RAG_BM25_INDEX_DIR
+from open_webui.retrieval.vector.observer import ObservedVectorDBClient
 
 if VECTOR_DB == "milvus":
     from open_webui.retrieval.vector.dbs.milvus import MilvusClient
@@ -24,3 +25,13 @@ else:
     from open_webui.retrieval.vector.dbs.chroma import ChromaClient
 
     VECTOR_DB_CLIENT = ChromaClient()
+
+# Route writes through an observer so derived indexes stay in sync.
+VECTOR_DB_CLIENT = ObservedVectorDBClient(VECTOR_DB_CLIENT)
+
+BM25_INDEX = None
+if ENABLE_RAG_BM25_INDEX:
+    from open_webui.retrieval.bm25 import BM25Index
+
+    BM25_INDEX = BM25Index(RAG_BM25_INDEX_DIR, loader=VECTOR_DB_CLIENT.get)
+    VECTOR_DB_CLIENT.add_listener(BM25_INDEX)
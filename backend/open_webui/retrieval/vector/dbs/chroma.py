@@ -6,6 +6,7 @@ from chromadb.utils.batch_utils import create_batches
 from typing import Optional
 
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient
 from open_webui.config import (
     CHROMA_DATA_PATH,
     CHROMA_HTTP_HOST,
@@ -23,7 +24,10 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class ChromaClient:
+class ChromaClient(AsyncVectorDBClient):
+    # The embedded chroma client is sync only, async calls use the shared
+    # bounded executor of AsyncVectorDBClient.
+
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -63,11 +67,27 @@ class ChromaClient:
         # Delete the collection based on the collection name.
         return self.client.delete_collection(name=collection_name)
 
+    def _build_where(self, filter: Optional[dict]) -> Optional[dict]:
+        # Chroma only accepts a single key per where clause, combine with $and.
+        # List values are set membership filters.
+        if not filter:
+            return None
+        conditions = [
+            (
+                {key: {"$in": list(value)}}
+                if isinstance(value, (list, tuple))
+                else {key: value}
+            )
+            for key, value in filter.items()
+        ]
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
     def search(
         self,
         collection_name: str,
         vectors: list[list[float | int]],
         limit: int,
+        filter: Optional[dict] = None,
         expr: Optional[str] = None,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
@@ -77,13 +97,15 @@ class ChromaClient:
                 result = collection.query(
                     query_embeddings=vectors,
                     n_results=limit,
+                    where=self._build_where(filter),
                 )
 
                 # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
                 # https://docs.trychroma.com/docs/collections/configure cosine equation
-                distances: list = result["distances"][0]
-                distances = [2 - dist for dist in distances]
-                distances = [[dist / 2 for dist in distances]]
+                # One row per query vector.
+                distances = [
+                    [(2 - dist) / 2 for dist in row] for row in result["distances"]
+                ]
 
                 return SearchResult(
                     **{
@@ -105,7 +127,7 @@ class ChromaClient:
             collection = self.client.get_collection(name=collection_name)
             if collection:
                 result = collection.get(
-                    where=filter,
+                    where=self._build_where(filter),
                     limit=limit,
                 )
 
@@ -169,6 +191,14 @@ class ChromaClient:
             ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas
         )
 
+    def update_metadata(self, collection_name: str, items: list[dict]):
+        # Replace the metadata of stored items, their embeddings are kept.
+        collection = self.client.get_collection(name=collection_name)
+        collection.update(
+            ids=[item["id"] for item in items],
+            metadatas=[item["metadata"] for item in items],
+        )
+
     def delete(
         self,
         collection_name: str,
@@ -182,7 +212,7 @@ class ChromaClient:
                 if ids:
                     collection.delete(ids=ids)
                 elif filter:
-                    collection.delete(where=filter)
+                    collection.delete(where=self._build_where(filter))
         except Exception as e:
             # If collection doesn't exist, that's fine - nothing to delete
             log.debug(
@@ -1,8 +1,9 @@
-from elasticsearch import Elasticsearch, BadRequestError
+from elasticsearch import AsyncElasticsearch, Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
-from elasticsearch.helpers import bulk, scan
+from elasticsearch.helpers import async_bulk, bulk, scan
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient
 from open_webui.config import (
     ELASTICSEARCH_URL,
     ELASTICSEARCH_CA_CERTS,
@@ -15,7 +16,7 @@ from open_webui.config import (
 )
 
 
-class ElasticsearchClient:
+class ElasticsearchClient(AsyncVectorDBClient):
     """
     Important:
     in order to reduce the number of indexes and since the embedding vector length is fixed, we avoid creating
@@ -25,7 +26,7 @@ class ElasticsearchClient:
 
     def __init__(self):
         self.index_prefix = ELASTICSEARCH_INDEX_PREFIX
-        self.client = Elasticsearch(
+        connection_options = dict(
             hosts=[ELASTICSEARCH_URL],
             ca_certs=ELASTICSEARCH_CA_CERTS,
             api_key=ELASTICSEARCH_API_KEY,
@@ -37,6 +38,8 @@ class ElasticsearchClient:
             ),
             ssl_assert_fingerprint=SSL_ASSERT_FINGERPRINT,
         )
+        self.client = Elasticsearch(**connection_options)
+        self.aclient = AsyncElasticsearch(**connection_options)
 
     # Status: works
     def _get_index_name(self, dimension: int) -> str:
@@ -74,27 +77,46 @@ class ElasticsearchClient:
 
     # Status: works
     def _result_to_search_result(self, result) -> SearchResult:
+        return self._msearch_result_to_search_result([result])
+
+    def _msearch_result_to_search_result(self, results) -> SearchResult:
+        # One row per search response, in request order.
         ids = []
         distances = []
         documents = []
         metadatas = []
 
-        for hit in result["hits"]["hits"]:
-            ids.append(hit["_id"])
-            distances.append(hit["_score"])
-            documents.append(hit["_source"].get("text"))
-            metadatas.append(hit["_source"].get("metadata"))
+        for result in results:
+            _ids = []
+            _distances = []
+            _documents = []
+            _metadatas = []
+            for hit in result.get("hits", {}).get("hits", []):
+                _ids.append(hit["_id"])
+                _distances.append(hit["_score"])
+                _documents.append(hit["_source"].get("text"))
+                _metadatas.append(hit["_source"].get("metadata"))
+
+            ids.append(_ids)
+            distances.append(_distances)
+            documents.append(_documents)
+            metadatas.append(_metadatas)
 
         return SearchResult(
-            ids=[ids],
-            distances=[distances],
-            documents=[documents],
-            metadatas=[metadatas],
+            ids=ids,
+            distances=distances,
+            documents=documents,
+            metadatas=metadatas,
         )
 
     # Status: works
     def _create_index(self, dimension: int):
-        body = {
+        self.client.indices.create(
+            index=self._get_index_name(dimension), body=self._index_body(dimension)
+        )
+
+    def _index_body(self, dimension: int) -> dict:
+        return {
             "mappings": {
                 "dynamic_templates": [
                     {
@@ -118,7 +140,6 @@ class ElasticsearchClient:
                 },
             }
         }
-        self.client.indices.create(index=self._get_index_name(dimension), body=body)
 
     # Status: works
 
@@ -126,6 +147,17 @@ class ElasticsearchClient:
         for i in range(0, len(items), batch_size):
             yield items[i : min(i + batch_size, len(items))]
 
+    def _build_filter_clauses(self, collection_name: str, filter: Optional[dict]):
+        # Metadata strings are mapped as keyword (see dynamic_templates), so
+        # exact term matches can be pushed into bool.filter.
+        clauses = [{"term": {"collection": collection_name}}]
+        for field, value in (filter or {}).items():
+            if isinstance(value, (list, tuple)):
+                clauses.append({"terms": {f"metadata.{field}": list(value)}})
+            else:
+                clauses.append({"term": {f"metadata.{field}": value}})
+        return clauses
+
     # Status: works
     def has_collection(self, collection_name) -> bool:
         query_body = {"query": {"bool": {"filter": []}}}
@@ -150,31 +182,44 @@ class ElasticsearchClient:
         collection_name: str,
         vectors: list[list[float]],
         limit: int,
+        filter: Optional[dict] = None,
         expr: Optional[str] = None,
     ) -> Optional[SearchResult]:
-        query = {
-            "size": limit,
-            "_source": ["text", "metadata"],
-            "query": {
-                "script_score": {
+        # One msearch request carrying a query per vector.
+        result = self.client.msearch(
+            index=self._get_index_name(len(vectors[0])),
+            searches=self._msearch_body(collection_name, vectors, limit, filter),
+        )
+
+        return self._msearch_result_to_search_result(result["responses"])
+
+    def _msearch_body(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        filter: Optional[dict],
+    ) -> list[dict]:
+        filter_clauses = self._build_filter_clauses(collection_name, filter)
+        searches = []
+        for vector in vectors:
+            searches.append({})
+            searches.append(
+                {
+                    "size": limit,
+                    "_source": ["text", "metadata"],
                     "query": {
-                        "bool": {"filter": [{"term": {"collection": collection_name}}]}
-                    },
-                    "script": {
-                        "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
-                        "params": {
-                            "vector": vectors[0]
-                        },  # Assuming single query vector
+                        "script_score": {
+                            "query": {"bool": {"filter": filter_clauses}},
+                            "script": {
+                                "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
+                                "params": {"vector": vector},
+                            },
+                        }
                     },
                 }
-            },
-        }
-
-        result = self.client.search(
-            index=self._get_index_name(len(vectors[0])), body=query
-        )
-
-        return self._result_to_search_result(result)
+            )
+        return searches
 
     # Status: only tested halfwat
     def query(
@@ -183,23 +228,11 @@ class ElasticsearchClient:
         if not self.has_collection(collection_name):
             return None
 
-        query_body = {
-            "query": {"bool": {"filter": []}},
-            "_source": ["text", "metadata"],
-        }
-
-        for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append({"term": {field: value}})
-        query_body["query"]["bool"]["filter"].append(
-            {"term": {"collection": collection_name}}
-        )
-        size = limit if limit else 10
-
         try:
             result = self.client.search(
                 index=f"{self.index_prefix}*",
-                body=query_body,
-                size=size,
+                body=self._query_body(collection_name, filter),
+                size=limit if limit else 10,
             )
 
             return self._result_to_get_result(result)
@@ -207,6 +240,14 @@ class ElasticsearchClient:
         except Exception as e:
             return None
 
+    def _query_body(self, collection_name: str, filter: dict) -> dict:
+        return {
+            "query": {
+                "bool": {"filter": self._build_filter_clauses(collection_name, filter)}
+            },
+            "_source": ["text", "metadata"],
+        }
+
     # Status: works
     def _has_index(self, dimension: int):
         return self.client.indices.exists(
@@ -234,20 +275,22 @@ class ElasticsearchClient:
             self._create_index(dimension=len(items[0]["vector"]))
 
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_index": self._get_index_name(dimension=len(items[0]["vector"])),
-                    "_id": item["id"],
-                    "_source": {
-                        "collection": collection_name,
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": item["metadata"],
-                    },
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._insert_actions(collection_name, batch))
+
+    def _insert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_index": self._get_index_name(dimension=len(items[0]["vector"])),
+                "_id": item["id"],
+                "_source": {
+                    "collection": collection_name,
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": item["metadata"],
+                },
+            }
+            for item in items
+        ]
 
     # Upsert documents using the update API with doc_as_upsert=True.
     def upsert(self, collection_name: str, items: list[VectorItem]):
@@ -271,6 +314,27 @@ class ElasticsearchClient:
             ]
             bulk(self.client, actions)
 
+    # Replace the metadata of stored documents, their vectors are kept. The
+    # documents may live in any of the per dimension indexes.
+    def update_metadata(self, collection_name: str, items: list[dict]):
+        for batch in self._create_batches(items):
+            self.client.update_by_query(
+                index=f"{self.index_prefix}*",
+                body=self._update_metadata_query(collection_name, batch),
+                refresh=True,
+            )
+
+    def _update_metadata_query(self, collection_name: str, items: list[dict]) -> dict:
+        return {
+            **self._delete_query(collection_name, [item["id"] for item in items], None),
+            "script": {
+                "source": "ctx._source.metadata = params.metadata[ctx._id]",
+                "params": {
+                    "metadata": {item["id"]: item["metadata"] for item in items}
+                },
+            },
+        }
+
     # Delete specific documents from a collection by filtering on both collection and document IDs.
     def delete(
         self,
@@ -278,7 +342,17 @@ class ElasticsearchClient:
         ids: Optional[list[str]] = None,
         filter: Optional[dict] = None,
     ):
+        self.client.delete_by_query(
+            index=f"{self.index_prefix}*",
+            body=self._delete_query(collection_name, ids, filter),
+        )
 
+    def _delete_query(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]],
+        filter: Optional[dict],
+    ) -> dict:
         query = {
             "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}}
         }
@@ -286,14 +360,64 @@ class ElasticsearchClient:
         if ids:
             query["query"]["bool"]["filter"].append({"terms": {"_id": ids}})
         elif filter:
-            for field, value in filter.items():
-                query["query"]["bool"]["filter"].append(
-                    {"term": {f"metadata.{field}": value}}
-                )
-
-        self.client.delete_by_query(index=f"{self.index_prefix}*", body=query)
+            query["query"]["bool"]["filter"] = self._build_filter_clauses(
+                collection_name, filter
+            )
+        return query
 
     def reset(self):
         indices = self.client.indices.get(index=f"{self.index_prefix}*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+    ####################
+    # Async
+    ####################
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        filter: Optional[dict] = None,
+        expr: Optional[str] = None,
+    ) -> Optional[SearchResult]:
+        result = await self.aclient.msearch(
+            index=self._get_index_name(len(vectors[0])),
+            searches=self._msearch_body(collection_name, vectors, limit, filter),
+        )
+        return self._msearch_result_to_search_result(result["responses"])
+
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        try:
+            result = await self.aclient.search(
+                index=f"{self.index_prefix}*",
+                body=self._query_body(collection_name, filter),
+                size=limit if limit else 10,
+            )
+            return self._result_to_get_result(result)
+        except Exception as e:
+            return None
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]):
+        dimension = len(items[0]["vector"])
+        if not await self.aclient.indices.exists(index=self._get_index_name(dimension)):
+            await self.aclient.indices.create(
+                index=self._get_index_name(dimension), body=self._index_body(dimension)
+            )
+
+        for batch in self._create_batches(items):
+            await async_bulk(self.aclient, self._insert_actions(collection_name, batch))
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        await self.aclient.delete_by_query(
+            index=f"{self.index_prefix}*",
+            body=self._delete_query(collection_name, ids, filter),
+        )
@@ -11,7 +11,14 @@ import json
 import logging
 from typing import Any, Optional
 
+try:
+    # Only available in newer pymilvus releases and not for Milvus Lite.
+    from pymilvus import AsyncMilvusClient
+except ImportError:
+    AsyncMilvusClient = None
+
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient, run_in_executor
 from open_webui.config import (
     MILVUS_URI,
     MILVUS_USER,      #MOD: AMER-MOD
@@ -25,7 +32,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class MilvusClient:
+class MilvusClient(AsyncVectorDBClient):
     def __init__(self) -> None:
         """Initialize the Milvus client using credentials or token auth."""
         ## MOD: AMER-MOD Auth allocation for Milvus Vector DB
@@ -46,6 +53,26 @@ class MilvusClient:
                 token=MILVUS_TOKEN,
             )
 
+        # Without a native async client the AsyncVectorDBClient executor
+        # fallbacks are used.
+        self.aclient = None
+        if AsyncMilvusClient is not None and MILVUS_URI.startswith(
+            ("http://", "https://", "tcp://")
+        ):
+            if MILVUS_TOKEN is None:
+                self.aclient = AsyncMilvusClient(
+                    uri=MILVUS_URI,
+                    user=MILVUS_USER,
+                    password=MILVUS_PASSWORD,
+                    db_name=MILVUS_DB_NAME,
+                )
+            else:
+                self.aclient = AsyncMilvusClient(
+                    uri=MILVUS_URI,
+                    db_name=MILVUS_DB_NAME,
+                    token=MILVUS_TOKEN,
+                )
+
     def _result_to_get_result(self, result) -> GetResult:
         ids = []
         documents = []
@@ -143,6 +170,20 @@ class MilvusClient:
             index_params=index_params,
         )
 
+    def _build_filter(self, filter: Optional[dict]) -> str:
+        # Milvus boolean expression on the JSON metadata field, list values
+        # are set membership filters.
+        return " && ".join(
+            [
+                (
+                    f'metadata["{key}"] in {json.dumps(list(value))}'
+                    if isinstance(value, (list, tuple))
+                    else f'metadata["{key}"] == {json.dumps(value)}'
+                )
+                for key, value in (filter or {}).items()
+            ]
+        )
+
     def has_collection(self, collection_name: str) -> bool:
         """Check if a collection exists."""
         collection_name = collection_name.replace("-", "_")
@@ -162,6 +203,7 @@ class MilvusClient:
         collection_name: str,
         vectors: list[list[float | int]],
         limit: int,
+        filter: Optional[dict] = None,
         expr: Optional[str] = None,
     ) -> Optional[SearchResult]:
         """Search for nearest neighbor items and return results."""
@@ -171,7 +213,7 @@ class MilvusClient:
             data=vectors,
             limit=limit,
             output_fields=["data", "metadata"],
-            expr=expr,
+            filter=self._build_filter(filter) if filter else (expr or ""),
         )
 
         return self._result_to_search_result(result)
@@ -184,12 +226,7 @@ class MilvusClient:
         if not self.has_collection(collection_name):
             return None
 
-        filter_string = " && ".join(
-            [
-                f'metadata["{key}"] == {json.dumps(value)}'
-                for key, value in filter.items()
-            ]
-        )
+        filter_string = self._build_filter(filter)
 
         max_limit = 16383  # The maximum number of records per request
         all_results = []
@@ -260,17 +297,20 @@ class MilvusClient:
 
         return self.client.insert(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            data=[
-                {
-                    "id": item["id"],
-                    "vector": item["vector"],
-                    "data": {"text": item["text"]},
-                    "metadata": item["metadata"],
-                }
-                for item in items
-            ],
+            data=self._items_to_rows(items),
         )
 
+    def _items_to_rows(self, items: list[VectorItem]) -> list[dict]:
+        return [
+            {
+                "id": item["id"],
+                "vector": item["vector"],
+                "data": {"text": item["text"]},
+                "metadata": item["metadata"],
+            }
+            for item in items
+        ]
+
     def upsert(self, collection_name: str, items: list[VectorItem]) -> Any:
         """Update or insert items in a collection."""
         collection_name = collection_name.replace("-", "_")
@@ -283,17 +323,13 @@ class MilvusClient:
 
         return self.client.upsert(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            data=[
-                {
-                    "id": item["id"],
-                    "vector": item["vector"],
-                    "data": {"text": item["text"]},
-                    "metadata": item["metadata"],
-                }
-                for item in items
-            ],
+            data=self._items_to_rows(items),
         )
 
+    def update_metadata(self, collection_name: str, items: list[dict]) -> Any:
+        """Milvus only replaces whole rows, vectors included."""
+        raise NotImplementedError("Milvus cannot update metadata in place")
+
     def delete(
         self,
         collection_name: str,
@@ -308,12 +344,7 @@ class MilvusClient:
                 ids=ids,
             )
         elif filter:
-            filter_string = " && ".join(
-                [
-                    f'metadata["{key}"] == {json.dumps(value)}'
-                    for key, value in filter.items()
-                ]
-            )
+            filter_string = self._build_filter(filter)
 
             return self.client.delete(
                 collection_name=f"{self.collection_prefix}_{collection_name}",
@@ -326,3 +357,70 @@ class MilvusClient:
         for collection_name in collection_names:
             if collection_name.startswith(self.collection_prefix):
                 self.client.drop_collection(collection_name=collection_name)
+
+    ####################
+    # Async
+    ####################
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
+        expr: Optional[str] = None,
+    ) -> Optional[SearchResult]:
+        if self.aclient is None:
+            return await super().asearch(collection_name, vectors, limit, filter, expr)
+
+        collection_name = collection_name.replace("-", "_")
+        result = await self.aclient.search(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            data=vectors,
+            limit=limit,
+            output_fields=["data", "metadata"],
+            filter=self._build_filter(filter) if filter else (expr or ""),
+        )
+        return self._result_to_search_result(result)
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]) -> Any:
+        if self.aclient is None:
+            return await super().ainsert(collection_name, items)
+
+        collection_name = collection_name.replace("-", "_")
+        # Collection management stays on the sync client.
+        if not await run_in_executor(
+            self.client.has_collection,
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+        ):
+            await run_in_executor(
+                self._create_collection,
+                collection_name=collection_name,
+                dimension=len(items[0]["vector"]),
+            )
+
+        return await self.aclient.insert(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            data=self._items_to_rows(items),
+        )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ) -> Any:
+        if self.aclient is None:
+            return await super().adelete(collection_name, ids, filter)
+
+        collection_name = collection_name.replace("-", "_")
+        if ids:
+            return await self.aclient.delete(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                ids=ids,
+            )
+        elif filter:
+            return await self.aclient.delete(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                filter=self._build_filter(filter),
+            )
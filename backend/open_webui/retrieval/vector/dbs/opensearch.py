@@ -1,8 +1,9 @@
-from opensearchpy import OpenSearch
+from opensearchpy import AsyncOpenSearch, OpenSearch
 from opensearchpy.helpers import bulk
 from typing import Optional
 
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient
 from open_webui.config import (
     OPENSEARCH_URI,
     OPENSEARCH_SSL,
@@ -12,15 +13,18 @@ from open_webui.config import (
 )
 
 
-class OpenSearchClient:
+class OpenSearchClient(AsyncVectorDBClient):
     def __init__(self):
         self.index_prefix = "open_webui"
-        self.client = OpenSearch(
+        connection_options = dict(
             hosts=[OPENSEARCH_URI],
             use_ssl=OPENSEARCH_SSL,
             verify_certs=OPENSEARCH_CERT_VERIFY,
             http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
         )
+        self.client = OpenSearch(**connection_options)
+        # Native async transport for the read path, writes use the executor.
+        self.aclient = AsyncOpenSearch(**connection_options)
 
     def _get_index_name(self, collection_name: str) -> str:
         return f"{self.index_prefix}_{collection_name}"
@@ -44,22 +48,36 @@ class OpenSearchClient:
         if not result["hits"]["hits"]:
             return None
 
+        return self._msearch_result_to_search_result([result])
+
+    def _msearch_result_to_search_result(self, results) -> SearchResult:
+        # One row per search response, in request order.
         ids = []
         distances = []
         documents = []
         metadatas = []
 
-        for hit in result["hits"]["hits"]:
-            ids.append(hit["_id"])
-            distances.append(hit["_score"])
-            documents.append(hit["_source"].get("text"))
-            metadatas.append(hit["_source"].get("metadata"))
+        for result in results:
+            _ids = []
+            _distances = []
+            _documents = []
+            _metadatas = []
+            for hit in result.get("hits", {}).get("hits", []):
+                _ids.append(hit["_id"])
+                _distances.append(hit["_score"])
+                _documents.append(hit["_source"].get("text"))
+                _metadatas.append(hit["_source"].get("metadata"))
+
+            ids.append(_ids)
+            distances.append(_distances)
+            documents.append(_documents)
+            metadatas.append(_metadatas)
 
         return SearchResult(
-            ids=[ids],
-            distances=[distances],
-            documents=[documents],
-            metadatas=[metadatas],
+            ids=ids,
+            distances=distances,
+            documents=documents,
+            metadatas=metadatas,
         )
 
     def _create_index(self, collection_name: str, dimension: int):
@@ -96,6 +114,28 @@ class OpenSearchClient:
         for i in range(0, len(items), batch_size):
             yield items[i : i + batch_size]
 
+    def _build_filter_clauses(self, filter: Optional[dict]) -> list:
+        # Metadata is dynamically mapped, strings get a text field with a
+        # keyword sub-field. Exact matches go through the keyword sub-field.
+        clauses = []
+        for field, value in (filter or {}).items():
+            if isinstance(value, (list, tuple)):
+                keyword = all(isinstance(v, str) for v in value)
+                clauses.append(
+                    {
+                        "terms": {
+                            f"metadata.{field}{'.keyword' if keyword else ''}": list(
+                                value
+                            )
+                        }
+                    }
+                )
+            elif isinstance(value, str):
+                clauses.append({"term": {f"metadata.{field}.keyword": value}})
+            else:
+                clauses.append({"term": {f"metadata.{field}": value}})
+        return clauses
+
     def has_collection(self, collection_name: str) -> bool:
         # has_collection here means has index.
         # We are simply adapting to the norms of the other DBs.
@@ -111,61 +151,70 @@ class OpenSearchClient:
         collection_name: str,
         vectors: list[list[float | int]],
         limit: int,
+        filter: Optional[dict] = None,
         expr: Optional[str] = None,
     ) -> Optional[SearchResult]:
         try:
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
-                    }
-                },
-            }
-
-            result = self.client.search(
-                index=self._get_index_name(collection_name), body=query
+            # One msearch request carrying a query per vector.
+            result = self.client.msearch(
+                index=self._get_index_name(collection_name),
+                body=self._msearch_body(vectors, limit, filter),
             )
 
-            return self._result_to_search_result(result)
+            responses = result["responses"]
+            if not any(response.get("hits", {}).get("hits") for response in responses):
+                return None
+
+            return self._msearch_result_to_search_result(responses)
 
         except Exception as e:
             return None
 
+    def _msearch_body(
+        self, vectors: list[list[float | int]], limit: int, filter: Optional[dict]
+    ) -> list[dict]:
+        filter_clauses = self._build_filter_clauses(filter)
+        body = []
+        for vector in vectors:
+            body.append({})
+            body.append(
+                {
+                    "size": limit,
+                    "_source": ["text", "metadata"],
+                    "query": {
+                        "script_score": {
+                            "query": (
+                                {"bool": {"filter": filter_clauses}}
+                                if filter_clauses
+                                else {"match_all": {}}
+                            ),
+                            "script": {
+                                "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                                "params": {
+                                    "field": "vector",
+                                    "query_value": vector,
+                                },
+                            },
+                        }
+                    },
+                }
+            )
+        return body
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
         if not self.has_collection(collection_name):
             return None
 
-        query_body = {
-            "query": {"bool": {"filter": []}},
-            "_source": ["text", "metadata"],
-        }
-
-        for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append(
-                {"match": {"metadata." + str(field): value}}
-            )
-
-        size = limit if limit else 10
-
         try:
             result = self.client.search(
                 index=self._get_index_name(collection_name),
-                body=query_body,
-                size=size,
+                body=self._query_body(filter),
+                size=limit if limit else 10,
             )
 
             return self._result_to_get_result(result)
@@ -173,6 +222,23 @@ class OpenSearchClient:
         except Exception as e:
             return None
 
+    def _query_body(self, filter: dict) -> dict:
+        query_body = {
+            "query": {"bool": {"filter": []}},
+            "_source": ["text", "metadata"],
+        }
+
+        for field, value in filter.items():
+            if isinstance(value, (list, tuple)):
+                query_body["query"]["bool"]["filter"].extend(
+                    self._build_filter_clauses({field: value})
+                )
+            else:
+                query_body["query"]["bool"]["filter"].append(
+                    {"match": {"metadata." + str(field): value}}
+                )
+        return query_body
+
     def _create_index_if_not_exists(self, collection_name: str, dimension: int):
         if not self.has_collection(collection_name):
             self._create_index(collection_name, dimension)
@@ -228,6 +294,23 @@ class OpenSearchClient:
             ]
             bulk(self.client, actions)
 
+    def update_metadata(self, collection_name: str, items: list[dict]):
+        # Replace the metadata of stored documents, their vectors are kept.
+        for batch in self._create_batches(items):
+            self.client.update_by_query(
+                index=self._get_index_name(collection_name),
+                body={
+                    "query": {"ids": {"values": [item["id"] for item in batch]}},
+                    "script": {
+                        "source": "ctx._source.metadata = params.metadata[ctx._id]",
+                        "params": {
+                            "metadata": {item["id"]: item["metadata"] for item in batch}
+                        },
+                    },
+                },
+                refresh=True,
+            )
+
     def delete(
         self,
         collection_name: str,
@@ -245,18 +328,64 @@ class OpenSearchClient:
             ]
             bulk(self.client, actions)
         elif filter:
-            query_body = {
-                "query": {"bool": {"filter": []}},
-            }
-            for field, value in filter.items():
-                query_body["query"]["bool"]["filter"].append(
-                    {"match": {"metadata." + str(field): value}}
-                )
             self.client.delete_by_query(
-                index=self._get_index_name(collection_name), body=query_body
+                index=self._get_index_name(collection_name),
+                body={"query": self._query_body(filter)["query"]},
             )
 
     def reset(self):
         indices = self.client.indices.get(index=f"{self.index_prefix}_*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+    ####################
+    # Async
+    ####################
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
+        expr: Optional[str] = None,
+    ) -> Optional[SearchResult]:
+        try:
+            if not await self.aclient.indices.exists(
+                index=self._get_index_name(collection_name)
+            ):
+                return None
+
+            result = await self.aclient.msearch(
+                index=self._get_index_name(collection_name),
+                body=self._msearch_body(vectors, limit, filter),
+            )
+
+            responses = result["responses"]
+            if not any(response.get("hits", {}).get("hits") for response in responses):
+                return None
+
+            return self._msearch_result_to_search_result(responses)
+
+        except Exception as e:
+            return None
+
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.aclient.indices.exists(
+            index=self._get_index_name(collection_name)
+        ):
+            return None
+
+        try:
+            result = await self.aclient.search(
+                index=self._get_index_name(collection_name),
+                body=self._query_body(filter),
+                size=limit if limit else 10,
+            )
+
+            return self._result_to_get_result(result)
+
+        except Exception as e:
+            return None
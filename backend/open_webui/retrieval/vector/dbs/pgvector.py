@@ -4,6 +4,8 @@ from sqlalchemy import (
     cast,
     column,
     create_engine,
+    delete,
+    event,
     Column,
     Integer,
     MetaData,
@@ -13,6 +15,7 @@ from sqlalchemy import (
     Table,
     values,
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.sql import true
 from sqlalchemy.pool import NullPool
 
@@ -22,7 +25,15 @@ from pgvector.sqlalchemy import Vector
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
 
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from pgvector.asyncpg import register_vector
+    import asyncpg  # noqa: F401
+except ImportError:
+    create_async_engine = None
+
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient
 from open_webui.config import PGVECTOR_DB_URL, PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -44,7 +55,7 @@ class DocumentChunk(Base):
     vmetadata = Column(MutableDict.as_mutable(JSONB), nullable=True)
 
 
-class PgvectorClient:
+class PgvectorClient(AsyncVectorDBClient):
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
@@ -94,6 +105,27 @@ class PgvectorClient:
             log.exception(f"Error during initialization: {e}")
             raise
 
+        self.async_session = self._create_async_session()
+
+    def _create_async_session(self):
+        # asyncpg engine for the async methods. It is only used with a
+        # dedicated PGVECTOR_DB_URL, the shared app database session is sync.
+        if create_async_engine is None or not PGVECTOR_DB_URL:
+            return None
+
+        try:
+            url = make_url(PGVECTOR_DB_URL).set(drivername="postgresql+asyncpg")
+            engine = create_async_engine(url, pool_pre_ping=True)
+        except Exception as e:
+            log.warning(f"Async pgvector engine unavailable, using executor: {e}")
+            return None
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def connect(dbapi_connection, connection_record):
+            dbapi_connection.run_async(register_vector)
+
+        return async_sessionmaker(engine, expire_on_commit=False)
+
     def check_vector_length(self) -> None:
         """
         Check if the VECTOR_LENGTH matches the existing vector column dimension in the database.
@@ -141,19 +173,23 @@ class PgvectorClient:
             )
         return vector
 
+    def _items_to_chunks(
+        self, collection_name: str, items: List[VectorItem]
+    ) -> List[DocumentChunk]:
+        return [
+            DocumentChunk(
+                id=item["id"],
+                vector=self.adjust_vector_length(item["vector"]),
+                collection_name=collection_name,
+                text=item["text"],
+                vmetadata=item["metadata"],
+            )
+            for item in items
+        ]
+
     def insert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
-            new_items = []
-            for item in items:
-                vector = self.adjust_vector_length(item["vector"])
-                new_chunk = DocumentChunk(
-                    id=item["id"],
-                    vector=vector,
-                    collection_name=collection_name,
-                    text=item["text"],
-                    vmetadata=item["metadata"],
-                )
-                new_items.append(new_chunk)
+            new_items = self._items_to_chunks(collection_name, items)
             self.session.bulk_save_objects(new_items)
             self.session.commit()
             log.info(
@@ -198,100 +234,127 @@ class PgvectorClient:
             log.exception(f"Error during upsert: {e}")
             raise
 
+    def update_metadata(self, collection_name: str, items: List[dict]) -> None:
+        # Replace the metadata of stored chunks, their vectors are kept.
+        try:
+            self.session.bulk_update_mappings(
+                DocumentChunk,
+                [{"id": item["id"], "vmetadata": item["metadata"]} for item in items],
+            )
+            self.session.commit()
+            log.info(
+                f"Updated the metadata of {len(items)} items in collection '{collection_name}'."
+            )
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during metadata update: {e}")
+            raise
+
+    def _build_metadata_conditions(self, filter: Optional[Dict[str, Any]]) -> list:
+        # JSONB predicates on the chunk metadata, ANDed together. List values
+        # are set membership filters.
+        return [
+            (
+                DocumentChunk.vmetadata[key].astext.in_([str(v) for v in value])
+                if isinstance(value, (list, tuple))
+                else DocumentChunk.vmetadata[key].astext == str(value)
+            )
+            for key, value in (filter or {}).items()
+        ]
+
     def search(
         self,
         collection_name: str,
         vectors: List[List[float]],
         limit: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
         expr: Optional[str] = None,
     ) -> Optional[SearchResult]:
         try:
             if not vectors:
                 return None
 
-            # Adjust query vectors to VECTOR_LENGTH
-            vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
-
-            def vector_expr(vector):
-                return cast(array(vector), Vector(VECTOR_LENGTH))
-
-            # Create the values for query vectors
-            qid_col = column("qid", Integer)
-            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
-            query_vectors = (
-                values(qid_col, q_vector_col)
-                .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
-                )
-                .alias("query_vectors")
-            )
-
-            # Build the lateral subquery for each query vector
-            subq = (
-                select(
-                    DocumentChunk.id,
-                    DocumentChunk.text,
-                    DocumentChunk.vmetadata,
-                    (
-                        DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)
-                    ).label("distance"),
-                )
-                .where(DocumentChunk.collection_name == collection_name)
-                .order_by(
-                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
-                )
-            )
-            if limit is not None:
-                subq = subq.limit(limit)
-            subq = subq.lateral("result")
-
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
-                select(
-                    query_vectors.c.qid,
-                    subq.c.id,
-                    subq.c.text,
-                    subq.c.vmetadata,
-                    subq.c.distance,
-                )
-                .select_from(query_vectors)
-                .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
-            )
-
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
-
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
-
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
-                )
-
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
-
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
+            result_proxy = self.session.execute(
+                self._search_statement(collection_name, vectors, limit, filter)
             )
+            return self._rows_to_search_result(result_proxy.all(), len(vectors))
         except Exception as e:
             log.exception(f"Error during search: {e}")
             return None
 
+    def _search_statement(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        limit: Optional[int],
+        filter: Optional[Dict[str, Any]],
+    ):
+        # Adjust query vectors to VECTOR_LENGTH
+        vectors = [self.adjust_vector_length(vector) for vector in vectors]
+
+        def vector_expr(vector):
+            return cast(array(vector), Vector(VECTOR_LENGTH))
+
+        # Create the values for query vectors
+        qid_col = column("qid", Integer)
+        q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+        query_vectors = (
+            values(qid_col, q_vector_col)
+            .data([(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)])
+            .alias("query_vectors")
+        )
+
+        # Build the lateral subquery for each query vector
+        subq = (
+            select(
+                DocumentChunk.id,
+                DocumentChunk.text,
+                DocumentChunk.vmetadata,
+                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
+                    "distance"
+                ),
+            )
+            .where(DocumentChunk.collection_name == collection_name)
+            .where(*self._build_metadata_conditions(filter))
+            .order_by((DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)))
+        )
+        if limit is not None:
+            subq = subq.limit(limit)
+        subq = subq.lateral("result")
+
+        # Build the main query by joining query_vectors and the lateral subquery
+        return (
+            select(
+                query_vectors.c.qid,
+                subq.c.id,
+                subq.c.text,
+                subq.c.vmetadata,
+                subq.c.distance,
+            )
+            .select_from(query_vectors)
+            .join(subq, true())
+            .order_by(query_vectors.c.qid, subq.c.distance)
+        )
+
+    def _rows_to_search_result(self, results, num_queries: int) -> SearchResult:
+        ids = [[] for _ in range(num_queries)]
+        distances = [[] for _ in range(num_queries)]
+        documents = [[] for _ in range(num_queries)]
+        metadatas = [[] for _ in range(num_queries)]
+
+        for row in results:
+            qid = int(row.qid)
+            ids[qid].append(row.id)
+            # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+            # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+            distances[qid].append((2.0 - row.distance) / 2.0)
+            documents[qid].append(row.text)
+            metadatas[qid].append(row.vmetadata)
+
+        return SearchResult(
+            ids=ids, distances=distances, documents=documents, metadatas=metadatas
+        )
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -300,8 +363,7 @@ class PgvectorClient:
                 DocumentChunk.collection_name == collection_name
             )
 
-            for key, value in filter.items():
-                query = query.filter(DocumentChunk.vmetadata[key].astext == str(value))
+            query = query.filter(*self._build_metadata_conditions(filter))
 
             if limit is not None:
                 query = query.limit(limit)
@@ -361,10 +423,7 @@ class PgvectorClient:
             if ids:
                 query = query.filter(DocumentChunk.id.in_(ids))
             if filter:
-                for key, value in filter.items():
-                    query = query.filter(
-                        DocumentChunk.vmetadata[key].astext == str(value)
-                    )
+                query = query.filter(*self._build_metadata_conditions(filter))
             deleted = query.delete(synchronize_session=False)
             self.session.commit()
             log.info(f"Deleted {deleted} items from collection '{collection_name}'.")
@@ -404,3 +463,106 @@ class PgvectorClient:
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
         log.info(f"Collection '{collection_name}' deleted.")
+
+    ####################
+    # Async
+    ####################
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        expr: Optional[str] = None,
+    ) -> Optional[SearchResult]:
+        if self.async_session is None:
+            return await super().asearch(collection_name, vectors, limit, filter, expr)
+
+        try:
+            if not vectors:
+                return None
+
+            async with self.async_session() as session:
+                result = await session.execute(
+                    self._search_statement(collection_name, vectors, limit, filter)
+                )
+                return self._rows_to_search_result(result.all(), len(vectors))
+        except Exception as e:
+            log.exception(f"Error during search: {e}")
+            return None
+
+    async def aquery(
+        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if self.async_session is None:
+            return await super().aquery(collection_name, filter, limit)
+
+        try:
+            stmt = (
+                select(DocumentChunk)
+                .where(DocumentChunk.collection_name == collection_name)
+                .where(*self._build_metadata_conditions(filter))
+            )
+            if limit is not None:
+                stmt = stmt.limit(limit)
+
+            async with self.async_session() as session:
+                results = (await session.execute(stmt)).scalars().all()
+
+            if not results:
+                return None
+
+            return GetResult(
+                ids=[[result.id for result in results]],
+                documents=[[result.text for result in results]],
+                metadatas=[[result.vmetadata for result in results]],
+            )
+        except Exception as e:
+            log.exception(f"Error during query: {e}")
+            return None
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        if self.async_session is None:
+            return await super().ainsert(collection_name, items)
+
+        async with self.async_session() as session:
+            try:
+                session.add_all(self._items_to_chunks(collection_name, items))
+                await session.commit()
+                log.info(
+                    f"Inserted {len(items)} items into collection '{collection_name}'."
+                )
+            except Exception as e:
+                await session.rollback()
+                log.exception(f"Error during insert: {e}")
+                raise
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if self.async_session is None:
+            return await super().adelete(collection_name, ids, filter)
+
+        stmt = delete(DocumentChunk).where(
+            DocumentChunk.collection_name == collection_name
+        )
+        if ids:
+            stmt = stmt.where(DocumentChunk.id.in_(ids))
+        if filter:
+            stmt = stmt.where(*self._build_metadata_conditions(filter))
+
+        async with self.async_session() as session:
+            try:
+                result = await session.execute(stmt)
+                await session.commit()
+                log.info(
+                    f"Deleted {result.rowcount} items from collection '{collection_name}'."
+                )
+            except Exception as e:
+                await session.rollback()
+                log.exception(f"Error during delete: {e}")
+                raise
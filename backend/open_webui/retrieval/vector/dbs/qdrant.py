@@ -1,11 +1,13 @@
 from typing import Optional
 import logging
 
+from qdrant_client import AsyncQdrantClient
 from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient
 from open_webui.config import QDRANT_URI, QDRANT_API_KEY
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -15,7 +17,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class QdrantClient:
+class QdrantClient(AsyncVectorDBClient):
     def __init__(self):
         self.collection_prefix = "open-webui"
         self.QDRANT_URI = QDRANT_URI
@@ -25,6 +27,11 @@ class QdrantClient:
             if self.QDRANT_URI
             else None
         )
+        self.aclient = (
+            AsyncQdrantClient(url=self.QDRANT_URI, api_key=self.QDRANT_API_KEY)
+            if self.QDRANT_URI
+            else None
+        )
 
     def _result_to_get_result(self, points) -> GetResult:
         ids = []
@@ -72,6 +79,24 @@ class QdrantClient:
             for item in items
         ]
 
+    def _build_filter(self, filter: Optional[dict]) -> Optional[models.Filter]:
+        # Every metadata condition must match, list values match any member.
+        if not filter:
+            return None
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key=f"metadata.{key}",
+                    match=(
+                        models.MatchAny(any=list(value))
+                        if isinstance(value, (list, tuple))
+                        else models.MatchValue(value=value)
+                    ),
+                )
+                for key, value in filter.items()
+            ]
+        )
+
     def has_collection(self, collection_name: str) -> bool:
         return self.client.collection_exists(
             f"{self.collection_prefix}_{collection_name}"
@@ -87,24 +112,54 @@ class QdrantClient:
         collection_name: str,
         vectors: list[list[float | int]],
         limit: int,
+        filter: Optional[dict] = None,
         expr: Optional[str] = None,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         if limit is None:
             limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-        query_response = self.client.query_points(
+        # One batched request for all query vectors, one result row per vector.
+        query_responses = self.client.query_batch_points(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            query=vectors[0],
-            limit=limit,
+            requests=self._query_requests(vectors, limit, filter),
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
+        return self._query_responses_to_search_result(query_responses)
+
+    def _query_requests(
+        self, vectors: list[list[float | int]], limit: int, filter: Optional[dict]
+    ) -> list[models.QueryRequest]:
+        query_filter = self._build_filter(filter)
+        return [
+            models.QueryRequest(
+                query=vector,
+                filter=query_filter,
+                limit=limit,
+                with_payload=True,
+            )
+            for vector in vectors
+        ]
+
+    def _query_responses_to_search_result(self, query_responses) -> SearchResult:
+        ids = []
+        documents = []
+        metadatas = []
+        distances = []
+        for query_response in query_responses:
+            get_result = self._result_to_get_result(query_response.points)
+            ids.extend(get_result.ids)
+            documents.extend(get_result.documents)
+            metadatas.extend(get_result.metadatas)
             # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            distances.append(
+                [(point.score + 1.0) / 2.0 for point in query_response.points]
+            )
+
+        return SearchResult(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            distances=distances,
         )
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
@@ -115,17 +170,9 @@ class QdrantClient:
             if limit is None:
                 limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-            field_conditions = []
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}", match=models.MatchValue(value=value)
-                    )
-                )
-
             points = self.client.query_points(
                 collection_name=f"{self.collection_prefix}_{collection_name}",
-                query_filter=models.Filter(should=field_conditions),
+                query_filter=self._build_filter(filter),
                 limit=limit,
             )
             return self._result_to_get_result(points.points)
@@ -153,6 +200,20 @@ class QdrantClient:
         points = self._create_points(items)
         return self.client.upsert(f"{self.collection_prefix}_{collection_name}", points)
 
+    def update_metadata(self, collection_name: str, items: list[dict]):
+        # Replace the metadata payload of stored points, their vectors are kept.
+        return self.client.batch_update_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            update_operations=[
+                models.SetPayloadOperation(
+                    set_payload=models.SetPayload(
+                        payload={"metadata": item["metadata"]}, points=[item["id"]]
+                    )
+                )
+                for item in items
+            ],
+        )
+
     def delete(
         self,
         collection_name: str,
@@ -160,6 +221,14 @@ class QdrantClient:
         filter: Optional[dict] = None,
     ):
         # Delete the items from the collection based on the ids.
+        return self.client.delete(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            points_selector=self._delete_selector(ids, filter),
+        )
+
+    def _delete_selector(
+        self, ids: Optional[list[str]], filter: Optional[dict]
+    ) -> models.FilterSelector:
         field_conditions = []
 
         if ids:
@@ -171,19 +240,73 @@ class QdrantClient:
                     ),
                 ),
         elif filter:
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}",
-                        match=models.MatchValue(value=value),
-                    ),
+            field_conditions = self._build_filter(filter).must
+
+        return models.FilterSelector(filter=models.Filter(must=field_conditions))
+
+    ####################
+    # Async
+    ####################
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
+        expr: Optional[str] = None,
+    ) -> Optional[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        query_responses = await self.aclient.query_batch_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            requests=self._query_requests(vectors, limit, filter),
+        )
+        return self._query_responses_to_search_result(query_responses)
+
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.aclient.collection_exists(
+            f"{self.collection_prefix}_{collection_name}"
+        ):
+            return None
+        try:
+            points = await self.aclient.query_points(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                query_filter=self._build_filter(filter),
+                limit=limit if limit is not None else NO_LIMIT,
+            )
+            return self._result_to_get_result(points.points)
+        except Exception as e:
+            log.exception(f"Error querying a collection '{collection_name}': {e}")
+            return None
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]):
+        collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
+        if not await self.aclient.collection_exists(collection_name_with_prefix):
+            await self.aclient.create_collection(
+                collection_name=collection_name_with_prefix,
+                vectors_config=models.VectorParams(
+                    size=len(items[0]["vector"]), distance=models.Distance.COSINE
                 ),
+            )
+            log.info(f"collection {collection_name_with_prefix} successfully created!")
 
-        return self.client.delete(
+        return await self.aclient.upsert(
+            collection_name_with_prefix, self._create_points(items)
+        )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        return await self.aclient.delete(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            points_selector=models.FilterSelector(
-                filter=models.Filter(must=field_conditions)
-            ),
+            points_selector=self._delete_selector(ids, filter),
         )
 
     def reset(self):
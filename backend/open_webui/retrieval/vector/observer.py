@@ -0,0 +1,120 @@
+import logging
+from typing import Any, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.aio import run_in_executor
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class VectorDBListener:
+    """Receives write events after they have been applied to the vector DB."""
+
+    def on_insert(self, collection_name: str, items: list) -> None:
+        pass
+
+    def on_delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ) -> None:
+        pass
+
+    def on_delete_collection(self, collection_name: str) -> None:
+        pass
+
+    def on_reset(self) -> None:
+        pass
+
+
+class ObservedVectorDBClient:
+    """
+    Thin wrapper around a vector DB client that forwards every call to the
+    wrapped client and notifies registered listeners about successful writes.
+
+    Derived structures such as the BM25 index stay in sync with the vector DB
+    this way, no matter which router issued the write.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+        self._listeners: list[VectorDBListener] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def add_listener(self, listener: VectorDBListener) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, *args, **kwargs) -> None:
+        for listener in self._listeners:
+            try:
+                getattr(listener, event)(*args, **kwargs)
+            except Exception as e:
+                log.exception(
+                    f"Vector DB listener {type(listener).__name__}.{event} failed: {e}"
+                )
+
+    def insert(self, collection_name: str, items: list):
+        result = self._client.insert(collection_name=collection_name, items=items)
+        self._notify("on_insert", collection_name, items)
+        return result
+
+    def upsert(self, collection_name: str, items: list):
+        result = self._client.upsert(collection_name=collection_name, items=items)
+        self._notify("on_insert", collection_name, items)
+        return result
+
+    def update_metadata(self, collection_name: str, items: list):
+        result = self._client.update_metadata(
+            collection_name=collection_name, items=items
+        )
+        # Listeners replace stored items by id, so an update is an insert.
+        self._notify("on_insert", collection_name, items)
+        return result
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        result = self._client.delete(
+            collection_name=collection_name, ids=ids, filter=filter
+        )
+        self._notify("on_delete", collection_name, ids=ids, filter=filter)
+        return result
+
+    async def ainsert(self, collection_name: str, items: list):
+        result = await self._client.ainsert(
+            collection_name=collection_name, items=items
+        )
+        # Listeners do blocking I/O (e.g. the BM25 index), keep it off the loop.
+        await run_in_executor(self._notify, "on_insert", collection_name, items)
+        return result
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        result = await self._client.adelete(
+            collection_name=collection_name, ids=ids, filter=filter
+        )
+        await run_in_executor(
+            self._notify, "on_delete", collection_name, ids=ids, filter=filter
+        )
+        return result
+
+    def delete_collection(self, collection_name: str):
+        result = self._client.delete_collection(collection_name=collection_name)
+        self._notify("on_delete_collection", collection_name)
+        return result
+
+    def reset(self):
+        result = self._client.reset()
+        self._notify("on_reset")
+        return result
@@ -32,7 +32,9 @@ from open_webui.models.files import (
     FileModelResponse,
     Files,
 )
+from open_webui.models.ingestion_jobs import IngestionJobModel
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.users import Users
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
@@ -79,6 +81,46 @@ def has_access_to_file(
     return has_access
 
 
+############################
+# Process Uploaded File
+############################
+
+
+AUDIO_CONTENT_TYPES = ["audio/mpeg", "audio/wav", "audio/ogg", "audio/x-m4a"]
+IMAGE_CONTENT_TYPES = ["image/png", "image/jpeg", "image/gif"]
+
+
+def process_uploaded_file(request: Request, file: FileModel, user) -> None:
+    """Transcribe or extract an uploaded file and index its content."""
+    content_type = (file.meta or {}).get("content_type")
+    if content_type in AUDIO_CONTENT_TYPES:
+        file_path = Storage.get_file(file.path)
+        result = transcribe(request, file_path)
+        process_file(
+            request,
+            ProcessFileForm(file_id=file.id, content=result.get("text", "")),
+            user=user,
+        )
+    elif content_type not in IMAGE_CONTENT_TYPES:
+        process_file(request, ProcessFileForm(file_id=file.id), user=user)
+
+
+def get_ingestion_job_handler(app):
+    """Handler for IngestionQueue jobs, running outside of any request."""
+
+    def handle(job: IngestionJobModel) -> None:
+        file = Files.get_file_by_id(job.file_id)
+        user = Users.get_user_by_id(job.user_id)
+        if file is None or user is None:
+            raise ValueError(ERROR_MESSAGES.NOT_FOUND)
+
+        # process_file and transcribe only read the app state from the request.
+        request = Request({"type": "http", "app": app, "headers": []})
+        process_uploaded_file(request, file, user)
+
+    return handle
+
+
 ############################
 # Upload File
 ############################
@@ -91,6 +133,7 @@ def upload_file(
     user=Depends(get_verified_user),
     file_metadata: dict = {},
     process: bool = Query(True),
+    process_in_background: bool = Query(False),
 ):
     """Upload a file and store its size from the streamed upload."""
 
@@ -121,24 +164,25 @@ def upload_file(
                 }
             ),
         )
-        if process:
+        queue = request.app.state.INGESTION_QUEUE
+        if (
+            process
+            and process_in_background
+            and queue is not None
+            and file.content_type not in IMAGE_CONTENT_TYPES
+        ):
+            # Returns right away; progress is reported through
+            # GET /files/{id}/process/status and "file-ingestion" socket events.
+            job = queue.enqueue(file_item.id, user.id)
+            if job is None:
+                raise Exception("Error queueing file for processing")
+            file_item = FileModelResponse(
+                **{**file_item.model_dump(), "job": job.model_dump()}
+            )
+        elif process:
             try:
-                if file.content_type in [
-                    "audio/mpeg",
-                    "audio/wav",
-                    "audio/ogg",
-                    "audio/x-m4a",
-                ]:
-                    file_path = Storage.get_file(file_path)
-                    result = transcribe(request, file_path)
-                    process_file(
-                        request,
-                        ProcessFileForm(file_id=id, content=result.get("text", "")),
-                        user=user,
-                    )
-                elif file.content_type not in ["image/png", "image/jpeg", "image/gif"]:
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
-                    file_item = Files.get_file_by_id(id=id)
+                process_uploaded_file(request, file_item, user)
+                file_item = Files.get_file_by_id(id=id)
             except Exception as e:
                 log.exception(e)
                 log.error(f"Error processing file: {file_item.id}")
@@ -165,6 +209,35 @@ def upload_file(
         )
 
 
+############################
+# Get File Processing Status
+############################
+
+
+@router.get("/{id}/process/status")
+async def get_file_process_status(
+    id: str, request: Request, user=Depends(get_verified_user)
+):
+    file = Files.get_file_by_id(id)
+
+    if not file or not (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    queue = request.app.state.INGESTION_QUEUE
+    job = queue.get_file_job(id) if queue is not None else None
+    return {
+        "status": job.status if job else None,
+        "job": job.model_dump() if job else None,
+    }
+
+
 ############################
 # List Files
 ############################
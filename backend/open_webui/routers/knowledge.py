@@ -750,7 +750,7 @@ def add_files_to_knowledge_batch(
         result = process_files_batch(
             request=request,
             form_data=BatchProcessFilesForm(
-                files=files, collection_name=collection_name
+                files=files, collection_name=collection_name, extract=True
             ),
             user=user,
         )
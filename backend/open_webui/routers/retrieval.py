@@ -11,6 +11,8 @@ Modification Log:
 """
 
 # MOD TAG RAG-FILTERS: Accept a single collection with optional filter list.
+import hashlib
+import itertools
 import json
 import logging
 import mimetypes
@@ -18,9 +20,21 @@ import os
 import shutil
 
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+import anyio
 import psutil
 
 from fastapi import (
@@ -37,24 +51,26 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 from threading import BoundedSemaphore
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
 from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, Files
 from open_webui.models.knowledge import Knowledges
 from open_webui.models.users import UserModel
 from open_webui.storage.provider import Storage
+from open_webui.socket.main import emit_to_user
 
 
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 
 # Document loaders
-from open_webui.retrieval.loaders.main import Loader
+from open_webui.retrieval.loaders.main import get_file_loader
+from open_webui.retrieval.pipeline import run_ingestion_pipeline
+from open_webui.retrieval.splitters import get_text_splitter, split_document_batch
+from open_webui.retrieval.batcher import get_batcher_stats
+from open_webui.retrieval.cache import get_token_matrix_cache
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
@@ -103,6 +119,13 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    RAG_INGESTION_EMBED_BATCH_SIZE,
+    RAG_INGESTION_QUEUE_SIZE,
+    RAG_INGESTION_INSERT_WORKERS,
+    RAG_BATCH_EXTRACTION_WORKERS,
+    RAG_COLBERT_CACHE_DIR,
+    RAG_COLBERT_CACHE_SIZE_MB,
+    ENABLE_RAG_INFERENCE_BATCHING,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -194,6 +217,9 @@ def get_rf(
                 rf = ColBERT(
                     get_model_path(reranking_model, auto_update),
                     env="docker" if DOCKER else None,
+                    cache=get_token_matrix_cache(
+                        RAG_COLBERT_CACHE_DIR, RAG_COLBERT_CACHE_SIZE_MB
+                    ),
                 )
 
             except Exception as e:
@@ -288,6 +314,70 @@ async def get_embedding_config(
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(
+    request: Request, user=Depends(get_admin_user)
+) -> Dict[str, Any]:
+    """Return embedding cache hit/miss counters."""
+    cache = request.app.state.EMBEDDING_CACHE
+    return {
+        "status": True,
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {}),
+    }
+
+
+@router.get("/cache")
+async def get_retrieval_cache_stats(
+    request: Request, user=Depends(get_admin_user)
+) -> Dict[str, Any]:
+    """Return retrieval result cache hit/miss counters."""
+    cache = request.app.state.RETRIEVAL_CACHE
+    return {
+        "status": True,
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {}),
+    }
+
+
+@router.get("/extraction/cache")
+async def get_extraction_cache_stats(
+    request: Request, user=Depends(get_admin_user)
+) -> Dict[str, Any]:
+    """Return extraction cache hit/miss counters and size."""
+    cache = request.app.state.EXTRACTION_CACHE
+    return {
+        "status": True,
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {}),
+    }
+
+
+@router.get("/reranking/cache")
+async def get_reranking_cache_stats(
+    request: Request, user=Depends(get_admin_user)
+) -> Dict[str, Any]:
+    """Return ColBERT token matrix cache hit/miss counters and size."""
+    cache = getattr(request.app.state.rf, "cache", None)
+    return {
+        "status": True,
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {}),
+    }
+
+
+@router.get("/batching")
+async def get_inference_batching_stats(
+    request: Request, user=Depends(get_admin_user)
+) -> Dict[str, Any]:
+    """Return queue depth and batch counters of the local model batchers."""
+    return {
+        "status": True,
+        "enabled": ENABLE_RAG_INFERENCE_BATCHING,
+        "batchers": get_batcher_stats(),
+    }
+
+
 @router.get("/reranking")
 async def get_reraanking_config(
     request: Request, user=Depends(get_admin_user)
@@ -370,6 +460,7 @@ async def update_embedding_config(
                 else request.app.state.config.RAG_OLLAMA_API_KEY
             ),
             request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+            request.app.state.EMBEDDING_CACHE,
         )
         log.info(
             "Embedding config updated",
@@ -890,6 +981,47 @@ async def update_query_settings(
 ####################################
 
 
+# Most stored chunks a re-index looks up; Elasticsearch and OpenSearch reject
+# larger pages by default (index.max_result_window).
+REINDEX_LOOKUP_LIMIT = 10000
+
+# Kept chunks whose metadata a re-index refreshes per vector DB call.
+REINDEX_UPDATE_BATCH_SIZE = 100
+
+
+def _get_stored_chunk_ids(
+    collection_name: str, query_filter: Dict[str, Any]
+) -> Optional[Dict[Optional[str], List[str]]]:
+    """Map the content hash of every stored chunk matching the filter to its ids.
+
+    Returns ``None`` when the stored chunks cannot all be listed, either
+    because the lookup failed or because the result may have been truncated.
+    """
+    stored: Dict[Optional[str], List[str]] = {}
+    if not VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        return stored
+
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=collection_name,
+        filter=query_filter,
+        limit=REINDEX_LOOKUP_LIMIT,
+    )
+    if result is None:
+        return None
+    ids = result.ids[0] if result.ids else []
+    if len(ids) >= REINDEX_LOOKUP_LIMIT:
+        return None
+    for id, meta in zip(ids, result.metadatas[0]):
+        # Chunks stored before hashes were recorded never match, so they
+        # are replaced on their first re-index.
+        stored.setdefault((meta or {}).get("chunk_hash"), []).append(id)
+    return stored
+
+
+# Documents split per call; token splitting encodes a batch in parallel.
+SPLIT_BATCH_SIZE = 32
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs: Sequence[Document],
@@ -899,8 +1031,15 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user: Optional[UserModel] = None,
+    reindex_filter: Optional[Dict[str, Any]] = None,
 ) -> bool:
-    """Persist documents to the vector database."""
+    """Persist documents to the vector database.
+
+    With ``reindex_filter`` the documents replace the chunks matching the
+    filter incrementally: chunks whose content hash is already stored are
+    kept with refreshed metadata, only new or changed chunks are embedded and
+    inserted, and only the stale ones are deleted.
+    """
 
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
@@ -918,17 +1057,22 @@ def save_docs_to_vector_db(
 
         return ", ".join(docs_info)
 
-    log.debug(
-        f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
-    )
+    # Streamed documents are only read once, by the pipeline below.
+    if isinstance(docs, Sequence):
+        log.debug(
+            f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
+        )
     log.info(f"save_docs_to_vector_db {collection_name}")
 
     metadata_list: Optional[List[dict]] = None
     if metadata and isinstance(metadata, Sequence) and not isinstance(metadata, dict):
         metadata_list = list(metadata)
+        # One metadata entry per source document, shared by all of its chunks.
+        if len(metadata_list) != len(docs):
+            raise ValueError(ERROR_MESSAGES.DEFAULT("Metadata length mismatch"))
     elif metadata and isinstance(metadata, dict):
         # Check if entries with the same hash (metadata.hash) already exist
-        if "hash" in metadata:
+        if "hash" in metadata and reindex_filter is None:
             result = VECTOR_DB_CLIENT.query(
                 collection_name=collection_name,
                 filter={"hash": metadata["hash"]},
@@ -940,103 +1084,151 @@ def save_docs_to_vector_db(
                     log.debug(f"Document with hash {metadata['hash']} already exists")
                     raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
+    text_splitter = None
     if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        else:
+        if request.app.state.config.TEXT_SPLITTER not in ["", "character", "token"]:
             raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+        text_splitter = get_text_splitter(
+            request.app.state.config.TEXT_SPLITTER,
+            request.app.state.config.CHUNK_SIZE,
+            request.app.state.config.CHUNK_OVERLAP,
+            request.app.state.config.TIKTOKEN_ENCODING_NAME,
+        )
+
+    def _split_batch(batch: list[Document]) -> list[list[Document]]:
+        if text_splitter is None:
+            return [[doc] for doc in batch]
 
-        # docs = text_splitter.split_documents(docs)
         # ENH MOD : Process each original document separately.
-        split_docs = []
-        for doc in docs:
-            # Determine the header based on metadata.
-            header = ""
-            if doc.metadata.get("page_label"):
-                header = f"# [Page {doc.metadata['page_label']}]:\n\n"
-            elif doc.metadata.get("page_number") is not None:
-                header = f"# [Page {doc.metadata['page_number'] + 1}]:\n\n"
-            elif doc.metadata.get("page") is not None:
-                header = f"# [Page {doc.metadata['page'] + 1}]:\n\n"
-
-            # Split the current document into chunks.
-            chunks = text_splitter.split_documents([doc])
-            for chunk in chunks:
-                content = chunk.page_content.strip()
-                # If the chunk already begins with the header, remove it to avoid duplication.
-                if header and content.startswith(header):
-                    content = content[len(header) :].strip()
-                # Prepend the header if defined.
-                if header:
-                    chunk.page_content = header + content
-                else:
-                    chunk.page_content = content
-                split_docs.append(chunk)
-                # Log debug output to verify the chunk's header inclusion.
-                log.debug(
-                    f"Processed chunk (first 200 chars): {chunk.page_content[:200]}"
-                )
-        docs = split_docs
+        return [
+            _add_page_header(doc, chunks)
+            for doc, chunks in zip(batch, split_document_batch(text_splitter, batch))
+        ]
 
-    if len(docs) == 0:
-        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    def _add_page_header(doc: Document, chunks: list[Document]) -> list[Document]:
+        # Determine the header based on metadata.
+        header = ""
+        if doc.metadata.get("page_label"):
+            header = f"# [Page {doc.metadata['page_label']}]:\n\n"
+        elif doc.metadata.get("page_number") is not None:
+            header = f"# [Page {doc.metadata['page_number'] + 1}]:\n\n"
+        elif doc.metadata.get("page") is not None:
+            header = f"# [Page {doc.metadata['page'] + 1}]:\n\n"
+
+        for chunk in chunks:
+            content = chunk.page_content.strip()
+            # If the chunk already begins with the header, remove it to avoid duplication.
+            if header and content.startswith(header):
+                content = content[len(header) :].strip()
+            # Prepend the header if defined.
+            if header:
+                chunk.page_content = header + content
+            else:
+                chunk.page_content = content
+        return chunks
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = []
-    if metadata_list is not None:
-        if len(metadata_list) != len(docs):
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Metadata length mismatch"))
-        for doc, meta in zip(docs, metadata_list):
-            combined_meta = {**doc.metadata, **meta}
-            combined_meta = {k: v for k, v in combined_meta.items() if v is not None}
-            combined_meta["embedding_config"] = json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            )
-            metadatas.append(combined_meta)
-    else:
-        for doc in docs:
-            combined_meta = {**doc.metadata, **(metadata if metadata else {})}
-            combined_meta = {k: v for k, v in combined_meta.items() if v is not None}
-            combined_meta["embedding_config"] = json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            )
-            metadatas.append(combined_meta)
+    embedding_config = json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
 
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
-            if (
-                isinstance(value, datetime)
-                or isinstance(value, list)
-                or isinstance(value, dict)
-            ):
-                metadata[key] = str(value)
+    def _chunk_metadata(chunk: Document, meta: Optional[dict]) -> dict:
+        combined_meta = {**chunk.metadata, **(meta if meta else {})}
+        combined_meta = {k: v for k, v in combined_meta.items() if v is not None}
+        combined_meta["embedding_config"] = embedding_config
+        combined_meta["chunk_hash"] = calculate_sha256_string(chunk.page_content)
+
+        # ChromaDB does not like datetime formats
+        # for meta-data so convert them to string.
+        for key, value in combined_meta.items():
+            if isinstance(value, (datetime, list, dict)):
+                combined_meta[key] = str(value)
+        return combined_meta
+
+    def _iter_chunks() -> Iterator[tuple[str, dict]]:
+        # Documents are split lazily, a few at a time (token splitting
+        # encodes them in one call), so only the chunks of the batches in
+        # flight are held in memory.
+        doc_iter = iter(docs)
+        idx = 0
+        while batch := list(itertools.islice(doc_iter, SPLIT_BATCH_SIZE)):
+            for doc_chunks in _split_batch(batch):
+                meta = metadata_list[idx] if metadata_list is not None else metadata
+                idx += 1
+                for chunk in doc_chunks:
+                    yield chunk.page_content, _chunk_metadata(chunk, meta)
+
+    chunks = _iter_chunks()
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        if reindex_filter is not None and VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        ):
+            VECTOR_DB_CLIENT.delete(
+                collection_name=collection_name, filter=reindex_filter
+            )
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    chunks = itertools.chain([first_chunk], chunks)
 
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        if reindex_filter is not None:
+            stored = _get_stored_chunk_ids(collection_name, reindex_filter)
+            if stored is None:
+                # Without the full list of stored chunks the diff could leave
+                # duplicates or stale chunks behind, so replace them all.
+                log.warning(
+                    f"could not list the chunks of {collection_name} to re-index, "
+                    "replacing all of them"
+                )
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, filter=reindex_filter
+                )
+                stored = {}
+
+            replaced_ids: List[str] = []
+            update_metadata = True
+
+            def _refresh_kept(kept: list[dict]):
+                # Kept chunks still carry the metadata of the previous
+                # version (file hash, offsets), which the duplicate check
+                # relies on.
+                nonlocal update_metadata
+                if not kept:
+                    return
+                if update_metadata:
+                    try:
+                        VECTOR_DB_CLIENT.update_metadata(
+                            collection_name=collection_name, items=kept
+                        )
+                        return
+                    except NotImplementedError:
+                        log.info(
+                            f"cannot update metadata in {collection_name}, "
+                            "replacing the kept chunks"
+                        )
+                        update_metadata = False
+                for item in kept:
+                    replaced_ids.append(item["id"])
+                    yield item["text"], item["metadata"]
+
+            def _changed_chunks(chunks):
+                kept = []
+                for text, chunk_meta in chunks:
+                    ids = stored.get(chunk_meta["chunk_hash"])
+                    if not ids:
+                        yield text, chunk_meta
+                        continue
+                    kept.append({"id": ids.pop(), "text": text, "metadata": chunk_meta})
+                    if len(kept) >= REINDEX_UPDATE_BATCH_SIZE:
+                        yield from _refresh_kept(kept)
+                        kept = []
+                yield from _refresh_kept(kept)
+
+            chunks = _changed_chunks(chunks)
+            add = True
+        elif VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
@@ -1064,23 +1256,9 @@ def save_docs_to_vector_db(
                 else request.app.state.config.RAG_OLLAMA_API_KEY
             ),
             request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+            request.app.state.EMBEDDING_CACHE,
         )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
-
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
         """
         MOD: AMER-HOTFIX-1: Addressing vectordb Load performance issue
         with batch processing        
@@ -1088,16 +1266,30 @@ def save_docs_to_vector_db(
         batch_size = get_dynamic_batch_size()
         log.info(f"Using dynamic batch size: {batch_size}")
 
-        # ENH ASYNC-IMPROVEMENT   Batch insert synchronously
-        batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
-        max_workers = min(4, len(batches)) if batches else 1
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [
-                executor.submit(_safe_insert, collection_name, batch)
-                for batch in batches
-            ]
-            for future in as_completed(futures):
-                future.result()
+        # Splitting, embedding and insertion overlap; bounded queues between
+        # the stages apply backpressure when one of them falls behind.
+        inserted = run_ingestion_pipeline(
+            chunks,
+            embed=lambda texts: embedding_function(
+                texts, prefix=RAG_EMBEDDING_CONTENT_PREFIX, user=user
+            ),
+            insert=lambda batch: _safe_insert(collection_name, batch),
+            embed_batch_size=RAG_INGESTION_EMBED_BATCH_SIZE,
+            insert_batch_size=batch_size,
+            queue_size=RAG_INGESTION_QUEUE_SIZE,
+            insert_workers=RAG_INGESTION_INSERT_WORKERS,
+        )
+        log.info(f"inserted {inserted} chunks into collection {collection_name}")
+
+        if reindex_filter is not None:
+            # Stale chunks go only after their replacements are in place.
+            stale_ids = [id for ids in stored.values() for id in ids] + replaced_ids
+            if stale_ids:
+                VECTOR_DB_CLIENT.delete(collection_name=collection_name, ids=stale_ids)
+            log.info(
+                f"re-indexed collection {collection_name}: {inserted} chunks added, "
+                f"{len(stale_ids)} removed"
+            )
 
         """
         MOD: AMER-HOTFIX-1: End    of Mod    
@@ -1115,6 +1307,69 @@ class ProcessFileForm(BaseModel):
     session_id: Optional[str] = None
 
 
+class _StreamedDocs:
+    """
+    Documents of a streaming loader, read again from the file on every
+    iteration instead of being kept in memory.
+    """
+
+    def __init__(self, load: Callable[[], Iterable[Document]]):
+        self.load = load
+
+    def __iter__(self) -> Iterator[Document]:
+        return iter(self.load())
+
+
+def _calculate_docs_sha256(docs: Iterable[Document]) -> str:
+    """``calculate_sha256_string`` of the space joined documents, streamed."""
+    sha256 = hashlib.sha256()
+    for idx, doc in enumerate(docs):
+        if idx:
+            sha256.update(b" ")
+        sha256.update(doc.page_content.encode("utf-8"))
+    return sha256.hexdigest()
+
+
+def _load_file_docs(request: Request, file: FileModel, file_path: str) -> list:
+    """
+    Extract the documents of an uploaded file, reusing the extraction of an
+    identical file (same bytes, same extraction settings) when cached.
+    """
+    config = request.app.state.config
+    cache = request.app.state.EXTRACTION_CACHE
+
+    key = None
+    if cache is not None:
+        try:
+            key = cache.key(
+                file_path,
+                {
+                    "engine": config.CONTENT_EXTRACTION_ENGINE,
+                    "tika_server_url": config.TIKA_SERVER_URL,
+                    "docling_server_url": config.DOCLING_SERVER_URL,
+                    "pdf_extract_images": config.PDF_EXTRACT_IMAGES,
+                    "document_intelligence_endpoint": config.DOCUMENT_INTELLIGENCE_ENDPOINT,
+                    # The loader is picked by extension and content type.
+                    "extension": os.path.splitext(file.filename)[1].lower(),
+                    "content_type": file.meta.get("content_type"),
+                },
+            )
+            docs = cache.get(key)
+            if docs is not None:
+                log.info(f"Reusing cached extraction for file {file.id}")
+                return docs
+        except Exception as e:
+            log.warning(f"Extraction cache unavailable for file {file.id}: {e}")
+
+    loader = get_file_loader(request.app.state.config)
+    docs = loader.load(file.filename, file.meta.get("content_type"), file_path)
+
+    # Failed extractions (e.g. OCR errors) are retried on the next upload.
+    if key is not None and any(doc.page_content.strip() for doc in docs):
+        cache.set(key, docs)
+    return docs
+
+
 @router.post("/process/file")
 def process_file(
     request: Request,
@@ -1130,7 +1385,8 @@ def process_file(
         user (UserModel): The authenticated user performing the operation.
 
     Returns:
-        dict: Result details containing status, collection name, filename, and content.
+        dict: Result details containing status, collection name, filename, and content
+            (``None`` for streamed spreadsheets, whose text is never built).
     """
     try:
         file = Files.get_file_by_id(form_data.file_id)
@@ -1142,19 +1398,27 @@ def process_file(
 
         log.info("Updating collection %s for file %s", collection_name, file.id)
 
+        reindex_filter = None
         if form_data.content:
             # Update the content in the file
             # Usage: /files/{file_id}/data/content/update
 
-            try:
-                # /files/{file_id}/data/content/update
-                VECTOR_DB_CLIENT.delete(
-                    collection_name=build_user_collection_name(user.id),
-                    filter={"file_id": file.id},
-                )
-            except Exception:
-                # Audio file upload pipeline
-                pass
+            if (
+                collection_name == build_user_collection_name(user.id)
+                and not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+            ):
+                # Only the chunks that changed are re-embedded.
+                reindex_filter = {"file_id": file.id}
+            else:
+                try:
+                    # /files/{file_id}/data/content/update
+                    VECTOR_DB_CLIENT.delete(
+                        collection_name=build_user_collection_name(user.id),
+                        filter={"file_id": file.id},
+                    )
+                except Exception:
+                    # Audio file upload pipeline
+                    pass
 
             docs = [
                 Document(
@@ -1225,36 +1489,42 @@ def process_file(
             file_path = file.path
             if file_path:
                 file_path = Storage.get_file(file_path)
-                loader = Loader(
-                    engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
-                    TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
-                    DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
-                    PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
-                    DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
-                    DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
-                )
-                docs = loader.load(
-                    file.filename, file.meta.get("content_type"), file_path
-                )
+                file_meta = {
+                    "name": file.filename,
+                    "created_by": file.user_id,
+                    "file_id": file.id,
+                    "source": file.filename,
+                    **(
+                        {"session_id": form_data.session_id}
+                        if form_data.session_id
+                        else {}
+                    ),
+                }
 
-                docs = [
-                    Document(
-                        page_content=doc.page_content,
-                        metadata={
-                            **doc.metadata,
-                            "name": file.filename,
-                            "created_by": file.user_id,
-                            "file_id": file.id,
-                            "source": file.filename,
-                            **(
-                                {"session_id": form_data.session_id}
-                                if form_data.session_id
-                                else {}
-                            ),
-                        },
+                loader = get_file_loader(request.app.state.config)
+                content_type = file.meta.get("content_type")
+                if loader.supports_streaming(file.filename, content_type, file_path):
+                    # Large spreadsheets are read twice (hash, then the
+                    # chunk/embed pipeline) rather than held as documents.
+                    docs = _StreamedDocs(
+                        lambda: (
+                            Document(
+                                page_content=doc.page_content,
+                                metadata={**doc.metadata, **file_meta},
+                            )
+                            for doc in loader.lazy_load(
+                                file.filename, content_type, file_path
+                            )
+                        )
                     )
-                    for doc in docs
-                ]
+                else:
+                    docs = [
+                        Document(
+                            page_content=doc.page_content,
+                            metadata={**doc.metadata, **file_meta},
+                        )
+                        for doc in _load_file_docs(request, file, file_path)
+                    ]
             else:
                 docs = [
                     Document(
@@ -1273,15 +1543,22 @@ def process_file(
                         },
                     )
                 ]
-            text_content = " ".join([doc.page_content for doc in docs])
+            if isinstance(docs, _StreamedDocs):
+                text_content = None
+            else:
+                text_content = " ".join(doc.page_content for doc in docs)
 
-        log.debug(f"text_content: {text_content}")
+        if text_content is None:
+            # The text of streamed files is never built: it is not stored
+            # (readers load it from the upload) and hashed as it streams.
+            hash = _calculate_docs_sha256(docs)
+        else:
+            log.debug(f"text_content: {text_content}")
+            hash = calculate_sha256_string(text_content)
         Files.update_file_data_by_id(
             file.id,
-            {"content": text_content},
+            {"content": text_content or ""},
         )
-
-        hash = calculate_sha256_string(text_content)
         Files.update_file_hash_by_id(file.id, hash)
 
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
@@ -1302,6 +1579,7 @@ def process_file(
                     },
                     add=(True if form_data.collection_name else False),
                     user=user,
+                    reindex_filter=reindex_filter,
                 )
 
                 if result:
@@ -1797,6 +2075,7 @@ def query_doc_handler(
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
+                collection_result=None,
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -1812,7 +2091,6 @@ def query_doc_handler(
                 ),
                 query_filter=form_data.filter,
                 filter_expr=form_data.filter_expr,
-                user=user,
             )
         else:
             return query_doc(
@@ -2022,6 +2300,8 @@ class BatchProcessFilesForm(BaseModel):
     files: List[FileModel]
     collection_name: str
     session_id: Optional[str] = None
+    # Extract files without content from their upload instead of skipping them.
+    extract: bool = False
 
 
 class BatchProcessFilesResult(BaseModel):
@@ -2035,17 +2315,77 @@ class BatchProcessFilesResponse(BaseModel):
     errors: List[BatchProcessFilesResult]
 
 
-@router.post("/process/files/batch")
+def _extract_files(
+    request: Request, files: List[FileModel], workers: int
+) -> Iterator[tuple[FileModel, Union[list, BaseException]]]:
+    """
+    Extract ``files`` from their uploads on a pool of ``workers`` threads,
+    yielding each file with its documents (or the error) as soon as it is
+    done. At most ``workers`` files are in flight, so extracted documents
+    wait for the consumer instead of piling up.
+    """
+    workers = max(1, min(workers, len(files)))
+    file_iter = iter(files)
+    pending = {}
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="batch-extract"
+    ) as pool:
+        while True:
+            for file in itertools.islice(file_iter, workers - len(pending)):
+                # Downloads run on the pool too, and their errors only fail
+                # the file they belong to.
+                pending[
+                    pool.submit(
+                        lambda f: _load_file_docs(request, f, Storage.get_file(f.path)),
+                        file,
+                    )
+                ] = file
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file = pending.pop(future)
+                error = future.exception()
+                yield file, error if error is not None else future.result()
+
+
+def _emit_batch_status(
+    user: UserModel, collection_name: str, result: BatchProcessFilesResult
+) -> None:
+    """Notify the user's sessions that a file of a batch changed status."""
+    try:
+        anyio.from_thread.run(
+            emit_to_user,
+            user.id,
+            "file-batch-status",
+            {"collection_name": collection_name, **result.model_dump()},
+        )
+    except RuntimeError:
+        # Not called from a request worker thread (e.g. directly in a test).
+        pass
+    except Exception as e:
+        log.debug(f"process_files_batch: Error emitting status: {e}")
+
+
 """
 MOD: BATCH-DUPLICATE-LOOKUP: Validate file content and perform batch duplicate hash lookup
 """
 
+
+@router.post("/process/files/batch")
 def process_files_batch(
     request: Request,
     form_data: BatchProcessFilesForm,
     user=Depends(get_verified_user),
 ) -> BatchProcessFilesResponse:
-"""Process multiple files and batch-save their documents to the vector DB.
+    """Process multiple files and batch-save their documents to the vector DB.
+
+    With ``extract`` set, files without content are extracted from their
+    uploads in parallel and their documents stream into the same
+    embedding/insert pipeline as the rest of the batch. Every status change
+    is also sent to the user as a ``file-batch-status`` socket event.
 
     Args:
         request (Request): The incoming request instance.
@@ -2062,24 +2402,34 @@ def process_files_batch(
         if form_data.collection_name
         else build_user_collection_name(user.id)
     )
+    session_meta = {"session_id": form_data.session_id} if form_data.session_id else {}
 
-    all_docs: List[Document] = []
-    all_metadata: List[dict] = []
     processed_count = 0
     skipped_count = 0
 
+    def _report(file_id: str, status: str, error: Optional[str] = None):
+        result = BatchProcessFilesResult(file_id=file_id, status=status, error=error)
+        if status == "failed":
+            errors.append(result)
+        else:
+            results.append(result)
+        _emit_batch_status(user, collection_name, result)
+        return result
+
     file_entries: List[tuple[FileModel, str, str]] = []  # (file, text_content, hash)
+    files_to_extract: List[FileModel] = []
 
     for file in form_data.files:
         try:
             text_content: Optional[str] = file.data.get("content") if file.data else None
             if not text_content:
+                if form_data.extract and file.path:
+                    files_to_extract.append(file)
+                    continue
                 log.warning(
                     f"process_files_batch: Empty content for file {file.id}; skipping"
                 )
-                results.append(
-                    BatchProcessFilesResult(file_id=file.id, status="skipped_empty")
-                )
+                _report(file.id, "skipped_empty")
                 continue
 
             hash = calculate_sha256_string(text_content)
@@ -2089,11 +2439,7 @@ def process_files_batch(
 
         except Exception as e:
             log.error(f"process_files_batch: Error processing file {file.id}: {str(e)}")
-            errors.append(
-                BatchProcessFilesResult(
-                    file_id=file.id, status="failed", error=getErrorMsg(e)
-                )
-            )
+            _report(file.id, "failed", getErrorMsg(e))
 
     existing_hashes: set[str] = set()
     hashes: List[str] = [entry[2] for entry in file_entries]
@@ -2113,84 +2459,155 @@ def process_files_batch(
                 f"process_files_batch: Error checking duplicates in batch: {str(e)}"
             )
 
-    for file, text_content, hash in file_entries:
-        if hash in existing_hashes:
-            skipped_count += 1
-            log.info(f"process_files_batch: Skipping duplicate file {file.id}")
-            results.append(
-                BatchProcessFilesResult(file_id=file.id, status="skipped_duplicate")
-            )
-            continue
-
+    def _file_docs(file: FileModel, docs: List[Document], hash: str) -> List[Document]:
         doc_type = (file.meta.get("doc_type") if file.meta else None) or (
             file.meta.get("content_type") if file.meta else None
         )
         if not doc_type:
             doc_type = mimetypes.guess_type(file.filename)[0]
 
-        docs: List[Document] = [
+        # The vector metadata rides on the documents, so files of the whole
+        # batch can share one pipeline.
+        metadata = {
+            "file_id": file.id,
+            "name": file.filename,
+            "hash": hash,
+            "doc_type": doc_type,
+            **session_meta,
+        }
+        return [
             Document(
-                page_content=text_content.replace("<br/>", "\n"),
+                page_content=doc.page_content,
                 metadata={
-                    **file.meta,
+                    **doc.metadata,
                     "name": file.filename,
                     "created_by": file.user_id,
                     "file_id": file.id,
                     "source": file.filename,
-                    **(
-                        {"session_id": form_data.session_id}
-                        if form_data.session_id
-                        else {}
-                    ),
+                    **session_meta,
+                    **metadata,
                 },
             )
+            for doc in docs
         ]
 
-        metadata = {
-            "file_id": file.id,
-            "name": file.filename,
-            "hash": hash,
-            "doc_type": doc_type,
-            **(
-                {"session_id": form_data.session_id} if form_data.session_id else {}
-            ),
-        }
+    prepared: List[BatchProcessFilesResult] = []
+    seen_hashes = set(existing_hashes)
 
-        all_docs.extend(docs)
-        all_metadata.extend([metadata.copy() for _ in docs])
-        processed_count += len(docs)
-        results.append(BatchProcessFilesResult(file_id=file.id, status="prepared"))
+    for file, text_content, hash in file_entries:
+        if hash in existing_hashes:
+            skipped_count += 1
+            log.info(f"process_files_batch: Skipping duplicate file {file.id}")
+            _report(file.id, "skipped_duplicate")
+            continue
+        seen_hashes.add(hash)
+        prepared.append(_report(file.id, "prepared"))
 
-    if all_docs:
+    def _batch_docs() -> Iterator[Document]:
+        nonlocal processed_count, skipped_count
+
+        for file, text_content, hash in file_entries:
+            if hash in existing_hashes:
+                continue
+            docs = _file_docs(
+                file,
+                [
+                    Document(
+                        page_content=text_content.replace("<br/>", "\n"),
+                        metadata=file.meta or {},
+                    )
+                ],
+                hash,
+            )
+            processed_count += len(docs)
+            yield from docs
+
+        # Extracted files join the pipeline in the order they finish.
+        for file, extracted in _extract_files(
+            request, files_to_extract, RAG_BATCH_EXTRACTION_WORKERS
+        ):
+            try:
+                if isinstance(extracted, BaseException):
+                    raise extracted
+
+                text_content = " ".join(doc.page_content for doc in extracted)
+                if not text_content.strip():
+                    log.warning(
+                        f"process_files_batch: No content extracted from file {file.id}; skipping"
+                    )
+                    _report(file.id, "skipped_empty")
+                    continue
+
+                hash = calculate_sha256_string(text_content)
+                Files.update_file_data_by_id(file.id, {"content": text_content})
+                Files.update_file_hash_by_id(file.id, hash)
+
+                if hash not in seen_hashes:
+                    try:
+                        existing = VECTOR_DB_CLIENT.query(
+                            collection_name=collection_name, filter={"hash": hash}
+                        )
+                        if existing is not None and existing.ids[0]:
+                            seen_hashes.add(hash)
+                    except Exception as e:
+                        log.error(
+                            f"process_files_batch: Error checking duplicates of file {file.id}: {str(e)}"
+                        )
+                if hash in seen_hashes:
+                    skipped_count += 1
+                    log.info(f"process_files_batch: Skipping duplicate file {file.id}")
+                    _report(file.id, "skipped_duplicate")
+                    continue
+                seen_hashes.add(hash)
+
+                docs = _file_docs(file, extracted, hash)
+            except Exception as e:
+                log.error(
+                    f"process_files_batch: Error extracting file {file.id}: {str(e)}"
+                )
+                _report(file.id, "failed", getErrorMsg(e))
+                continue
+
+            prepared.append(_report(file.id, "prepared"))
+            processed_count += len(docs)
+            yield from docs
+
+    docs = _batch_docs()
+    first_doc = next(docs, None)
+    if first_doc is not None:
         try:
             save_docs_to_vector_db(
                 request=request,
-                docs=all_docs,
+                docs=itertools.chain([first_doc], docs),
                 collection_name=collection_name,
-                metadata=all_metadata,
                 add=True,
                 user=user,
             )
 
-            for result in results:
-                if result.status == "prepared":
-                    Files.update_file_metadata_by_id(
-                        result.file_id, {"collection_name": collection_name}
-                    )
-                    result.status = "completed"
+            for result in prepared:
+                Files.update_file_metadata_by_id(
+                    result.file_id, {"collection_name": collection_name}
+                )
+                result.status = "completed"
+                _emit_batch_status(user, collection_name, result)
 
         except Exception as e:
             log.error(
                 f"process_files_batch: Error saving documents to vector DB: {str(e)}"
             )
-            for result in results:
-                if result.status == "prepared":
-                    result.status = "failed"
-                    errors.append(
-                        BatchProcessFilesResult(
-                            file_id=result.file_id, error=getErrorMsg(e)
-                        )
+            for result in prepared:
+                result.status = "failed"
+                _emit_batch_status(user, collection_name, result)
+                errors.append(
+                    BatchProcessFilesResult(
+                        file_id=result.file_id, status="failed", error=getErrorMsg(e)
                     )
+                )
+            # Files the pipeline stopped before extracting.
+            reported = {result.file_id for result in [*results, *errors]}
+            for file in files_to_extract:
+                if file.id not in reported:
+                    _report(file.id, "failed", getErrorMsg(e))
 
     log.info(
         "process_files_batch: processed %s document(s), skipped %s duplicates",
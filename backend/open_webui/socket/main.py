@@ -369,6 +369,12 @@ def get_event_emitter(request_info, update_db=True):
     return __event_emitter__
 
 
+async def emit_to_user(user_id, event, data):
+    """Send an event to every connected session of a user."""
+    for session_id in set(USER_POOL.get(user_id, [])):
+        await sio.emit(event, data, to=session_id)
+
+
 def get_event_call(request_info):
     async def __event_caller__(event_data):
         response = await sio.call(
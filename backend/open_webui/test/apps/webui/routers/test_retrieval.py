@@ -5,7 +5,9 @@ MOD: BATCH-DUPLICATE-LOOKUP: Regression test for batch duplicate lookup and empt
 import json
 import os
 import tempfile
+import tracemalloc
 from types import SimpleNamespace
+from typing import Optional
 from unittest.mock import MagicMock
 from pytest import MonkeyPatch
 
@@ -96,7 +98,320 @@ class TestProcessFilesBatch(AbstractPostgresTest):
         assert status_map[file2.id] == "completed"
         assert status_map[file3.id] == "skipped_empty"
 
+    def test_batch_extracts_raw_files(self, monkeypatch: MonkeyPatch, tmp_path) -> None:
+        from open_webui.models.files import FileForm
+        from open_webui.routers import retrieval
+        from open_webui.routers.retrieval import (
+            BatchProcessFilesForm,
+            process_files_batch,
+        )
+
+        paths = []
+        for i, text in enumerate(["first upload", "second upload", ""]):
+            path = tmp_path / f"raw{i}.txt"
+            path.write_text(text)
+            paths.append(path)
+        files = [
+            self.files.insert_new_file(
+                self.user.id,
+                FileForm(
+                    id=f"raw{i}", filename=path.name, path=str(path), data={}, meta={}
+                ),
+            )
+            for i, path in enumerate(paths)
+        ]
+
+        saved = []
+        monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", DummyVectorClient())
+        monkeypatch.setattr(
+            retrieval,
+            "save_docs_to_vector_db",
+            lambda **kwargs: saved.extend(kwargs["docs"]) or True,
+        )
+        monkeypatch.setattr(
+            retrieval,
+            "_load_file_docs",
+            lambda request, file, file_path: [
+                retrieval.Document(page_content=open(file_path).read())
+            ],
+        )
+
+        form = BatchProcessFilesForm(
+            files=files, collection_name="test_collection", extract=True
+        )
+        resp = process_files_batch(MagicMock(), form, self.user)
+
+        status_map = {r.file_id: r.status for r in resp.results}
+        assert status_map == {
+            "raw0": "completed",
+            "raw1": "completed",
+            "raw2": "skipped_empty",
+        }
+        assert {doc.metadata["file_id"] for doc in saved} == {"raw0", "raw1"}
+        assert all(doc.metadata["hash"] for doc in saved)
+        assert self.files.get_file_by_id("raw1").data["content"] == "second upload"
+
 """
 MOD: BATCH-DUPLICATE-LOOKUP: End of Mod
 """
 
+
+class ReindexVectorClient:
+    """In-memory vector store whose query honours ``limit`` like the real ones."""
+
+    def __init__(self, default_limit: int = 10) -> None:
+        self.default_limit = default_limit
+        self.items: dict[str, dict] = {}
+        self.queries: list[Optional[int]] = []
+
+    def has_collection(self, collection_name: str) -> bool:
+        return bool(self.items)
+
+    def query(self, collection_name: str, filter: dict, limit=None):
+        self.queries.append(limit)
+        matches = [
+            item
+            for item in self.items.values()
+            if all(item["metadata"].get(k) == v for k, v in filter.items())
+        ][: limit or self.default_limit]
+        return SimpleNamespace(
+            ids=[[item["id"] for item in matches]],
+            documents=[[item["text"] for item in matches]],
+            metadatas=[[item["metadata"] for item in matches]],
+        )
+
+    def insert(self, collection_name: str, items: list[dict]) -> None:
+        for item in items:
+            self.items[item["id"]] = item
+
+    def update_metadata(self, collection_name: str, items: list[dict]) -> None:
+        for item in items:
+            self.items[item["id"]]["metadata"] = item["metadata"]
+
+    def delete(self, collection_name: str, ids=None, filter=None) -> None:
+        for id, item in list(self.items.items()):
+            if (ids is not None and id in ids) or (
+                filter is not None
+                and all(item["metadata"].get(k) == v for k, v in filter.items())
+            ):
+                del self.items[id]
+
+
+class ReplaceOnlyVectorClient(ReindexVectorClient):
+    """Vector store that cannot update metadata in place, like Milvus."""
+
+    def update_metadata(self, collection_name: str, items: list[dict]) -> None:
+        raise NotImplementedError()
+
+
+def _save(
+    monkeypatch: MonkeyPatch, client: ReindexVectorClient, texts: list[str], **kwargs
+):
+    from open_webui.routers import retrieval
+
+    embedded: list[str] = []
+
+    def embedding_function(texts, prefix=None, user=None):
+        embedded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", client)
+    monkeypatch.setattr(
+        retrieval, "get_embedding_function", lambda *args: embedding_function
+    )
+    request = MagicMock()
+    request.app.state.config.RAG_EMBEDDING_ENGINE = ""
+    request.app.state.config.RAG_EMBEDDING_MODEL = "test-model"
+    retrieval.save_docs_to_vector_db(
+        request,
+        [retrieval.Document(page_content=text) for text in texts],
+        "user-collection",
+        split=False,
+        **kwargs,
+    )
+    return embedded
+
+
+def _reindex(
+    monkeypatch: MonkeyPatch,
+    client: ReindexVectorClient,
+    texts: list[str],
+    file_hash: str = "hash-0",
+):
+    return _save(
+        monkeypatch,
+        client,
+        texts,
+        metadata={"file_id": "f1", "hash": file_hash},
+        reindex_filter={"file_id": "f1"},
+    )
+
+
+def test_reindex_embeds_only_changed_chunks(monkeypatch: MonkeyPatch) -> None:
+    client = ReindexVectorClient()
+    texts = [f"chunk {i}" for i in range(25)]
+    assert len(_reindex(monkeypatch, client, texts)) == 25
+
+    texts[3] = "chunk 3 edited"
+    del texts[20]
+    embedded = _reindex(monkeypatch, client, texts)
+
+    assert embedded == ["chunk 3 edited"]
+    assert sorted(item["text"] for item in client.items.values()) == sorted(texts)
+    assert client.queries[-1] is not None
+
+
+def test_reindex_replaces_everything_when_lookup_is_incomplete(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    from open_webui.routers import retrieval
+
+    monkeypatch.setattr(retrieval, "REINDEX_LOOKUP_LIMIT", 5)
+    client = ReindexVectorClient()
+    texts = [f"chunk {i}" for i in range(8)]
+    _reindex(monkeypatch, client, texts)
+
+    texts[0] = "chunk 0 edited"
+    embedded = _reindex(monkeypatch, client, texts)
+
+    assert embedded == texts
+    assert sorted(item["text"] for item in client.items.values()) == sorted(texts)
+
+
+def test_reindex_refreshes_the_metadata_of_kept_chunks(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    client = ReindexVectorClient()
+    old_texts = [f"chunk {i}" for i in range(5)]
+    _reindex(monkeypatch, client, old_texts, file_hash="hash-old")
+
+    texts = old_texts[:2] + ["chunk 2 edited"] + old_texts[3:]
+    _reindex(monkeypatch, client, texts, file_hash="hash-new")
+    assert {item["metadata"]["hash"] for item in client.items.values()} == {"hash-new"}
+
+    # Re-uploading the previous content is no longer a duplicate.
+    embedded = _save(
+        monkeypatch,
+        client,
+        old_texts,
+        metadata={"file_id": "f2", "hash": "hash-old"},
+        add=True,
+    )
+    assert embedded == old_texts
+
+
+def test_reindex_removal_only_edit_refreshes_the_file_hash(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    client = ReindexVectorClient()
+    texts = [f"chunk {i}" for i in range(5)]
+    _reindex(monkeypatch, client, texts, file_hash="hash-old")
+
+    embedded = _reindex(monkeypatch, client, texts[:-1], file_hash="hash-new")
+
+    assert embedded == []
+    assert sorted(item["text"] for item in client.items.values()) == texts[:-1]
+    assert {item["metadata"]["hash"] for item in client.items.values()} == {"hash-new"}
+
+
+def test_reindex_replaces_kept_chunks_when_metadata_cannot_be_updated(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    client = ReplaceOnlyVectorClient()
+    texts = [f"chunk {i}" for i in range(5)]
+    _reindex(monkeypatch, client, texts, file_hash="hash-old")
+
+    texts[0] = "chunk 0 edited"
+    embedded = _reindex(monkeypatch, client, texts, file_hash="hash-new")
+
+    assert sorted(embedded) == sorted(texts)
+    assert sorted(item["text"] for item in client.items.values()) == sorted(texts)
+    assert {item["metadata"]["hash"] for item in client.items.values()} == {"hash-new"}
+
+
+def test_extract_files_reports_download_errors_per_file(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    from open_webui.routers import retrieval
+
+    def get_file(path: str) -> str:
+        if path == "missing":
+            raise FileNotFoundError(path)
+        return path
+
+    monkeypatch.setattr(retrieval.Storage, "get_file", get_file)
+    monkeypatch.setattr(
+        retrieval, "_load_file_docs", lambda request, file, file_path: [file_path]
+    )
+    files = [SimpleNamespace(id=path, path=path) for path in ["a", "missing", "b"]]
+
+    results = {
+        file.id: result
+        for file, result in retrieval._extract_files(MagicMock(), files, workers=2)
+    }
+
+    assert results["a"] == ["a"]
+    assert results["b"] == ["b"]
+    assert isinstance(results["missing"], FileNotFoundError)
+
+
+def test_process_file_never_builds_the_text_of_a_streamed_csv(
+    monkeypatch: MonkeyPatch, tmp_path
+) -> None:
+    from open_webui.retrieval.utils import get_file_content
+    from open_webui.routers import retrieval
+    from open_webui.utils.misc import calculate_sha256_string
+
+    path = tmp_path / "export.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,name,notes\n")
+        for i in range(20_000):
+            f.write(f"{i},name {i},{'some notes ' * 50}\n")
+    size = path.stat().st_size
+
+    file = SimpleNamespace(
+        id="f1",
+        filename="export.csv",
+        path=str(path),
+        user_id="u1",
+        meta={"content_type": "text/csv"},
+        data={},
+    )
+    files = MagicMock()
+    files.get_file_by_id.return_value = file
+    chunks: list[int] = []
+
+    def save_docs_to_vector_db(request, docs, **kwargs):
+        chunks.extend(len(doc.page_content) for doc in docs)
+        return True
+
+    monkeypatch.setattr(retrieval, "Files", files)
+    monkeypatch.setattr(retrieval.Storage, "get_file", lambda path: path)
+    monkeypatch.setattr(retrieval, "save_docs_to_vector_db", save_docs_to_vector_db)
+    request = MagicMock()
+    request.app.state.config.CONTENT_EXTRACTION_ENGINE = ""
+    request.app.state.config.CHUNK_SIZE = 4000
+    request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL = False
+
+    tracemalloc.start()
+    try:
+        response = retrieval.process_file(
+            request,
+            retrieval.ProcessFileForm(file_id="f1"),
+            user=SimpleNamespace(id="u1"),
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert sum(chunks) > size
+    assert peak < size / 3
+    assert response["content"] is None
+    files.update_file_data_by_id.assert_called_once_with("f1", {"content": ""})
+
+    # Full context readers load the text from the upload, hashed the same way.
+    text = get_file_content(request, file)
+    assert len(text) > size
+    files.update_file_hash_by_id.assert_called_once_with(
+        "f1", calculate_sha256_string(text)
+    )
@@ -0,0 +1,126 @@
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG", "MAIN": "DEBUG", "MODELS": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+)
+SessionLocal = sessionmaker(bind=engine)
+
+
+@contextmanager
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+db_stub = types.ModuleType("open_webui.internal.db")
+db_stub.Base = declarative_base()
+db_stub.get_db = get_db
+sys.modules["open_webui.internal.db"] = db_stub
+
+from open_webui.models.chats import Chat, ChatForm, ChatMessage, ChatTable
+
+db_stub.Base.metadata.create_all(engine)
+
+
+def make_chat():
+    messages = {
+        "u1": {"id": "u1", "parentId": None, "role": "user", "content": "hello"},
+        "a1": {"id": "a1", "parentId": "u1", "role": "assistant", "content": "hi"},
+    }
+    return {
+        "title": "Greeting",
+        "history": {"currentId": "a1", "messages": messages},
+        "messages": [messages["u1"], messages["a1"]],
+    }
+
+
+def test_messages_are_stored_as_rows():
+    chats = ChatTable()
+    chat = chats.insert_new_chat("user", ChatForm(chat=make_chat()))
+
+    assert chat.chat == make_chat()
+    with get_db() as db:
+        stored = db.get(Chat, chat.id).chat
+        rows = db.query(ChatMessage).filter_by(chat_id=chat.id).all()
+    assert "messages" not in stored["history"]
+    assert {(row.id, row.parent_id, row.content) for row in rows} == {
+        ("u1", None, "hello"),
+        ("a1", "u1", "hi"),
+    }
+
+    # Streaming into a new message touches its row only.
+    chats.upsert_message_to_chat_by_id_and_message_id(
+        chat.id, "a2", {"parentId": "u1", "role": "assistant", "content": "he"}
+    )
+    message = chats.upsert_message_to_chat_by_id_and_message_id(
+        chat.id, "a2", {"content": "hey"}
+    )
+    assert message == {"parentId": "u1", "role": "assistant", "content": "hey"}
+
+    chats.add_message_status_to_chat_by_id_and_message_id(chat.id, "a2", {"done": True})
+    assert chats.get_message_by_id_and_message_id(chat.id, "a2")["statusHistory"] == [
+        {"done": True}
+    ]
+    assert chats.get_message_by_id_and_message_id(chat.id, "missing") == {}
+    assert chats.get_message_by_id_and_message_id("missing", "a2") is None
+
+    chat = chats.get_chat_by_id(chat.id)
+    assert chat.chat["history"]["currentId"] == "a2"
+    assert set(chat.chat["history"]["messages"]) == {"u1", "a1", "a2"}
+    assert [m["content"] for m in chat.chat["messages"]] == ["hello", "hey"]
+
+    # Saving the whole chat drops the messages it no longer has.
+    del chat.chat["history"]["messages"]["a1"]
+    chats.update_chat_by_id(chat.id, chat.chat)
+    assert set(chats.get_messages_by_chat_id(chat.id)) == {"u1", "a2"}
+
+    assert chats.delete_chat_by_id(chat.id)
+    with get_db() as db:
+        assert db.query(ChatMessage).filter_by(chat_id=chat.id).count() == 0
+
+
+def test_chats_stored_as_json_are_still_read():
+    chats = ChatTable()
+    with get_db() as db:
+        db.add(
+            Chat(
+                id="legacy",
+                user_id="user",
+                title="Old",
+                chat=make_chat(),
+                created_at=0,
+                updated_at=0,
+            )
+        )
+        db.commit()
+
+    assert chats.get_chat_by_id("legacy").chat == make_chat()
+    assert chats.get_message_by_id_and_message_id("legacy", "u1")["content"] == (
+        "hello"
+    )
+
+    # The first single-message write moves the history to rows.
+    chats.upsert_message_to_chat_by_id_and_message_id(
+        "legacy", "a1", {"content": "hi!"}
+    )
+    with get_db() as db:
+        assert "messages" not in db.get(Chat, "legacy").chat["history"]
+    assert chats.get_messages_by_chat_id("legacy")["a1"]["content"] == "hi!"
@@ -0,0 +1,117 @@
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+config_stub = sys.modules.get("open_webui.config") or types.ModuleType(
+    "open_webui.config"
+)
+config_stub.ENABLE_RAG_INFERENCE_BATCHING = True
+config_stub.RAG_INFERENCE_MAX_BATCH_SIZE = 64
+config_stub.RAG_INFERENCE_MAX_WAIT_MS = 20
+sys.modules["open_webui.config"] = config_stub
+
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from open_webui.retrieval.batcher import (
+    BatchedEmbeddingModel,
+    BatchedReranker,
+    MicroBatcher,
+)
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def encode(self, texts, prompt=None, batch_size=32):
+        with self.lock:
+            self.calls.append((list(texts), prompt))
+        return np.array([[float(len(t)), 1.0 if prompt else 0.0] for t in texts])
+
+
+class FakeColBERT:
+    batchable = False
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs):
+        self.calls.append(list(pairs))
+        return np.full(len(pairs), 1.0 / len(pairs))
+
+
+def _concurrently(func, args):
+    barrier = threading.Barrier(len(args))
+
+    def call(arg):
+        barrier.wait()
+        return func(arg)
+
+    with ThreadPoolExecutor(len(args)) as executor:
+        return list(executor.map(call, args))
+
+
+def test_concurrent_encodes_share_a_batch():
+    encoder = FakeEncoder()
+    model = BatchedEmbeddingModel(encoder, max_batch_size=64, max_wait_ms=50)
+
+    texts = [["a"], ["bb", "ccc"], "dddd", ["eeeee"]]
+    results = _concurrently(model.encode, texts)
+
+    assert results[0].tolist() == [[1.0, 0.0]]
+    assert results[1].tolist() == [[2.0, 0.0], [3.0, 0.0]]
+    assert results[2].tolist() == [4.0, 0.0]
+    assert results[3].tolist() == [[5.0, 0.0]]
+    assert len(encoder.calls) < len(texts)
+    assert model.batcher.stats()["items"] == 5
+
+
+def test_prompts_are_never_mixed():
+    encoder = FakeEncoder()
+    model = BatchedEmbeddingModel(encoder, max_batch_size=64, max_wait_ms=50)
+
+    results = _concurrently(
+        lambda prompt: model.encode(["x"], prompt=prompt), [None, "query: ", None]
+    )
+
+    assert [r.tolist() for r in results] == [[[1.0, 0.0]], [[1.0, 1.0]], [[1.0, 0.0]]]
+    for texts, prompt in encoder.calls:
+        assert prompt in (None, "query: ")
+
+
+def test_non_batchable_rerankers_run_each_call_alone():
+    colbert = FakeColBERT()
+    reranker = BatchedReranker(colbert, max_batch_size=64, max_wait_ms=50)
+
+    calls = [[("q1", "a"), ("q1", "b")], [("q2", "c"), ("q2", "d"), ("q2", "e")]]
+    results = _concurrently(reranker.predict, calls)
+
+    assert results[0].tolist() == [0.5, 0.5]
+    assert np.allclose(results[1], [1 / 3] * 3)
+    assert sorted(len(call) for call in colbert.calls) == [2, 3]
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def fail(items, key):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(fail, max_batch_size=8, max_wait_ms=50)
+
+    def call(i):
+        with pytest.raises(RuntimeError, match="model crashed"):
+            batcher.submit([i])
+        return True
+
+    assert all(_concurrently(call, [1, 2, 3]))
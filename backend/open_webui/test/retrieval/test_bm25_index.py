@@ -0,0 +1,107 @@
+import sys
+import types
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+config_stub = sys.modules.get("open_webui.config") or types.ModuleType(
+    "open_webui.config"
+)
+config_stub.VECTOR_DB_EXECUTOR_MAX_WORKERS = 4
+sys.modules["open_webui.config"] = config_stub
+
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from open_webui.retrieval.bm25 import BM25Index
+from open_webui.retrieval.vector.main import GetResult
+
+
+def _items():
+    return [
+        {
+            "id": "a1",
+            "text": "quarterly revenue grew in the north region",
+            "vector": [0.0],
+            "metadata": {"file_id": "a", "session_id": "s1"},
+        },
+        {
+            "id": "a2",
+            "text": "the cafeteria menu changes weekly",
+            "vector": [0.0],
+            "metadata": {"file_id": "a", "session_id": "s1"},
+        },
+        {
+            "id": "b1",
+            "text": "revenue recognition policy for contracts",
+            "vector": [0.0],
+            "metadata": {"file_id": "b", "session_id": "s2"},
+        },
+    ]
+
+
+def _complete_index(tmp_path):
+    index = BM25Index(tmp_path, loader=lambda name: None)
+    index.rebuild("user-1")
+    index.on_insert("user-1", _items())
+    return index
+
+
+def test_search_ranks_matching_documents(tmp_path):
+    index = _complete_index(tmp_path)
+
+    result = index.search("user-1", "revenue policy", k=5)
+
+    assert result.ids[0] == ["b1", "a1"]
+    assert result.distances[0][0] > result.distances[0][1] > 0
+
+
+def test_search_applies_metadata_filters(tmp_path):
+    index = _complete_index(tmp_path)
+
+    assert index.search("user-1", "revenue", k=5, query_filter={"file_id": "a"}).ids[
+        0
+    ] == ["a1"]
+    assert index.search(
+        "user-1", "revenue", k=5, query_filter={"session_id": "s2"}
+    ).ids[0] == ["b1"]
+    assert sorted(
+        index.search(
+            "user-1", "revenue", k=5, query_filter={"file_id": ["a", "b"]}
+        ).ids[0]
+    ) == ["a1", "b1"]
+
+
+def test_deletes_are_applied_incrementally(tmp_path):
+    index = _complete_index(tmp_path)
+
+    index.on_delete("user-1", filter={"file_id": "b"})
+    assert index.search("user-1", "revenue", k=5).ids[0] == ["a1"]
+
+    index.on_delete("user-1", ids=["a1"])
+    assert index.search("user-1", "revenue", k=5).ids[0] == []
+
+    index.on_delete_collection("user-1")
+    assert not list(tmp_path.iterdir())
+
+
+def test_existing_collection_is_built_from_loader_once(tmp_path):
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        items = _items()
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
+    index = BM25Index(tmp_path, loader=loader)
+
+    assert index.search("kb-1", "cafeteria", k=1).ids[0] == ["a2"]
+    assert index.search("kb-1", "revenue", k=1).ids[0] == ["b1"]
+    assert calls == ["kb-1"]
@@ -0,0 +1,127 @@
+import os
+import sys
+import types
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from langchain_core.documents import Document
+
+from open_webui.retrieval.cache import (
+    DiskEmbeddingTier,
+    EmbeddingCache,
+    ExtractionCache,
+    TokenMatrixCache,
+    cached_embedding_function,
+)
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, prefix=None, user=None):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0 if prefix else 0.0] for text in texts]
+
+
+def test_only_missing_texts_are_embedded():
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(memory_size=100)
+    embed = cached_embedding_function(embedder, cache, engine="", model="m")
+
+    assert embed("hello") == [5.0, 0.0]
+    assert embed(["hello", "hi", "hi"]) == [[5.0, 0.0], [2.0, 0.0], [2.0, 0.0]]
+    assert embed("hello", prefix="query: ") == [5.0, 1.0]
+
+    assert embedder.calls == [["hello"], ["hi"], ["hello"]]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_cached_vectors_are_copies():
+    cache = EmbeddingCache(memory_size=100)
+    embed = cached_embedding_function(CountingEmbedder(), cache, engine="", model="m")
+
+    vector = embed("hello")
+    vector += [0.0] * 4
+
+    assert embed("hello") == [5.0, 0.0]
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(memory_size=1, backend=DiskEmbeddingTier(tmp_path, 10))
+    embed = cached_embedding_function(embedder, cache, engine="", model="m")
+
+    embed(["a", "bb"])
+    embed(["a", "bb"])
+
+    assert embedder.calls == [["a", "bb"]]
+    assert cache.stats()["backend_hits"] == 1
+
+
+def test_extraction_cache_is_keyed_by_content_and_settings(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    a = tmp_path / "a.pdf"
+    b = tmp_path / "b.pdf"
+    a.write_bytes(b"same bytes")
+    b.write_bytes(b"same bytes")
+
+    key = cache.key(str(a), {"engine": ""})
+    assert cache.key(str(b), {"engine": ""}) == key
+    assert cache.key(str(a), {"engine": "tika"}) != key
+
+    assert cache.get(key) is None
+    cache.set(key, [Document(page_content="text", metadata={"page": 0})])
+    docs = cache.get(key)
+
+    assert [(d.page_content, d.metadata) for d in docs] == [("text", {"page": 0})]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_extraction_cache_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=1500)
+    # Random hex compresses to about half, so each entry takes ~600 bytes.
+    docs = lambda: [Document(page_content=os.urandom(600).hex())]
+
+    cache.set("a", docs())
+    cache.set("b", docs())
+    assert cache.get("a") is not None
+    cache.set("c", docs())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_token_matrices_are_memory_mapped_and_evicted(tmp_path):
+    import numpy as np
+
+    matrix = np.ones((10, 8), dtype=np.float32)
+    entry_size = 128 + matrix.size * 2  # .npy header + float16 values
+    cache = TokenMatrixCache(str(tmp_path), max_bytes=entry_size * 2)
+    keys = [TokenMatrixCache.key("colbert", f"chunk {i}") for i in range(3)]
+
+    cache.set(keys[0], matrix)
+    cache.set(keys[1], matrix * 2)
+    cached = cache.get(keys[0])
+    assert isinstance(cached, np.memmap)
+    assert cached.dtype == np.float16 and cached.tolist() == matrix.tolist()
+
+    # keys[1] is now the least recently used entry.
+    cache.set(keys[2], matrix * 3)
+    assert cache.get(keys[1]) is None
+    assert cache.stats()["entries"] == 2
+
+    # Entries written by another worker (or before a restart) are reused.
+    reopened = TokenMatrixCache(str(tmp_path), max_bytes=entry_size * 2)
+    assert reopened.get(keys[2]).tolist() == (matrix * 3).tolist()
+    assert reopened.stats()["entries"] == 2
@@ -0,0 +1,90 @@
+import json
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+config_stub = sys.modules.get("open_webui.config") or types.ModuleType(
+    "open_webui.config"
+)
+config_stub.RAG_EMBEDDING_CONCURRENCY = 4
+config_stub.RAG_EMBEDDING_MAX_RETRIES = 3
+config_stub.RAG_EMBEDDING_RETRY_BACKOFF = 0
+sys.modules["open_webui.config"] = config_stub
+
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from open_webui.retrieval.embedding_client import get_embedding_session, map_batches
+
+
+def test_batches_run_concurrently_and_keep_order():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def embed(batch):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # Later batches finish first.
+        time.sleep(0.05 / batch[0] if batch[0] else 0.05)
+        with lock:
+            active -= 1
+        return [[float(i)] for i in batch]
+
+    result = map_batches(embed, list(range(1, 17)), batch_size=2)
+
+    assert result == [[float(i)] for i in range(1, 17)]
+    assert peak > 1
+
+
+def test_failed_batch_fails_the_call():
+    assert map_batches(lambda b: None if 3 in b else b, [1, 2, 3, 4], 2) is None
+
+
+def test_session_retries_rate_limited_requests():
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            calls.append(body)
+            if len(calls) < 3:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            payload = json.dumps({"embeddings": [[1.0]] * len(body["input"])})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        r = get_embedding_session().post(
+            f"http://127.0.0.1:{server.server_port}/api/embed",
+            json={"input": ["a", "b"]},
+            timeout=5,
+        )
+    finally:
+        server.shutdown()
+
+    assert r.status_code == 200
+    assert r.json() == {"embeddings": [[1.0], [1.0]]}
+    assert len(calls) == 3
@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from open_webui.retrieval.pipeline import run_ingestion_pipeline
+
+
+def _embed(texts):
+    return [[float(len(text))] for text in texts]
+
+
+def test_every_chunk_is_inserted_once():
+    inserted = []
+    lock = threading.Lock()
+
+    def insert(items):
+        with lock:
+            inserted.extend(items)
+
+    chunks = ((f"chunk\n{i}", {"i": i}) for i in range(1003))
+    count = run_ingestion_pipeline(
+        chunks, _embed, insert, embed_batch_size=64, insert_batch_size=100
+    )
+
+    assert count == 1003
+    assert sorted(item["metadata"]["i"] for item in inserted) == list(range(1003))
+    # Stored text keeps its newlines, only the embedding input is flattened.
+    assert all(item["text"].startswith("chunk\n") for item in inserted)
+    assert len({item["id"] for item in inserted}) == 1003
+
+
+def test_producer_is_throttled_by_slow_inserts():
+    produced = []
+    inserted = []
+
+    def chunks():
+        for i in range(200):
+            produced.append(i)
+            yield f"{i}", {}
+
+    def insert(items):
+        # Producer can run at most a few batches ahead of the inserts.
+        assert len(produced) - len(inserted) <= 10 * 6
+        time.sleep(0.005)
+        inserted.extend(items)
+
+    run_ingestion_pipeline(
+        chunks(),
+        _embed,
+        insert,
+        embed_batch_size=10,
+        insert_batch_size=10,
+        queue_size=1,
+        insert_workers=1,
+    )
+
+    assert len(inserted) == 200
+
+
+def test_stage_errors_are_raised_and_stop_the_producer():
+    produced = []
+
+    def chunks():
+        for i in range(10000):
+            produced.append(i)
+            yield f"{i}", {}
+
+    def insert(items):
+        raise RuntimeError("vector db down")
+
+    with pytest.raises(RuntimeError, match="vector db down"):
+        run_ingestion_pipeline(
+            chunks(), _embed, insert, embed_batch_size=10, insert_batch_size=10
+        )
+
+    assert len(produced) < 10000
@@ -0,0 +1,146 @@
+import asyncio
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG", "MAIN": "DEBUG", "MODELS": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+)
+SessionLocal = sessionmaker(bind=engine)
+
+
+@contextmanager
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+db_stub = types.ModuleType("open_webui.internal.db")
+db_stub.Base = declarative_base()
+db_stub.get_db = get_db
+sys.modules["open_webui.internal.db"] = db_stub
+
+from open_webui.models.ingestion_jobs import IngestionJob, IngestionJobsTable
+from open_webui.utils.ingestion import IngestionQueue, MemoryIngestionJobStore
+
+db_stub.Base.metadata.create_all(engine)
+
+
+@pytest.fixture
+def sql_store():
+    with get_db() as db:
+        db.query(IngestionJob).delete()
+        db.commit()
+    return IngestionJobsTable()
+
+
+@pytest.fixture(params=["sql", "memory"])
+def store(request, sql_store):
+    return sql_store if request.param == "sql" else MemoryIngestionJobStore()
+
+
+def test_claims_are_fair_across_users(store):
+    for i in range(3):
+        store.insert_new_job(f"a{i}", "alice")
+    store.insert_new_job("b0", "bob")
+
+    first = store.claim_next_job(max_jobs_per_user=2)
+    second = store.claim_next_job(max_jobs_per_user=2)
+    third = store.claim_next_job(max_jobs_per_user=2)
+
+    # Bob's single upload does not wait behind Alice's batch.
+    assert [first.file_id, second.file_id, third.file_id] == ["a0", "b0", "a1"]
+    assert first.status == "processing" and first.attempts == 1
+    # Alice is at her limit and Bob has nothing left.
+    assert store.claim_next_job(max_jobs_per_user=2) is None
+
+    store.update_job_status(first.id, "completed")
+    assert store.claim_next_job(max_jobs_per_user=2).file_id == "a2"
+    assert store.get_latest_job_by_file_id("a0").status == "completed"
+
+
+def test_stale_jobs_are_requeued_then_failed(sql_store):
+    job = sql_store.insert_new_job("f", "alice")
+    sql_store.claim_next_job(max_jobs_per_user=1)
+
+    assert sql_store.requeue_stale_jobs(timeout=-1, max_attempts=2) == 1
+    assert sql_store.get_job_by_id(job.id).status == "pending"
+
+    sql_store.claim_next_job(max_jobs_per_user=1)
+    assert sql_store.requeue_stale_jobs(timeout=-1, max_attempts=2) == 1
+    assert sql_store.get_job_by_id(job.id).status == "failed"
+
+
+def test_queue_runs_jobs_in_background():
+    done = threading.Event()
+    events = []
+
+    def handler(job):
+        if job.file_id == "bad":
+            raise ValueError("cannot extract")
+        if job.file_id == "last":
+            done.set()
+
+    async def on_event(job):
+        events.append((job.file_id, job.status, job.error))
+
+    async def run():
+        queue = IngestionQueue(
+            MemoryIngestionJobStore(), handler, workers=1, on_event=on_event
+        )
+        queue.start()
+        try:
+            queue.enqueue("bad", "alice")
+            job = queue.enqueue("last", "alice")
+            await asyncio.get_running_loop().run_in_executor(None, done.wait, 5)
+            for _ in range(100):
+                if queue.get_job(job.id).status == "completed":
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+        return queue.get_file_job("last")
+
+    job = asyncio.run(run())
+
+    assert job.status == "completed"
+    assert ("bad", "failed", "cannot extract") in events
+    assert ("last", "processing", None) in events
+
+
+def test_running_jobs_are_not_recovered_as_stale(sql_store):
+    release = threading.Event()
+
+    async def run():
+        queue = IngestionQueue(sql_store, lambda job: release.wait(5), job_timeout=0.3)
+        queue.start()
+        try:
+            job = queue.enqueue("slow", "alice")
+            await asyncio.sleep(0.6)
+            # Still running past its timeout, but refreshed in the meantime.
+            requeued = sql_store.requeue_stale_jobs(timeout=0.3, max_attempts=3)
+            status = sql_store.get_job_by_id(job.id).status
+        finally:
+            release.set()
+            await queue.stop()
+        return requeued, status
+
+    assert asyncio.run(run()) == (0, "processing")
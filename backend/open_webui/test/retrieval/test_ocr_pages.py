@@ -0,0 +1,108 @@
+import sys
+import types
+from pathlib import Path
+
+import pymupdf as fitz
+from langchain_core.documents import Document
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+for name, value in {
+    "GLOBAL_LOG_LEVEL": "DEBUG",
+    "DPI": 100,
+    "BATCH_SIZE": 10,
+    "ENV_TMP_DIR": "/tmp",
+    "OCR_WORKERS": 0,
+    "OCR_WORKER_MEMORY_MB": 1500,
+    "PDF_OCR_MIN_TEXT_CHARS": 50,
+}.items():
+    if not hasattr(env_stub, name):
+        setattr(env_stub, name, value)
+sys.modules["open_webui.env"] = env_stub
+
+# The EasyOCR reader downloads its models when the OCR module is imported.
+easyocr_stub = types.ModuleType("easyocr")
+easyocr_stub.Reader = lambda *args, **kwargs: None
+sys.modules.setdefault("easyocr", easyocr_stub)
+
+from open_webui.retrieval.loaders import main as loaders_main
+from open_webui.retrieval.loaders.ocrprocessor import (
+    find_pages_needing_ocr,
+    merge_pdf_pages,
+)
+
+TEXT = "This page has a text layer that is long enough to be kept as it is."
+
+
+def _make_pdf(path):
+    """Write a PDF of a text page, a scanned (image only) page and a text page."""
+    image = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 32, 32), False)
+    image.clear_with(128)
+    with fitz.open() as pdf:
+        for page_num in range(3):
+            page = pdf.new_page()
+            if page_num == 1:
+                page.insert_image(fitz.Rect(72, 72, 272, 272), pixmap=image)
+            else:
+                page.insert_text((72, 72), f"{TEXT} ({page_num})", fontsize=8)
+        pdf.save(str(path))
+    return str(path)
+
+
+def test_only_image_pages_without_text_need_ocr(tmp_path):
+    path = _make_pdf(tmp_path / "mixed.pdf")
+
+    assert find_pages_needing_ocr(path, {0: TEXT, 1: "", 2: TEXT}) == [1]
+    # A short text layer over an image is not trusted either.
+    assert find_pages_needing_ocr(path, {0: TEXT, 1: "12", 2: TEXT}) == [1]
+    # Pages without images are never OCR'd, whatever their text layer.
+    assert find_pages_needing_ocr(path, {0: "", 1: "", 2: ""}) == [1]
+
+
+def test_merge_keeps_page_order_and_text_layer_metadata():
+    text_docs = [
+        Document(
+            page_content=f"text {page}", metadata={"source": "a.pdf", "page": page}
+        )
+        for page in range(3)
+    ]
+    ocr_docs = [Document(page_content="ocr 1", metadata={"page_number": 1})]
+
+    docs = merge_pdf_pages(text_docs, ocr_docs)
+
+    assert [doc.page_content for doc in docs] == ["text 0", "ocr 1", "text 2"]
+    assert [doc.metadata["page_number"] for doc in docs] == [0, 1, 2]
+    assert docs[1].metadata["source"] == "a.pdf"
+    assert docs[1].metadata["page"] == 1
+
+
+def test_loader_ocrs_only_the_scanned_page(tmp_path, monkeypatch):
+    path = _make_pdf(tmp_path / "mixed.pdf")
+    ocr_calls = []
+
+    async def fake_ocr(pdf_path, ocr_reader, page_nums=None, **kwargs):
+        ocr_calls.append(page_nums)
+        return [
+            Document(
+                page_content=f"scanned text {page_num}",
+                metadata={"page_number": page_num, "average_confidence": 0.9},
+            )
+            for page_num in page_nums
+        ]
+
+    monkeypatch.setattr(loaders_main, "async_ocr_pdf_fallback", fake_ocr)
+
+    docs = loaders_main.Loader().load("mixed.pdf", "application/pdf", path)
+
+    assert ocr_calls == [[1]]
+    assert [doc.metadata["page_number"] for doc in docs] == [0, 1, 2]
+    assert TEXT in docs[0].page_content and TEXT in docs[2].page_content
+    assert docs[1].page_content == "scanned text 1"
+    # The OCR page keeps the text layer metadata (source, page) of its page.
+    assert docs[1].metadata["source"] == docs[0].metadata["source"] == path
+    assert docs[1].metadata["page"] == 1
+    assert docs[1].metadata["average_confidence"] == 0.9
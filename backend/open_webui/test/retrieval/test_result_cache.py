@@ -0,0 +1,89 @@
+import sys
+import time
+import types
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+config_stub = sys.modules.get("open_webui.config") or types.ModuleType(
+    "open_webui.config"
+)
+config_stub.VECTOR_DB_EXECUTOR_MAX_WORKERS = 4
+sys.modules["open_webui.config"] = config_stub
+
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+# Other tests in this package replace the vector models with bare stubs.
+vector_main = sys.modules.get("open_webui.retrieval.vector.main")
+if not hasattr(getattr(vector_main, "SearchResult", None), "model_fields"):
+    sys.modules.pop("open_webui.retrieval.vector.main", None)
+
+from open_webui.retrieval.result_cache import MemoryRetrievalStore, RetrievalCache
+from open_webui.retrieval.vector.observer import ObservedVectorDBClient
+
+PARAMS = {"k": 3, "hybrid_search": False}
+RESULT = {"documents": [["a"]], "metadatas": [[{"file_id": "f"}]]}
+
+
+class NullClient:
+    def insert(self, collection_name, items):
+        pass
+
+    def delete(self, collection_name, ids=None, filter=None):
+        pass
+
+    def delete_collection(self, collection_name):
+        pass
+
+
+def test_equivalent_requests_share_an_entry():
+    cache = RetrievalCache(MemoryRetrievalStore(max_size=10, ttl=60))
+
+    key = cache.key("docs", [{"file_id": "a"}, {"file_id": "b"}], ["q1", "q2"], PARAMS)
+    cache.set(key, RESULT)
+
+    same = cache.key(
+        "docs", [{"file_id": "b"}, {"file_id": "a"}], ["  q2 ", "q1", "q1"], PARAMS
+    )
+    assert cache.get(same) == RESULT
+    assert cache.get(cache.key("docs", [{"file_id": "a"}], ["q1"], PARAMS)) is None
+    assert cache.get(cache.key("docs", None, ["q1", "q2"], {"k": 4})) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_collection_writes_invalidate_entries():
+    cache = RetrievalCache(MemoryRetrievalStore(max_size=10, ttl=60))
+    client = ObservedVectorDBClient(NullClient())
+    client.add_listener(cache)
+
+    for write in (
+        lambda: client.insert("docs", [{"id": "1"}]),
+        lambda: client.delete("docs", filter={"file_id": "a"}),
+        lambda: client.delete_collection("docs"),
+    ):
+        other = cache.key("other", None, ["q"], PARAMS)
+        cache.set(other, RESULT)
+        key = cache.key("docs", None, ["q"], PARAMS)
+        cache.set(key, RESULT)
+
+        write()
+
+        assert cache.get(cache.key("docs", None, ["q"], PARAMS)) is None
+        assert cache.get(cache.key("other", None, ["q"], PARAMS)) == RESULT
+
+
+def test_memory_store_is_bounded_and_expires():
+    store = MemoryRetrievalStore(max_size=2, ttl=60)
+    for key in ("a", "b", "c"):
+        store.set(key, key)
+    assert store.get("a") is None
+    assert len(store) == 2
+
+    store = MemoryRetrievalStore(max_size=2, ttl=1)
+    store.set("a", "a")
+    store._items["a"] = (time.monotonic() - 1, "a")
+    assert store.get("a") is None
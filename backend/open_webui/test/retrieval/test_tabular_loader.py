@@ -0,0 +1,60 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from open_webui.retrieval.loaders.tabular import CSVRowLoader, ExcelRowLoader
+
+
+def test_csv_rows_are_grouped_with_the_header(tmp_path):
+    path = tmp_path / "export.csv"
+    rows = [f'{i},name {i},"a, b"' for i in range(1, 21)]
+    path.write_text("id,name,tags\n" + "\n".join(rows) + "\n", encoding="utf-8")
+
+    docs = list(CSVRowLoader(str(path), max_chars=100).lazy_load())
+
+    assert len(docs) > 1
+    for doc in docs:
+        assert doc.page_content.startswith("id,name,tags\n")
+        assert len(doc.page_content) <= 100
+    assert sum(doc.metadata["rows"] for doc in docs) == 20
+    assert docs[0].metadata["row"] == 2
+    assert '1,name 1,"a, b"' in docs[0].page_content
+    assert '20,name 20,"a, b"' in docs[-1].page_content
+
+
+def test_csv_encoding_and_delimiter_are_detected(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(
+        "stadt;einwohner\nköln;1000000\n\nmünchen;1500000\n".encode("cp1252")
+    )
+
+    (doc,) = CSVRowLoader(str(path)).load()
+
+    assert doc.page_content == "stadt,einwohner\nköln,1000000\nmünchen,1500000"
+
+
+def test_xlsx_sheets_are_streamed(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "People"
+    workbook.active.append(["name", "age"])
+    workbook.active.append(["Ada", 36])
+    workbook.create_sheet("Empty")
+    path = tmp_path / "export.xlsx"
+    workbook.save(path)
+
+    docs = ExcelRowLoader(str(path)).load()
+
+    assert [doc.page_content for doc in docs] == ["name,age\nAda,36"]
+    assert docs[0].metadata["sheet"] == "People"
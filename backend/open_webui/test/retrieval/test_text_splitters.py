@@ -0,0 +1,77 @@
+import sys
+import types
+from pathlib import Path
+
+from langchain_core.documents import Document
+from langchain_text_splitters.base import Tokenizer, split_text_on_tokens
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+from open_webui.retrieval.splitters import (
+    TokenWindowSplitter,
+    get_text_splitter,
+    split_document_batch,
+)
+
+
+class CharEncoding:
+    """Stand-in for a tiktoken encoding: one token per character."""
+
+    def encode_ordinary(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+def test_token_windows_match_langchain():
+    encoding = CharEncoding()
+    splitter = TokenWindowSplitter(encoding, chunk_size=7, chunk_overlap=2)
+    text = " ".join(f"w{i % 9}" for i in range(40))
+
+    expected = split_text_on_tokens(
+        text=text,
+        tokenizer=Tokenizer(
+            chunk_overlap=2,
+            tokens_per_chunk=7,
+            decode=encoding.decode,
+            encode=encoding.encode_ordinary,
+        ),
+    )
+
+    assert splitter.split_text(text) == expected
+    assert splitter.split_text("") == []
+
+
+def test_batch_keeps_documents_apart():
+    splitter = TokenWindowSplitter(CharEncoding(), chunk_size=4, chunk_overlap=1)
+    docs = [
+        Document(page_content="abcdefg", metadata={"page": 0}),
+        Document(page_content="", metadata={"page": 1}),
+        Document(page_content="xy", metadata={"page": 2}),
+    ]
+
+    chunks = split_document_batch(splitter, docs)
+
+    assert [[c.page_content for c in doc_chunks] for doc_chunks in chunks] == [
+        ["abcd", "defg"],
+        [],
+        ["xy"],
+    ]
+    assert chunks[0][1].metadata == {"page": 0, "start_index": 3}
+
+
+def test_splitters_are_shared():
+    splitter = get_text_splitter("character", 100, 10)
+
+    assert get_text_splitter("", 100, 10) is splitter
+    assert get_text_splitter("character", 200, 10) is not splitter
+    assert split_document_batch(splitter, [Document(page_content="hello")])[0][
+        0
+    ].metadata == {"start_index": 0}
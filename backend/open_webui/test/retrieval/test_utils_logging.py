@@ -12,6 +12,14 @@ config_stub.VECTOR_DB = None
 config_stub.RAG_EMBEDDING_QUERY_PREFIX = ""
 config_stub.RAG_EMBEDDING_CONTENT_PREFIX = ""
 config_stub.RAG_EMBEDDING_PREFIX_FIELD_NAME = ""
+config_stub.VECTOR_DB_EXECUTOR_MAX_WORKERS = 4
+config_stub.RAG_EMBEDDING_CONCURRENCY = 2
+config_stub.RAG_EMBEDDING_MAX_RETRIES = 0
+config_stub.RAG_EMBEDDING_RETRY_BACKOFF = 0
+config_stub.RAG_EMBEDDING_TIMEOUT = 5
+config_stub.ENABLE_RAG_INFERENCE_BATCHING = False
+config_stub.RAG_INFERENCE_MAX_BATCH_SIZE = 64
+config_stub.RAG_INFERENCE_MAX_WAIT_MS = 5
 sys.modules["open_webui.config"] = config_stub
 
 env_stub = types.ModuleType("open_webui.env")
@@ -48,6 +56,7 @@ sys.modules["open_webui.utils.collections"] = collections_stub
 
 connector_stub = types.ModuleType("open_webui.retrieval.vector.connector")
 connector_stub.VECTOR_DB_CLIENT = None
+connector_stub.BM25_INDEX = None
 sys.modules["open_webui.retrieval.vector.connector"] = connector_stub
 
 vector_main_stub = types.ModuleType("open_webui.retrieval.vector.main")
@@ -55,7 +64,10 @@ class GetResult:
     pass
 class SearchResult:
     pass
+class VectorItem:
+    pass
 vector_main_stub.GetResult = GetResult
+vector_main_stub.VectorItem = VectorItem
 vector_main_stub.SearchResult = SearchResult
 sys.modules["open_webui.retrieval.vector.main"] = vector_main_stub
 
@@ -0,0 +1,125 @@
+import asyncio
+import sys
+import threading
+import types
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+config_stub = sys.modules.get("open_webui.config") or types.ModuleType(
+    "open_webui.config"
+)
+config_stub.VECTOR_DB_EXECUTOR_MAX_WORKERS = 4
+config_stub.QDRANT_URI = None
+config_stub.QDRANT_API_KEY = None
+sys.modules["open_webui.config"] = config_stub
+
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+# Other tests in this package replace the vector models with bare stubs.
+vector_main = sys.modules.get("open_webui.retrieval.vector.main")
+if not hasattr(getattr(vector_main, "SearchResult", None), "model_fields"):
+    sys.modules.pop("open_webui.retrieval.vector.main", None)
+
+from open_webui.retrieval.vector.aio import AsyncVectorDBClient
+from open_webui.retrieval.vector.observer import (
+    ObservedVectorDBClient,
+    VectorDBListener,
+)
+
+
+class SyncOnlyClient(AsyncVectorDBClient):
+    def __init__(self):
+        self.calls = []
+
+    def search(self, collection_name, vectors, limit, filter=None, expr=None):
+        self.calls.append(("search", threading.current_thread().name))
+        return {"collection": collection_name, "filter": filter}
+
+    def insert(self, collection_name, items):
+        self.calls.append(("insert", threading.current_thread().name))
+
+    def delete(self, collection_name, ids=None, filter=None):
+        self.calls.append(("delete", threading.current_thread().name))
+
+
+class RecordingListener(VectorDBListener):
+    def __init__(self):
+        self.events = []
+
+    def on_insert(self, collection_name, items):
+        self.events.append(("insert", collection_name, len(items)))
+
+    def on_delete(self, collection_name, ids=None, filter=None):
+        self.events.append(("delete", collection_name, filter))
+
+
+def test_sync_clients_run_on_the_shared_executor():
+    client = SyncOnlyClient()
+
+    result = asyncio.run(
+        client.asearch("docs", vectors=[[0.0]], limit=1, filter={"file_id": "a"})
+    )
+
+    assert result == {"collection": "docs", "filter": {"file_id": "a"}}
+    assert client.calls[0][1].startswith("vector-db")
+
+
+def test_observed_client_notifies_listeners_on_async_writes():
+    listener = RecordingListener()
+    client = ObservedVectorDBClient(SyncOnlyClient())
+    client.add_listener(listener)
+
+    async def write():
+        await client.ainsert("docs", [{"id": "1"}, {"id": "2"}])
+        await client.adelete("docs", filter={"file_id": "a"})
+
+    asyncio.run(write())
+
+    assert listener.events == [
+        ("insert", "docs", 2),
+        ("delete", "docs", {"file_id": "a"}),
+    ]
+
+
+def test_qdrant_native_async_client():
+    pytest.importorskip("qdrant_client")
+    from qdrant_client import AsyncQdrantClient
+    from open_webui.retrieval.vector.dbs.qdrant import QdrantClient
+
+    client = QdrantClient.__new__(QdrantClient)
+    client.collection_prefix = "open-webui"
+    client.aclient = AsyncQdrantClient(":memory:")
+
+    items = [
+        {
+            "id": str(uuid.uuid4()),
+            "text": f"{file_id}-{i}",
+            "vector": vector,
+            "metadata": {"file_id": file_id},
+        }
+        for i, (file_id, vector) in enumerate(
+            [("a", [1.0, 0.0]), ("a", [0.9, 0.1]), ("b", [0.0, 1.0])]
+        )
+    ]
+
+    async def run():
+        await client.ainsert("docs", items)
+        filtered = await client.asearch(
+            "docs", vectors=[[0.0, 1.0]], limit=2, filter={"file_id": "a"}
+        )
+        await client.adelete("docs", filter={"file_id": "a"})
+        remaining = await client.aquery("docs", filter={"file_id": "a"})
+        return filtered, remaining
+
+    filtered, remaining = asyncio.run(run())
+
+    assert [meta["file_id"] for meta in filtered.metadatas[0]] == ["a", "a"]
+    assert remaining.ids == [[]]
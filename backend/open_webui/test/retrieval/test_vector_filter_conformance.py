@@ -0,0 +1,326 @@
+import math
+import os
+import sys
+import types
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+config_stub = sys.modules.get("open_webui.config") or types.ModuleType(
+    "open_webui.config"
+)
+for name in [
+    "CHROMA_DATA_PATH",
+    "CHROMA_HTTP_HOST",
+    "CHROMA_HTTP_PORT",
+    "CHROMA_HTTP_HEADERS",
+    "CHROMA_HTTP_SSL",
+    "CHROMA_TENANT",
+    "CHROMA_DATABASE",
+    "CHROMA_CLIENT_AUTH_PROVIDER",
+    "CHROMA_CLIENT_AUTH_CREDENTIALS",
+    "QDRANT_URI",
+    "QDRANT_API_KEY",
+    "MILVUS_URI",
+    "MILVUS_USER",
+    "MILVUS_PASSWORD",
+    "MILVUS_TOKEN",
+    "MILVUS_DB_NAME",
+    "ELASTICSEARCH_URL",
+    "ELASTICSEARCH_CA_CERTS",
+    "ELASTICSEARCH_API_KEY",
+    "ELASTICSEARCH_USERNAME",
+    "ELASTICSEARCH_PASSWORD",
+    "ELASTICSEARCH_CLOUD_ID",
+    "ELASTICSEARCH_INDEX_PREFIX",
+    "SSL_ASSERT_FINGERPRINT",
+    "OPENSEARCH_URI",
+    "OPENSEARCH_SSL",
+    "OPENSEARCH_CERT_VERIFY",
+    "OPENSEARCH_USERNAME",
+    "OPENSEARCH_PASSWORD",
+    "PGVECTOR_DB_URL",
+    "PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH",
+]:
+    if not hasattr(config_stub, name):
+        setattr(config_stub, name, None)
+config_stub.VECTOR_DB_EXECUTOR_MAX_WORKERS = 4
+sys.modules["open_webui.config"] = config_stub
+
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+# Other tests in this package replace the vector models with bare stubs.
+vector_main = sys.modules.get("open_webui.retrieval.vector.main")
+if not hasattr(getattr(vector_main, "SearchResult", None), "model_fields"):
+    sys.modules.pop("open_webui.retrieval.vector.main", None)
+
+
+# Two files share one collection. Every chunk of file "b" is closer to the
+# query than any chunk of file "a", so a backend that filters after the top-k
+# cut returns nothing (or too little) for file "a".
+QUERY = [0.0, 1.0]
+
+
+def _items():
+    items = []
+    for file_id, base in (("a", [1.0, 0.0]), ("b", [0.0, 1.0])):
+        for i in range(3):
+            vector = [base[0] + 0.1 * i, base[1] + 0.1 * i]
+            items.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": f"{file_id}-{i}",
+                    "vector": vector,
+                    "metadata": {"file_id": file_id, "source": f"{file_id}.txt"},
+                }
+            )
+    return items
+
+
+####################
+# Stand-in drivers for the search engine backends
+####################
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _lookup(source, field):
+    value = source
+    for part in field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _matches(source, query):
+    if "match_all" in query:
+        return True
+    if "term" in query:
+        ((field, value),) = query["term"].items()
+        # Keyword sub-fields index the raw value.
+        if field.endswith(".keyword"):
+            field = field[: -len(".keyword")]
+        return _lookup(source, field) == value
+    if "terms" in query:
+        ((field, values),) = query["terms"].items()
+        if field.endswith(".keyword"):
+            field = field[: -len(".keyword")]
+        return _lookup(source, field) in values
+    if "bool" in query:
+        return all(_matches(source, clause) for clause in query["bool"]["filter"])
+    raise AssertionError(f"Unsupported query: {query}")
+
+
+class FakeSearchEngine:
+    """Evaluates term/bool filters and the cosine script_score of msearch."""
+
+    def __init__(self):
+        self.docs = {}
+        self.indices = types.SimpleNamespace(exists=lambda index: index in self.docs)
+
+    def add(self, index, doc_id, source):
+        self.docs.setdefault(index, {})[doc_id] = source
+
+    def msearch(self, index, searches=None, body=None):
+        requests = searches if searches is not None else body
+        responses = []
+        for request in requests[1::2]:
+            script_score = request["query"]["script_score"]
+            params = script_score["script"]["params"]
+            vector = params.get("vector", params.get("query_value"))
+            hits = [
+                {
+                    "_id": doc_id,
+                    "_score": _cosine(vector, source["vector"]) + 1.0,
+                    "_source": {k: source[k] for k in ("text", "metadata")},
+                }
+                for doc_id, source in self.docs.get(index, {}).items()
+                if _matches(source, script_score["query"])
+            ]
+            hits.sort(key=lambda hit: hit["_score"], reverse=True)
+            responses.append({"hits": {"hits": hits[: request["size"]]}})
+        return {"responses": responses}
+
+
+####################
+# Backends
+####################
+
+
+def _chroma(tmp_path):
+    pytest.importorskip("chromadb")
+    import chromadb
+    from chromadb import Settings
+    from open_webui.retrieval.vector.dbs.chroma import ChromaClient
+
+    client = ChromaClient.__new__(ChromaClient)
+    client.client = chromadb.PersistentClient(
+        path=str(tmp_path / "chroma"),
+        settings=Settings(allow_reset=True, anonymized_telemetry=False),
+    )
+    return client, client.insert
+
+
+def _qdrant(tmp_path):
+    pytest.importorskip("qdrant_client")
+    from qdrant_client import QdrantClient
+    from open_webui.retrieval.vector.dbs.qdrant import QdrantClient as Client
+
+    client = Client.__new__(Client)
+    client.collection_prefix = "open-webui"
+    client.client = QdrantClient(":memory:")
+    return client, client.insert
+
+
+def _milvus(tmp_path):
+    pytest.importorskip("pymilvus")
+    pytest.importorskip("milvus_lite")
+    from pymilvus import MilvusClient
+    from open_webui.retrieval.vector.dbs.milvus import MilvusClient as Client
+
+    client = Client.__new__(Client)
+    client.collection_prefix = "open_webui"
+    client.client = MilvusClient(uri=str(tmp_path / "milvus.db"))
+    return client, client.insert
+
+
+def _pgvector(tmp_path):
+    url = os.environ.get("PGVECTOR_TEST_DB_URL")
+    if not url:
+        pytest.skip("PGVECTOR_TEST_DB_URL is not set")
+    pytest.importorskip("pgvector")
+    from open_webui.retrieval.vector.dbs import pgvector
+
+    pgvector.PGVECTOR_DB_URL = url
+    pgvector.PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH = 2
+    client = pgvector.PgvectorClient()
+    return client, client.insert
+
+
+def _elasticsearch(tmp_path):
+    pytest.importorskip("elasticsearch")
+    from open_webui.retrieval.vector.dbs.elasticsearch import ElasticsearchClient
+
+    client = ElasticsearchClient.__new__(ElasticsearchClient)
+    client.index_prefix = "open_webui_collections"
+    client.client = FakeSearchEngine()
+
+    def insert(collection_name, items):
+        for item in items:
+            client.client.add(
+                client._get_index_name(len(item["vector"])),
+                item["id"],
+                {**item, "collection": collection_name},
+            )
+
+    return client, insert
+
+
+def _opensearch(tmp_path):
+    pytest.importorskip("opensearchpy")
+    from open_webui.retrieval.vector.dbs.opensearch import OpenSearchClient
+
+    client = OpenSearchClient.__new__(OpenSearchClient)
+    client.index_prefix = "open_webui"
+    client.client = FakeSearchEngine()
+
+    def insert(collection_name, items):
+        for item in items:
+            client.client.add(client._get_index_name(collection_name), item["id"], item)
+
+    return client, insert
+
+
+BACKENDS = {
+    "chroma": _chroma,
+    "qdrant": _qdrant,
+    "milvus": _milvus,
+    "pgvector": _pgvector,
+    "elasticsearch": _elasticsearch,
+    "opensearch": _opensearch,
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request, tmp_path):
+    client, insert = BACKENDS[request.param](tmp_path)
+    collection_name = f"conformance_{uuid.uuid4().hex[:8]}"
+    insert(collection_name, _items())
+    yield client, collection_name
+    if request.param == "pgvector":
+        client.delete_collection(collection_name)
+
+
+def test_filtered_search_returns_k_matching_hits(backend):
+    client, collection_name = backend
+
+    result = client.search(
+        collection_name, vectors=[QUERY], limit=2, filter={"file_id": "a"}
+    )
+
+    assert len(result.ids[0]) == 2
+    assert all(meta["file_id"] == "a" for meta in result.metadatas[0])
+
+
+def test_filters_combine_with_and(backend):
+    client, collection_name = backend
+
+    result = client.search(
+        collection_name,
+        vectors=[QUERY],
+        limit=3,
+        filter={"file_id": "a", "source": "b.txt"},
+    )
+
+    assert result is None or result.ids[0] == []
+
+
+def test_filter_applies_to_every_query_vector(backend):
+    client, collection_name = backend
+
+    result = client.search(
+        collection_name,
+        vectors=[QUERY, [1.0, 0.0]],
+        limit=3,
+        filter={"file_id": "b"},
+    )
+
+    assert len(result.ids) == 2
+    for metadatas in result.metadatas:
+        assert len(metadatas) == 3
+        assert all(meta["file_id"] == "b" for meta in metadatas)
+
+
+def test_unfiltered_search_is_unchanged(backend):
+    client, collection_name = backend
+
+    result = client.search(collection_name, vectors=[QUERY], limit=3)
+
+    assert [meta["file_id"] for meta in result.metadatas[0]] == ["b", "b", "b"]
+
+
+def test_set_membership_filter(backend):
+    client, collection_name = backend
+
+    result = client.search(
+        collection_name, vectors=[QUERY], limit=6, filter={"file_id": ["a", "b"]}
+    )
+    assert len(result.ids[0]) == 6
+
+    result = client.search(
+        collection_name, vectors=[QUERY], limit=6, filter={"file_id": ["a"]}
+    )
+    assert len(result.ids[0]) == 3
+    assert all(meta["file_id"] == "a" for meta in result.metadatas[0])
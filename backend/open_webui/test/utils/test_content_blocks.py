@@ -0,0 +1,78 @@
+import copy
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Other tests stub open_webui.utils with a plain module.
+utils_stub = sys.modules.get("open_webui.utils")
+if utils_stub is not None and not hasattr(utils_stub, "__path__"):
+    utils_stub.__path__ = [str(BACKEND_DIR / "open_webui" / "utils")]
+
+from open_webui.utils.content_blocks import ContentBlockDeltas
+
+
+def apply(blocks, ops):
+    """What a delta client does with the operations."""
+    for op in ops:
+        if op["op"] == "snapshot":
+            blocks = copy.deepcopy(op["blocks"])
+        elif op["op"] == "truncate":
+            del blocks[op["length"] :]
+        elif op["op"] in ("open", "replace"):
+            blocks[op["index"] : op["index"] + 1] = [copy.deepcopy(op["block"])]
+        elif op["op"] == "append":
+            blocks[op["index"]]["content"] += op["text"]
+        elif op["op"] == "close":
+            blocks[op["index"]].update(op["block"])
+    return blocks
+
+
+def test_tokens_are_sent_as_appends():
+    deltas = ContentBlockDeltas(snapshot_interval=0)
+    blocks = [{"type": "text", "content": "Hi"}]
+
+    assert deltas.update(blocks) == [
+        {"op": "snapshot", "blocks": [{"type": "text", "content": "Hi"}]}
+    ]
+
+    blocks[-1]["content"] += " there"
+    assert deltas.update(blocks) == [{"op": "append", "index": 0, "text": " there"}]
+    assert deltas.update(blocks) == []
+
+
+def test_stream_is_rebuilt_from_the_operations():
+    deltas = ContentBlockDeltas(snapshot_interval=0)
+    blocks = [{"type": "text", "content": ""}]
+    client = apply([], deltas.update(blocks))
+
+    def step():
+        nonlocal client
+        ops = deltas.update(blocks)
+        client = apply(client, ops)
+        assert client == blocks
+        return [op["op"] for op in ops]
+
+    blocks[-1]["content"] += "<thi"
+    assert step() == ["append"]
+
+    # The tag is complete: the text block is rewritten into a reasoning block.
+    blocks[-1] = {"type": "reasoning", "content": "", "started_at": 1.0}
+    assert step() == ["replace"]
+
+    blocks[-1]["content"] += "hmm"
+    assert step() == ["append"]
+
+    blocks[-1].update(ended_at=3.0, duration=2)
+    blocks.append({"type": "text", "content": "answer"})
+    assert step() == ["close", "open"]
+
+    blocks.append({"type": "tool_calls", "content": [{"id": "1"}]})
+    assert step() == ["close", "open"]
+
+    blocks[-1]["results"] = [{"tool_call_id": "1", "content": "42"}]
+    assert step() == ["replace"]
+
+    blocks.pop()
+    assert step() == ["truncate"]
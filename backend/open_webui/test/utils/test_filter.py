@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import types
+from pathlib import Path
+
+from pydantic import BaseModel
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"MAIN": "DEBUG", "RAG": "DEBUG", "MODELS": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+# Other tests stub open_webui.utils with a plain module.
+utils_stub = sys.modules.get("open_webui.utils")
+if utils_stub is not None and not hasattr(utils_stub, "__path__"):
+    utils_stub.__path__ = [str(BACKEND_DIR / "open_webui" / "utils")]
+
+
+class FakeFunctions:
+    def __init__(self):
+        self.valves = {"prefix": ">"}
+        self.reads = 0
+        self.user_reads = 0
+
+    def get_function_valves_by_id(self, id):
+        self.reads += 1
+        return self.valves
+
+    def get_user_valves_by_id_and_user_id(self, id, user_id):
+        self.user_reads += 1
+        return {"suffix": "!"}
+
+
+Functions = FakeFunctions()
+functions_stub = types.ModuleType("open_webui.models.functions")
+functions_stub.Functions = Functions
+sys.modules["open_webui.models.functions"] = functions_stub
+
+plugin_stub = types.ModuleType("open_webui.utils.plugin")
+plugin_stub.load_function_module_by_id = lambda id: None
+sys.modules["open_webui.utils.plugin"] = plugin_stub
+
+from open_webui.utils.filter import compile_filter_functions
+
+
+class Filter:
+    class Valves(BaseModel):
+        prefix: str = ""
+
+    class UserValves(BaseModel):
+        suffix: str = ""
+
+    def __init__(self):
+        self.valves = self.Valves()
+
+    def stream(self, event, __user__):
+        return f"{self.valves.prefix}{event}{__user__['valves'].suffix}"
+
+
+def make_request(module):
+    state = types.SimpleNamespace(FUNCTIONS={"f": module}, FUNCTION_VALVES={})
+    return types.SimpleNamespace(app=types.SimpleNamespace(state=state))
+
+
+def test_pipeline_is_resolved_once():
+    module = Filter()
+    request = make_request(module)
+    function = types.SimpleNamespace(id="f", updated_at=1)
+    user = {"id": "u"}
+
+    def compile():
+        return compile_filter_functions(
+            request, [function], "stream", {"__user__": user, "__metadata__": {}}
+        )
+
+    pipeline = compile()
+    assert [asyncio.run(pipeline(token))[0] for token in "ab"] == [">a!", ">b!"]
+    assert (Functions.reads, Functions.user_reads) == (1, 1)
+    # The caller's user dict is left alone.
+    assert user == {"id": "u"}
+
+    # Valves are reused by later requests until they are updated.
+    compile()
+    assert Functions.reads == 1
+
+    Functions.valves = {"prefix": "#"}
+    function.updated_at = 2
+    assert asyncio.run(compile()("c"))[0] == "#c!"
+    assert Functions.reads == 2
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Other tests stub open_webui.utils with a plain module.
+utils_stub = sys.modules.get("open_webui.utils")
+if utils_stub is not None and not hasattr(utils_stub, "__path__"):
+    utils_stub.__path__ = [str(BACKEND_DIR / "open_webui" / "utils")]
+
+from open_webui.utils.tag_parser import ContentTagParser
+
+TAGS = {
+    "reasoning": [("think", "/think"), ("thinking", "/thinking")],
+    "code_interpreter": [("code_interpreter", "/code_interpreter")],
+}
+
+
+def parse(chunks):
+    parser = ContentTagParser(TAGS)
+    blocks = [{"type": "text", "content": ""}]
+    ended = [parser.feed(blocks, chunk) for chunk in chunks]
+    parser.flush(blocks)
+    return [(block["type"], block["content"]) for block in blocks], ended
+
+
+def test_tags_split_across_chunks():
+    text = "Hi <thinking>a < b</thinking>\n\nSo 1<2."
+    expected = [
+        ("text", "Hi "),
+        ("reasoning", "a < b"),
+        ("text", "So 1<2."),
+    ]
+
+    # Every chunking of the response gives the same blocks.
+    assert parse([text])[0] == expected
+    assert parse(list(text))[0] == expected
+    assert parse([text[:5], text[5:21], text[21:]])[0] == expected
+
+
+def test_partial_tags_are_held_back():
+    parser = ContentTagParser(TAGS)
+    blocks = [{"type": "text", "content": ""}]
+
+    parser.feed(blocks, "x <thi")
+    assert blocks == [{"type": "text", "content": "x "}]
+
+    parser.feed(blocks, "nk ")
+    assert blocks[-1]["content"] == "x "
+
+    # Not a tag after all (the attributes never close on this line).
+    parser.feed(blocks, "about it\n")
+    assert blocks == [{"type": "text", "content": "x <think about it\n"}]
+
+    parser.feed(blocks, "<thin")
+    parser.flush(blocks)
+    assert blocks[-1]["content"].endswith("<thin")
+
+
+def test_code_interpreter_ends_the_stream():
+    blocks, ended = parse(
+        [
+            '<code_interpreter type="code" lang="python">',
+            "print(1)",
+            "</code_",
+            "interpreter>",
+        ]
+    )
+
+    assert blocks == [("code_interpreter", "print(1)")]
+    assert ended == [False, False, False, True]
+
+    parser = ContentTagParser(TAGS)
+    blocks = [{"type": "text", "content": ""}]
+    parser.feed(blocks, '<code_interpreter type="code" lang="python">')
+    assert blocks[-1]["attributes"] == {"type": "code", "lang": "python"}
@@ -0,0 +1,70 @@
+import sys
+import types
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+sys.path.append(str(BACKEND_DIR))
+
+# Stub modules to avoid heavy dependencies during import
+env_stub = sys.modules.get("open_webui.env") or types.ModuleType("open_webui.env")
+env_stub.SRC_LOG_LEVELS = {"MAIN": "DEBUG", "RAG": "DEBUG"}
+sys.modules["open_webui.env"] = env_stub
+
+# Other tests stub open_webui.utils with a plain module.
+utils_stub = sys.modules.get("open_webui.utils")
+if utils_stub is not None and not hasattr(utils_stub, "__path__"):
+    utils_stub.__path__ = [str(BACKEND_DIR / "open_webui" / "utils")]
+
+from open_webui.utils import write_behind
+from open_webui.utils.write_behind import MessageWriteBehind
+
+
+def test_chunks_are_coalesced_into_bounded_writes(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(write_behind.time, "monotonic", lambda: now[0])
+
+    content = []
+    writes = []
+    save = MessageWriteBehind(
+        writes.append,
+        lambda: {"content": "".join(content)},
+        interval=1.0,
+        max_bytes=10,
+    )
+
+    for token in ["ab", "cd", "ef"]:
+        content.append(token)
+        assert save.touch(len(token)) is False
+
+    # The interval elapsed.
+    now[0] = 1.5
+    content.append("g")
+    assert save.touch(1) is True
+    assert writes == [{"content": "abcdefg"}]
+
+    # So did the byte threshold.
+    content.append("0123456789")
+    assert save.touch(10) is True
+    assert save.flush() is False
+    assert len(writes) == 2
+
+    # Completion always writes the final state.
+    assert save.flush(force=True) is True
+    assert writes[-1] == {"content": "abcdefg0123456789"}
+    assert save.writes == 3
+
+
+def test_failed_writes_are_retried():
+    writes = []
+
+    def write(message):
+        if not writes:
+            writes.append(None)
+            raise RuntimeError("database is locked")
+        writes.append(message)
+
+    save = MessageWriteBehind(write, lambda: {"content": "x"}, 60, 1)
+
+    assert save.touch(1) is False
+    assert save.flush() is True
+    assert writes == [None, {"content": "x"}]
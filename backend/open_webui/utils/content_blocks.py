@@ -0,0 +1,118 @@
+import copy
+import time
+from typing import Optional
+
+####################################
+#
+# Content block deltas
+#
+####################################
+
+
+class ContentBlockDeltas:
+    """
+    Turns successive states of a streamed response's content blocks into
+    the operations a client needs to rebuild them, instead of re-sending the
+    whole serialized content on every token:
+
+        {"op": "snapshot", "blocks": [...]}       full state, for (re)sync
+        {"op": "open", "index": i, "block": {...}}
+        {"op": "append", "index": i, "text": "..."}
+        {"op": "replace", "index": i, "block": {...}}
+        {"op": "close", "index": i, "block": {...}}  block fields, no content
+        {"op": "truncate", "length": n}           drop blocks from index n on
+
+    A block is closed once another block follows it or it has ``ended_at``.
+    The first update, and the first one after every ``snapshot_interval``
+    seconds (0 disables the periodic ones), is a snapshot.
+    """
+
+    def __init__(self, snapshot_interval: float = 5.0):
+        self.snapshot_interval = snapshot_interval
+        self._last_snapshot: Optional[float] = None
+        # (type, content, fields, closed) of every block as the client has it.
+        self._sent: list[tuple] = []
+
+    @staticmethod
+    def _fields(block: dict) -> dict:
+        return {key: value for key, value in block.items() if key != "content"}
+
+    @staticmethod
+    def _state(block: dict, closed: bool) -> tuple:
+        content = block.get("content")
+        if not isinstance(content, str):
+            content = copy.deepcopy(content)
+        return (
+            block["type"],
+            content,
+            ContentBlockDeltas._fields(block),
+            closed,
+        )
+
+    def snapshot(self, blocks: list[dict]) -> list[dict]:
+        self._last_snapshot = time.monotonic()
+        self._sent = [
+            self._state(block, i < len(blocks) - 1 or "ended_at" in block)
+            for i, block in enumerate(blocks)
+        ]
+        return [{"op": "snapshot", "blocks": copy.deepcopy(blocks)}]
+
+    def update(self, blocks: list[dict]) -> list[dict]:
+        """Operations taking the client from the last update to ``blocks``."""
+        if self._last_snapshot is None or (
+            self.snapshot_interval
+            and time.monotonic() - self._last_snapshot >= self.snapshot_interval
+        ):
+            return self.snapshot(blocks)
+
+        ops = []
+        if len(blocks) < len(self._sent):
+            ops.append({"op": "truncate", "length": len(blocks)})
+            del self._sent[len(blocks) :]
+
+        for i, block in enumerate(blocks):
+            closed = i < len(blocks) - 1 or "ended_at" in block
+            content = block.get("content")
+
+            if i == len(self._sent):
+                ops.append({"op": "open", "index": i, "block": copy.deepcopy(block)})
+                if closed:
+                    ops.append(
+                        {"op": "close", "index": i, "block": self._fields(block)}
+                    )
+                self._sent.append(self._state(block, closed))
+                continue
+
+            sent_type, sent_content, sent_fields, sent_closed = self._sent[i]
+            if content is sent_content and closed == sent_closed:
+                # Untouched since the last update, the common case for every
+                # block but the last.
+                if block["type"] == sent_type and self._fields(block) == sent_fields:
+                    continue
+
+            fields = self._fields(block)
+            rewritten = block["type"] != sent_type or (
+                content != sent_content
+                and not (
+                    isinstance(content, str)
+                    and isinstance(sent_content, str)
+                    and content.startswith(sent_content)
+                )
+            )
+            if rewritten:
+                # E.g. a tag was found in the text streamed so far.
+                ops.append({"op": "replace", "index": i, "block": copy.deepcopy(block)})
+            elif content != sent_content:
+                ops.append(
+                    {"op": "append", "index": i, "text": content[len(sent_content) :]}
+                )
+
+            if closed and not sent_closed:
+                ops.append({"op": "close", "index": i, "block": fields})
+            elif not rewritten and fields != sent_fields:
+                # Fields set after the block closed, e.g. tool results.
+                ops.append({"op": "replace", "index": i, "block": copy.deepcopy(block)})
+
+            self._sent[i] = self._state(block, closed)
+
+        return ops
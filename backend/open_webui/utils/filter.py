@@ -32,10 +32,66 @@ def get_sorted_filter_ids(model: dict):
     return filter_ids
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
-):
+def get_filter_valves(request, function, function_module):
+    """
+    The filter's Valves, built from the database only when the function's
+    ``updated_at`` (bumped on every valves update) or module changed.
+    """
+    cache = request.app.state.FUNCTION_VALVES
+    cached = cache.get(function.id)
+    if (
+        cached is not None
+        and cached[0] == function.updated_at
+        and cached[1] is function_module
+    ):
+        return cached[2]
+
+    valves = Functions.get_function_valves_by_id(function.id)
+    valves = function_module.Valves(**(valves if valves else {}))
+    cache[function.id] = (function.updated_at, function_module, valves)
+    return valves
+
+
+class FilterPipeline:
+    """
+    A filter chain resolved for one request: modules, handlers, their
+    signatures, valves and user valves are looked up once by
+    ``compile_filter_functions``, so running it on every streamed chunk only
+    calls the handlers.
+    """
+
+    def __init__(self, filter_type: str, steps: list[tuple], skip_files):
+        self.filter_type = filter_type
+        self.steps = steps
+        self.skip_files = skip_files
+
+    async def __call__(self, form_data):
+        key = "event" if self.filter_type == "stream" else "body"
+
+        for filter_id, handler, params, is_coroutine in self.steps:
+            try:
+                if is_coroutine:
+                    form_data = await handler(**{key: form_data, **params})
+                else:
+                    form_data = handler(**{key: form_data, **params})
+
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {filter_id}: {e}")
+                raise e
+
+        # Handle file cleanup for inlet
+        if self.skip_files and "files" in form_data.get("metadata", {}):
+            del form_data["files"]
+            del form_data["metadata"]["files"]
+
+        return form_data, {}
+
+
+def compile_filter_functions(
+    request, filter_functions, filter_type, extra_params
+) -> FilterPipeline:
     skip_files = None
+    steps = []
 
     for function in filter_functions:
         filter = function
@@ -60,53 +116,46 @@ async def process_filter_functions(
 
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
+            function_module.valves = get_filter_valves(
+                request, function, function_module
             )
 
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
-                k: v
-                for k, v in {
-                    **extra_params,
-                    "__id__": filter_id,
-                }.items()
-                if k in sig.parameters
-            }
-
-            # Handle user parameters
-            if "__user__" in sig.parameters:
-                if hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
+        # Prepare parameters
+        sig = inspect.signature(handler)
+
+        params = {
+            k: v
+            for k, v in {
+                **extra_params,
+                "__id__": filter_id,
+            }.items()
+            if k in sig.parameters
+        }
+
+        # Handle user parameters
+        if "__user__" in sig.parameters:
+            if hasattr(function_module, "UserValves"):
+                try:
+                    params["__user__"] = {
+                        **params["__user__"],
+                        "valves": function_module.UserValves(
                             **Functions.get_user_valves_by_id_and_user_id(
                                 filter_id, params["__user__"]["id"]
                             )
-                        )
-                    except Exception as e:
-                        log.exception(f"Failed to get user values: {e}")
-
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
-            else:
-                form_data = handler(**params)
-
-        except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
-
-    # Handle file cleanup for inlet
-    if skip_files and "files" in form_data.get("metadata", {}):
-        del form_data["files"]
-        del form_data["metadata"]["files"]
-
-    return form_data, {}
+                        ),
+                    }
+                except Exception as e:
+                    log.exception(f"Failed to get user values: {e}")
+
+        steps.append((filter_id, handler, params, inspect.iscoroutinefunction(handler)))
+
+    return FilterPipeline(filter_type, steps, skip_files)
+
+
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    pipeline = compile_filter_functions(
+        request, filter_functions, filter_type, extra_params
+    )
+    return await pipeline(form_data)
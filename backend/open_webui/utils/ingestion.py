@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional, Union
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.ingestion_jobs import (
+    IngestionJobModel,
+    IngestionJobs,
+    IngestionJobsTable,
+    new_ingestion_job,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+####################################
+#
+# Background file ingestion
+#
+####################################
+
+
+class MemoryIngestionJobStore:
+    """
+    In-process job store with the interface of IngestionJobsTable. Jobs do
+    not survive a restart and are not shared between workers.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, IngestionJobModel] = {}
+        self._lock = threading.Lock()
+
+    def insert_new_job(self, file_id: str, user_id: str) -> IngestionJobModel:
+        job = new_ingestion_job(file_id, user_id)
+        with self._lock:
+            self._jobs[job.id] = job
+        return job.model_copy()
+
+    def get_job_by_id(self, id: str) -> Optional[IngestionJobModel]:
+        with self._lock:
+            job = self._jobs.get(id)
+            return job.model_copy() if job else None
+
+    def get_latest_job_by_file_id(self, file_id: str) -> Optional[IngestionJobModel]:
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.file_id == file_id]
+            return (
+                max(jobs, key=lambda job: job.created_at).model_copy() if jobs else None
+            )
+
+    def claim_next_job(self, max_jobs_per_user: int) -> Optional[IngestionJobModel]:
+        with self._lock:
+            running: dict[str, int] = {}
+            for job in self._jobs.values():
+                if job.status == "processing":
+                    running[job.user_id] = running.get(job.user_id, 0) + 1
+
+            pending = [
+                job
+                for job in self._jobs.values()
+                if job.status == "pending"
+                and running.get(job.user_id, 0) < max_jobs_per_user
+            ]
+            if not pending:
+                return None
+
+            # Dicts keep insertion order, so min() breaks ties by age.
+            job = min(
+                pending, key=lambda job: (running.get(job.user_id, 0), job.created_at)
+            )
+            job.status = "processing"
+            job.attempts += 1
+            job.updated_at = time.time_ns()
+            return job.model_copy()
+
+    def update_job_status(
+        self, id: str, status: str, error: Optional[str] = None
+    ) -> Optional[IngestionJobModel]:
+        with self._lock:
+            job = self._jobs.get(id)
+            if job is None:
+                return None
+            job.status = status
+            job.error = error
+            job.updated_at = time.time_ns()
+            return job.model_copy()
+
+    def touch_job(self, id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(id)
+            if job is not None and job.status == "processing":
+                job.updated_at = time.time_ns()
+
+    def requeue_stale_jobs(self, timeout: int, max_attempts: int) -> int:
+        # Jobs only run in this process, so none can be orphaned.
+        return 0
+
+
+class IngestionQueue:
+    """
+    Runs uploaded file processing in the background.
+
+    Jobs are kept in ``store``; a dispatcher task on the event loop claims
+    them (fairly across users, at most ``max_jobs_per_user`` at a time) and
+    runs ``handler(job)`` on a pool of ``workers`` threads. ``on_event(job)``
+    is awaited whenever a job changes status, e.g. to notify the user.
+    """
+
+    # Claims are also retried periodically to pick up jobs queued by other
+    # processes sharing the store.
+    POLL_INTERVAL = 2
+    STALE_CHECK_INTERVAL = 60
+    # Running jobs are refreshed at least this often (and at least three
+    # times per ``job_timeout``) so they are never recovered as stale.
+    HEARTBEAT_INTERVAL = 60
+
+    def __init__(
+        self,
+        store: Union[IngestionJobsTable, MemoryIngestionJobStore],
+        handler: Callable[[IngestionJobModel], None],
+        workers: int = 2,
+        max_jobs_per_user: int = 1,
+        job_timeout: int = 3600,
+        max_attempts: int = 3,
+        on_event: Optional[Callable[[IngestionJobModel], Awaitable[None]]] = None,
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.max_jobs_per_user = max(max_jobs_per_user, 1)
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.on_event = on_event
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="ingestion"
+        )
+        self._running = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, file_id: str, user_id: str) -> Optional[IngestionJobModel]:
+        """Queue a file for processing. Safe to call from any thread."""
+        job = self.store.insert_new_job(file_id, user_id)
+        if job is not None:
+            self._wake()
+        return job
+
+    def get_job(self, id: str) -> Optional[IngestionJobModel]:
+        return self.store.get_job_by_id(id)
+
+    def get_file_job(self, file_id: str) -> Optional[IngestionJobModel]:
+        return self.store.get_latest_job_by_file_id(file_id)
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def _emit(self, job: Optional[IngestionJobModel]) -> None:
+        if job is not None and self.on_event is not None:
+            try:
+                await self.on_event(job)
+            except Exception as e:
+                log.warning(f"Failed to emit ingestion event for job {job.id}: {e}")
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_stale_check = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_stale_check > self.STALE_CHECK_INTERVAL:
+                    last_stale_check = time.monotonic()
+                    requeued = await loop.run_in_executor(
+                        None,
+                        self.store.requeue_stale_jobs,
+                        self.job_timeout,
+                        self.max_attempts,
+                    )
+                    if requeued:
+                        log.warning(f"Recovered {requeued} stale ingestion jobs")
+
+                while self._running < self.workers:
+                    job = await loop.run_in_executor(
+                        None, self.store.claim_next_job, self.max_jobs_per_user
+                    )
+                    if job is None:
+                        break
+                    self._running += 1
+                    asyncio.create_task(self._run(job))
+            except Exception as e:
+                log.exception(f"Ingestion dispatcher error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _heartbeat(self, job: IngestionJobModel, handler: asyncio.Future) -> None:
+        """Wait for ``handler``, refreshing the job while it runs."""
+        loop = asyncio.get_running_loop()
+        interval = min(self.HEARTBEAT_INTERVAL, self.job_timeout / 3)
+        while not (await asyncio.wait({handler}, timeout=interval))[0]:
+            try:
+                await loop.run_in_executor(None, self.store.touch_job, job.id)
+            except Exception as e:
+                log.warning(f"Failed to refresh ingestion job {job.id}: {e}")
+        handler.result()
+
+    async def _run(self, job: IngestionJobModel) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await self._emit(job)
+            try:
+                await self._heartbeat(
+                    job, loop.run_in_executor(self._executor, self.handler, job)
+                )
+            except Exception as e:
+                log.exception(f"Ingestion job {job.id} for file {job.file_id} failed")
+                detail = getattr(e, "detail", None) or str(e)
+                job = await loop.run_in_executor(
+                    None, self.store.update_job_status, job.id, "failed", str(detail)
+                )
+            else:
+                job = await loop.run_in_executor(
+                    None, self.store.update_job_status, job.id, "completed", None
+                )
+            await self._emit(job)
+        finally:
+            self._running -= 1
+            self._wakeup.set()
+
+
+def get_ingestion_queue(
+    backend: str,
+    handler: Callable[[IngestionJobModel], None],
+    **kwargs,
+) -> Optional[IngestionQueue]:
+    if not backend:
+        return None
+
+    if backend == "sql":
+        store = IngestionJobs
+    elif backend == "memory":
+        store = MemoryIngestionJobStore()
+    else:
+        raise ValueError(f"Unknown file ingestion queue backend: {backend}")
+
+    return IngestionQueue(store, handler, **kwargs)
@@ -20,18 +20,14 @@ import random
 import json
 import html
 import inspect
-import re
 import ast
 
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
 from starlette.responses import Response, StreamingResponse
 
-from html.parser import HTMLParser
-
 from open_webui.models.chats import Chats
 from open_webui.models.users import Users
 from open_webui.socket.main import (
@@ -59,7 +55,7 @@ from open_webui.models.users import UserModel
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
-from open_webui.retrieval.utils import get_sources_from_files
+from open_webui.retrieval.utils import aget_sources_from_files
 
 
 from open_webui.utils.chat import generate_chat_completion
@@ -81,10 +77,14 @@ from open_webui.utils.misc import (
 from open_webui.utils.tools import get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
+    compile_filter_functions,
     get_sorted_filter_ids,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.content_blocks import ContentBlockDeltas
+from open_webui.utils.tag_parser import ContentTagParser
+from open_webui.utils.write_behind import MessageWriteBehind
 
 from open_webui.tasks import create_task
 
@@ -98,6 +98,9 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_MAX_BYTES,
+    CHAT_STREAM_SNAPSHOT_INTERVAL,
 )
 from open_webui.constants import TASKS
 from open_webui.exceptionutil import getErrorMsg
@@ -596,26 +599,22 @@ async def chat_completion_files_handler(
             queries = [get_last_user_message(body["messages"])]
 
         try:
-            # Offload get_sources_from_files to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_files(
-                        request=request,
-                        files=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=request.app.state.rf,
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=request.app.state.config.RAG_FULL_CONTEXT,
-                    ),
-                )
+            # Vector searches run on the async client, blocking retrieval work
+            # on the shared bounded executor.
+            sources = await aget_sources_from_files(
+                request=request,
+                files=files,
+                queries=queries,
+                embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                    query, prefix=prefix, user=user
+                ),
+                k=request.app.state.config.TOP_K,
+                reranking_function=request.app.state.rf,
+                k_reranker=request.app.state.config.TOP_K_RERANKER,
+                r=request.app.state.config.RELEVANCE_THRESHOLD,
+                hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                full_context=request.app.state.config.RAG_FULL_CONTEXT,
+            )
         except Exception as e:
             log.exception(e)
 
@@ -1152,6 +1151,13 @@ async def process_chat_response(
         Functions.get_function_by_id(filter_id)
         for filter_id in get_sorted_filter_ids(model)
     ]
+    # Resolved once, then run on every streamed chunk.
+    stream_filters = compile_filter_functions(
+        request=request,
+        filter_functions=filter_functions,
+        filter_type="stream",
+        extra_params=extra_params,
+    )
 
     # Streaming response
     if event_emitter and event_caller:
@@ -1333,156 +1339,6 @@ async def process_chat_response(
 
                 return messages
 
-            def tag_content_handler(content_type, tags, content, content_blocks):
-                end_flag = False
-                def extract_attributes(tag_content):
-                    """Extract attributes from a tag if they exist using html.parser (safer than regex)."""
-                    class AttrParser(HTMLParser):
-                      def __init__(self):
-                        super().__init__()
-                        self.attrs = {}
-                    # Match attributes in the format: key="value" (ignores single quotes for simplicity)
-                    def handle_starttag(self, tag, attrs):
-                        self.attrs = dict(attrs)
-
-                    parser = AttrParser()
-                    # Wrap in a dummy tag so the parser can process attributes
-                    parser.feed(f"<t{tag_content}>")
-                    return parser.attrs
-
-                if content_blocks[-1]["type"] == "text":
-                    for start_tag, end_tag in tags:
-                        # Match start tag e.g., <tag> or <tag attr="value">
-                        start_tag_pattern = rf"<{re.escape(start_tag)}(\s.*?)?>"
-                        match = re.search(start_tag_pattern, content)
-                        if match:
-                            attr_content = (
-                                match.group(1) if match.group(1) else ""
-                            )  # Ensure it's not None
-                            attributes = extract_attributes(
-                                attr_content
-                            )  # Extract attributes safely
-
-                            # Capture everything before and after the matched tag
-                            before_tag = content[
-                                : match.start()
-                            ]  # Content before opening tag
-                            after_tag = content[
-                                match.end() :
-                            ]  # Content after opening tag
-
-                            # Remove the start tag and after from the currently handling text block
-                            content_blocks[-1]["content"] = content_blocks[-1][
-                                "content"
-                            ].replace(match.group(0) + after_tag, "")
-
-                            if before_tag:
-                                content_blocks[-1]["content"] = before_tag
-
-                            if not content_blocks[-1]["content"]:
-                                content_blocks.pop()
-
-                            # Append the new block
-                            content_blocks.append(
-                                {
-                                    "type": content_type,
-                                    "start_tag": start_tag,
-                                    "end_tag": end_tag,
-                                    "attributes": attributes,
-                                    "content": "",
-                                    "started_at": time.time(),
-                                }
-                            )
-
-                            if after_tag:
-                                content_blocks[-1]["content"] = after_tag
-
-                            break
-                elif content_blocks[-1]["type"] == content_type:
-                    start_tag = content_blocks[-1]["start_tag"]
-                    end_tag = content_blocks[-1]["end_tag"]
-                    # Match end tag e.g., </tag>
-                    end_tag_pattern = rf"<{re.escape(end_tag)}>"
-
-                    # Check if the content has the end tag
-                    if re.search(end_tag_pattern, content):
-                        end_flag = True
-
-                        block_content = content_blocks[-1]["content"]
-                        # Strip start and end tags from the content
-                        start_tag_pattern = rf"<{re.escape(start_tag)}(.*?)>"
-                        block_content = re.sub(
-                            start_tag_pattern, "", block_content
-                        ).strip()
-
-                        end_tag_regex = re.compile(end_tag_pattern, re.DOTALL)
-                        split_content = end_tag_regex.split(block_content, maxsplit=1)
-
-                        # Content inside the tag
-                        block_content = (
-                            split_content[0].strip() if split_content else ""
-                        )
-
-                        # Leftover content (everything after `</tag>`)
-                        leftover_content = (
-                            split_content[1].strip() if len(split_content) > 1 else ""
-                        )
-
-                        if block_content:
-                            content_blocks[-1]["content"] = block_content
-                            content_blocks[-1]["ended_at"] = time.time()
-                            content_blocks[-1]["duration"] = int(
-                                content_blocks[-1]["ended_at"]
-                                - content_blocks[-1]["started_at"]
-                            )
-
-                            # Reset the content_blocks by appending a new text block
-                            if content_type != "code_interpreter":
-                                if leftover_content:
-
-                                    content_blocks.append(
-                                        {
-                                            "type": "text",
-                                            "content": leftover_content,
-                                        }
-                                    )
-                                else:
-                                    content_blocks.append(
-                                        {
-                                            "type": "text",
-                                            "content": "",
-                                        }
-                                    )
-
-                        else:
-                            # Remove the block if content is empty
-                            content_blocks.pop()
-
-                            if leftover_content:
-                                content_blocks.append(
-                                    {
-                                        "type": "text",
-                                        "content": leftover_content,
-                                    }
-                                )
-                            else:
-                                content_blocks.append(
-                                    {
-                                        "type": "text",
-                                        "content": "",
-                                    }
-                                )
-
-                        # Clean processed content
-                        content = re.sub(
-                            rf"<{re.escape(start_tag)}(.*?)>(.|\n)*?<{re.escape(end_tag)}>",
-                            "",
-                            content,
-                            flags=re.DOTALL,
-                        )
-
-                return content, content_blocks, end_flag
-
             message = Chats.get_message_by_id_and_message_id(
                 metadata["chat_id"], metadata["message_id"]
             )
@@ -1498,19 +1354,44 @@ async def process_chat_response(
             except Exception as e:
                 pass
 
-            content = (
-                message.get("content", "")
-                if message
-                else last_assistant_message if last_assistant_message else ""
-            )
-
             content_blocks = [
                 {
                     "type": "text",
-                    "content": content,
+                    "content": (
+                        message.get("content", "")
+                        if message
+                        else last_assistant_message if last_assistant_message else ""
+                    ),
                 }
             ]
 
+            # Clients that asked for stream_protocol "delta" get the block
+            # operations since the last event instead of the whole
+            # serialized content on every token.
+            block_deltas = (
+                ContentBlockDeltas(CHAT_STREAM_SNAPSHOT_INTERVAL)
+                if metadata.get("stream_protocol") == "delta"
+                else None
+            )
+
+            def content_event_data():
+                if block_deltas is not None:
+                    return {"blocks": block_deltas.update(content_blocks)}
+                return {"content": serialize_content_blocks(content_blocks)}
+
+            realtime_save = (
+                MessageWriteBehind(
+                    lambda message: Chats.upsert_message_to_chat_by_id_and_message_id(
+                        metadata["chat_id"], metadata["message_id"], message
+                    ),
+                    lambda: {"content": serialize_content_blocks(content_blocks)},
+                    interval=REALTIME_CHAT_SAVE_INTERVAL,
+                    max_bytes=REALTIME_CHAT_SAVE_MAX_BYTES,
+                )
+                if ENABLE_REALTIME_CHAT_SAVE
+                else None
+            )
+
             # We might want to disable this by default
             DETECT_REASONING = True
             DETECT_SOLUTION = True
@@ -1532,6 +1413,18 @@ async def process_chat_response(
 
             solution_tags = [("|begin_of_solution|", "|end_of_solution|")]
 
+            tag_parser = ContentTagParser(
+                {
+                    **({"reasoning": reasoning_tags} if DETECT_REASONING else {}),
+                    **(
+                        {"code_interpreter": code_interpreter_tags}
+                        if DETECT_CODE_INTERPRETER
+                        else {}
+                    ),
+                    **({"solution": solution_tags} if DETECT_SOLUTION else {}),
+                }
+            )
+
             try:
                 for event in events:
                     await event_emitter(
@@ -1551,9 +1444,6 @@ async def process_chat_response(
                     )
 
                 async def stream_body_handler(response):
-                    nonlocal content
-                    nonlocal content_blocks
-
                     response_tool_calls = []
 
                     async for line in response.body_iterator:
@@ -1574,13 +1464,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params=extra_params,
-                            )
+                            data, _ = await stream_filters(data)
 
                             if data:
                                 if "selected_model_id" in data:
@@ -1684,11 +1568,7 @@ async def process_chat_response(
 
                                         reasoning_block["content"] += reasoning_content
 
-                                        data = {
-                                            "content": serialize_content_blocks(
-                                                content_blocks
-                                            )
-                                        }
+                                        data = content_event_data()
 
                                     if value:
                                         if (
@@ -1714,7 +1594,6 @@ async def process_chat_response(
                                                 }
                                             )
 
-                                        content = f"{content}{value}"
                                         if not content_blocks:
                                             content_blocks.append(
                                                 {
@@ -1723,60 +1602,18 @@ async def process_chat_response(
                                                 }
                                             )
 
-                                        content_blocks[-1]["content"] = (
-                                            content_blocks[-1]["content"] + value
-                                        )
-
-                                        if DETECT_REASONING:
-                                            content, content_blocks, _ = (
-                                                tag_content_handler(
-                                                    "reasoning",
-                                                    reasoning_tags,
-                                                    content,
-                                                    content_blocks,
-                                                )
-                                            )
-
-                                        if DETECT_CODE_INTERPRETER:
-                                            content, content_blocks, end = (
-                                                tag_content_handler(
-                                                    "code_interpreter",
-                                                    code_interpreter_tags,
-                                                    content,
-                                                    content_blocks,
-                                                )
-                                            )
-
-                                            if end:
-                                                break
-
-                                        if DETECT_SOLUTION:
-                                            content, content_blocks, _ = (
-                                                tag_content_handler(
-                                                    "solution",
-                                                    solution_tags,
-                                                    content,
-                                                    content_blocks,
-                                                )
-                                            )
+                                        # Splits reasoning, code interpreter
+                                        # and solution tags into their blocks.
+                                        if tag_parser.feed(content_blocks, value):
+                                            break
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
-                                                {
-                                                    "content": serialize_content_blocks(
-                                                        content_blocks
-                                                    ),
-                                                },
-                                            )
+                                            realtime_save.touch(len(value))
+                                            if block_deltas is not None:
+                                                data = content_event_data()
                                         else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                            data = content_event_data()
 
                                 await event_emitter(
                                     {
@@ -1792,6 +1629,8 @@ async def process_chat_response(
                                 log.debug("Error: ", e)
                                 continue
 
+                    tag_parser.flush(content_blocks)
+
                     if content_blocks:
                         # Clean up the last text block
                         if content_blocks[-1]["type"] == "text":
@@ -1836,9 +1675,7 @@ async def process_chat_response(
                     await event_emitter(
                         {
                             "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
+                            "data": content_event_data(),
                         }
                     )
 
@@ -1935,9 +1772,7 @@ async def process_chat_response(
                     await event_emitter(
                         {
                             "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
+                            "data": content_event_data(),
                         }
                     )
 
@@ -1975,9 +1810,7 @@ async def process_chat_response(
                         await event_emitter(
                             {
                                 "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
+                                "data": content_event_data(),
                             }
                         )
 
@@ -2112,9 +1945,7 @@ async def process_chat_response(
                         await event_emitter(
                             {
                                 "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
+                                "data": content_event_data(),
                             }
                         )
 
@@ -2161,11 +1992,19 @@ async def process_chat_response(
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+                else:
+                    realtime_save.flush(force=True)
 
                 # Send a webhook notification if the user is not active
                 if get_active_status_by_user_id(user.id) is None:
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
+                        # The answer without its reasoning and tool blocks.
+                        content = "\n".join(
+                            block["content"]
+                            for block in content_blocks
+                            if block["type"] == "text" and block["content"]
+                        )
                         post_webhook(
                             request.app.state.WEBUI_NAME,
                             webhook_url,
@@ -2199,6 +2038,8 @@ async def process_chat_response(
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+                else:
+                    realtime_save.flush(force=True)
 
             if response.background is not None:
                 await response.background()
@@ -2214,25 +2055,13 @@ async def process_chat_response(
                 return f"data: {item}\n\n"
 
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event, _ = await stream_filters(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data, _ = await stream_filters(data)
 
                 if data:
                     yield data
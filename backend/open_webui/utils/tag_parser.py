@@ -0,0 +1,192 @@
+import time
+from html.parser import HTMLParser
+from typing import Optional
+
+####################################
+#
+# Streaming tag parser
+#
+####################################
+
+
+def extract_attributes(tag_content: str) -> dict:
+    """Extract attributes from a tag if they exist using html.parser (safer than regex)."""
+
+    class AttrParser(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.attrs = {}
+
+        def handle_starttag(self, tag, attrs):
+            self.attrs = dict(attrs)
+
+    parser = AttrParser()
+    # Wrap in a dummy tag so the parser can process attributes
+    parser.feed(f"<t{tag_content}>")
+    return parser.attrs
+
+
+class ContentTagParser:
+    """
+    Splits streamed text into content blocks at tags such as ``<think>``,
+    ``<code_interpreter>`` or ``<|begin_of_solution|>``. ``tags`` maps a
+    block type to its (start tag, end tag) pairs, in order of precedence.
+
+    Only the newly streamed text is scanned. Text that may be the start of a
+    tag is held back until the next chunk tells whether it is one, so the
+    work per response is linear in its length.
+
+    A start tag is ``<name>`` or ``<name attrs>`` (attributes on one line
+    after a single whitespace character); an end tag is ``<name>`` exactly.
+    """
+
+    def __init__(self, tags: dict[str, list[tuple[str, str]]]):
+        self.start_tags = [
+            (f"<{start_tag}", content_type, start_tag, end_tag)
+            for content_type, pairs in tags.items()
+            for start_tag, end_tag in pairs
+        ]
+        self.content_types = set(tags)
+
+        self._pending = ""
+        # Whitespace following a closed tag is dropped.
+        self._strip_leading = False
+
+    def _open_block(self, block: dict) -> bool:
+        return (
+            block["type"] in self.content_types
+            and "end_tag" in block
+            and "ended_at" not in block
+        )
+
+    def _append_text(self, block: dict, text: str):
+        if self._strip_leading:
+            text = text.lstrip()
+            if not text:
+                return
+            self._strip_leading = False
+        block["content"] += text
+
+    def _match_start_tag(self, text: str, index: int) -> Optional[tuple]:
+        """
+        The start tag at ``index``: ``(end, content_type, start_tag, end_tag,
+        attributes)``, ``True`` if ``text`` ends before it can tell, or None.
+        """
+        partial = False
+        for prefix, content_type, start_tag, end_tag in self.start_tags:
+            head = text[index : index + len(prefix)]
+            if head != prefix:
+                partial = partial or prefix.startswith(head)
+                continue
+
+            after = index + len(prefix)
+            if after == len(text):
+                partial = True
+            elif text[after] == ">":
+                return (after + 1, content_type, start_tag, end_tag, {})
+            elif text[after].isspace():
+                close = text.find(">", after + 1)
+                newline = text.find("\n", after + 1)
+                if close != -1 and (newline == -1 or close < newline):
+                    attributes = extract_attributes(text[after:close])
+                    return (close + 1, content_type, start_tag, end_tag, attributes)
+                partial = partial or newline == -1
+        return True if partial else None
+
+    def _close(self, content_blocks: list[dict]):
+        block = content_blocks[-1]
+        block["content"] = block["content"].strip()
+
+        if block["content"]:
+            block["ended_at"] = time.time()
+            block["duration"] = int(block["ended_at"] - block["started_at"])
+
+            # A code interpreter block is followed by its output instead.
+            if block["type"] != "code_interpreter":
+                content_blocks.append({"type": "text", "content": ""})
+        else:
+            content_blocks.pop()
+            content_blocks.append({"type": "text", "content": ""})
+
+        self._strip_leading = True
+
+    def feed(self, content_blocks: list[dict], text: str) -> bool:
+        """
+        Add streamed ``text`` to ``content_blocks``; returns whether a code
+        interpreter block was closed.
+        """
+        text = self._pending + text
+        self._pending = ""
+
+        position = 0
+        while position < len(text):
+            block = content_blocks[-1]
+
+            if self._open_block(block):
+                end_tag = f"<{block['end_tag']}>"
+                index = text.find(end_tag, position)
+                if index == -1:
+                    # Hold back what may be the beginning of the end tag.
+                    keep = next(
+                        (
+                            size
+                            for size in range(
+                                min(len(end_tag) - 1, len(text) - position), 0, -1
+                            )
+                            if end_tag.startswith(text[len(text) - size :])
+                        ),
+                        0,
+                    )
+                    block["content"] += text[position : len(text) - keep]
+                    self._pending = text[len(text) - keep :]
+                    break
+
+                block["content"] += text[position:index]
+                position = index + len(end_tag)
+                self._close(content_blocks)
+                if block["type"] == "code_interpreter":
+                    # The code runs before the response continues.
+                    return True
+
+            elif block["type"] == "text":
+                index = text.find("<", position)
+                if index == -1:
+                    self._append_text(block, text[position:])
+                    break
+
+                self._append_text(block, text[position:index])
+                match = self._match_start_tag(text, index)
+                if match is True:
+                    self._pending = text[index:]
+                    break
+                if match is None:
+                    self._append_text(block, "<")
+                    position = index + 1
+                    continue
+
+                position, content_type, start_tag, end_tag, attributes = match
+                if not block["content"]:
+                    content_blocks.pop()
+                content_blocks.append(
+                    {
+                        "type": content_type,
+                        "start_tag": start_tag,
+                        "end_tag": end_tag,
+                        "attributes": attributes,
+                        "content": "",
+                        "started_at": time.time(),
+                    }
+                )
+                self._strip_leading = False
+
+            else:
+                block["content"] += text[position:]
+                break
+
+        return False
+
+    def flush(self, content_blocks: list[dict]):
+        """Release held back text once the stream has ended."""
+        if self._pending:
+            content_blocks[-1]["content"] += self._pending
+            self._pending = ""
@@ -0,0 +1,75 @@
+import logging
+import time
+from typing import Callable
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+####################################
+#
+# Realtime chat save
+#
+####################################
+
+
+class MessageWriteBehind:
+    """
+    Coalesces the realtime saves of one streamed message. Callers report
+    every streamed chunk with ``touch``; the message (built by ``get_message``
+    only when it is written) is saved once ``interval`` seconds or
+    ``max_bytes`` of new content have accumulated since the last write, and
+    on ``flush`` when the response completes or is cancelled. An answer thus
+    costs a bounded number of writes instead of one per chunk.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[dict], None],
+        get_message: Callable[[], dict],
+        interval: float,
+        max_bytes: int,
+    ):
+        self.write = write
+        self.get_message = get_message
+        self.interval = interval
+        self.max_bytes = max_bytes
+
+        self.writes = 0
+        self._pending_bytes = 0
+        self._dirty = False
+        self._last_write = time.monotonic()
+
+    def touch(self, size: int = 0) -> bool:
+        """Record ``size`` bytes of new content; returns whether it was written."""
+        self._dirty = True
+        self._pending_bytes += size
+        if (
+            self._pending_bytes >= self.max_bytes
+            or time.monotonic() - self._last_write >= self.interval
+        ):
+            return self.flush()
+        return False
+
+    def flush(self, force: bool = False) -> bool:
+        """
+        Write the message if a chunk arrived since the last write, or in any
+        case with ``force`` (blocks may have changed without a chunk).
+        """
+        if not (self._dirty or force):
+            return False
+
+        self._dirty = False
+        self._pending_bytes = 0
+        self._last_write = time.monotonic()
+        try:
+            self.write(self.get_message())
+        except Exception as e:
+            # The next flush writes the whole message again.
+            self._dirty = True
+            log.warning(f"Realtime chat save failed: {e}")
+            return False
+        self.writes += 1
+        return True